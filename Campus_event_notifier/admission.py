@@ -0,0 +1,218 @@
+"""
+Admission Control Module
+Token-bucket rate limiting and a bounded concurrency gate for the
+expensive LLM-backed routes (/chat, /api/chat, /agent).
+
+Tunables (environment):
+    LLM_USER_RATE_PER_MINUTE / LLM_USER_BURST   per signed-in user
+    LLM_IP_RATE_PER_MINUTE / LLM_IP_BURST       per client IP
+    LLM_MAX_CONCURRENCY                         LLM calls in flight at once
+    LLM_MAX_QUEUE / LLM_QUEUE_TIMEOUT           bounded wait queue (count, seconds)
+    RATE_LIMIT_MAX_KEYS / RATE_LIMIT_IDLE_SECONDS  bucket table bounds
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from jose import jwt as jose_jwt
+
+from Campus_event_notifier.auth import SECRET_KEY, ALGORITHM
+from Campus_event_notifier.metrics import registry
+
+ADMISSION_REJECTIONS = registry.counter(
+    "admission_rejections_total",
+    "Requests rejected by admission control",
+    ("reason",),
+)
+LLM_SLOTS_IN_USE = registry.gauge(
+    "llm_slots_in_use",
+    "LLM-backed requests currently holding a concurrency slot",
+)
+LLM_QUEUE_DEPTH = registry.gauge(
+    "llm_queue_depth",
+    "LLM-backed requests waiting for a concurrency slot",
+)
+
+
+class TokenBucket:
+    """Token bucket refilled lazily from the elapsed time"""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """Keyed token-bucket limiter with bounded, LRU-evicted state"""
+
+    def __init__(self, rate_per_second: float, burst: float,
+                 max_keys: int = 10000, idle_seconds: float = 600.0):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _evict(self, now: float):
+        # Buckets are kept in least-recently-used order, so idle ones sit at the front
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if len(self._buckets) > self.max_keys or now - bucket.updated > self.idle_seconds:
+                self._buckets.popitem(last=False)
+            else:
+                break
+
+    def acquire(self, key: str, cost: float = 1.0, now: Optional[float] = None) -> float:
+        """Take `cost` tokens for `key`; returns 0 if allowed, else seconds to wait"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.burst, now)
+                self._buckets[key] = bucket
+            else:
+                self._buckets.move_to_end(key)
+                elapsed = max(0.0, now - bucket.updated)
+                bucket.tokens = min(self.burst, bucket.tokens + elapsed * self.rate)
+                bucket.updated = now
+
+            if bucket.tokens >= cost:
+                bucket.tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - bucket.tokens) / self.rate if self.rate > 0 else math.inf
+
+            self._evict(now)
+            return wait
+
+
+class Overloaded(Exception):
+    """Raised when the concurrency gate's wait queue is full or the wait times out"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Server busy")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """Caps concurrent work, with a short bounded queue in front of it"""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self):
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise Overloaded(retry_after=max(1.0, self.queue_timeout))
+            self.waiting += 1
+            LLM_QUEUE_DEPTH.inc()
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise Overloaded(retry_after=max(1.0, self.queue_timeout))
+            finally:
+                self.waiting -= 1
+                LLM_QUEUE_DEPTH.dec()
+        else:
+            await semaphore.acquire()
+
+        LLM_SLOTS_IN_USE.inc()
+        try:
+            yield
+        finally:
+            LLM_SLOTS_IN_USE.dec()
+            semaphore.release()
+
+
+def _per_minute(name: str, default: str) -> float:
+    return float(os.getenv(name, default)) / 60.0
+
+
+_max_keys = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+_idle_seconds = float(os.getenv("RATE_LIMIT_IDLE_SECONDS", "600"))
+
+# Global limiter instances for the LLM routes
+user_limiter = RateLimiter(
+    _per_minute("LLM_USER_RATE_PER_MINUTE", "10"),
+    float(os.getenv("LLM_USER_BURST", "5")),
+    _max_keys, _idle_seconds,
+)
+ip_limiter = RateLimiter(
+    _per_minute("LLM_IP_RATE_PER_MINUTE", "30"),
+    float(os.getenv("LLM_IP_BURST", "10")),
+    _max_keys, _idle_seconds,
+)
+llm_gate = ConcurrencyLimiter(
+    max_concurrent=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("LLM_MAX_QUEUE", "16")),
+    queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "2.0")),
+)
+
+
+def _user_from_token(request: Request) -> Optional[str]:
+    """Read the user's email from the access token without a DB lookup"""
+    token = request.cookies.get("access_token") or request.headers.get("authorization")
+    if not token:
+        return None
+    if token.startswith("Bearer "):
+        token = token.split(" ", 1)[1]
+    try:
+        payload = jose_jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except Exception:
+        return None
+    return payload.get("sub")
+
+
+def _reject(status_code: int, reason: str, retry_after: float):
+    ADMISSION_REJECTIONS.labels(reason=reason).inc()
+    raise HTTPException(
+        status_code=status_code,
+        detail="Too many requests to the AI assistant. Please try again shortly."
+        if status_code == 429 else "The AI assistant is busy. Please try again shortly.",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+async def llm_admission(request: Request):
+    """FastAPI dependency: rate-limit the caller, then hold an LLM concurrency slot"""
+    client_ip = request.client.host if request.client else "unknown"
+    wait = ip_limiter.acquire(f"ip:{client_ip}")
+    if wait > 0:
+        _reject(429, "ip_rate", wait)
+
+    user = _user_from_token(request)
+    if user:
+        wait = user_limiter.acquire(f"user:{user}")
+        if wait > 0:
+            _reject(429, "user_rate", wait)
+
+    try:
+        async with llm_gate.slot():
+            yield
+    except Overloaded as e:
+        _reject(503, "overloaded", e.retry_after)
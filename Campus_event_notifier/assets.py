@@ -0,0 +1,208 @@
+"""
+Static Asset Pipeline
+Fingerprints files in static/, writes precompressed .gz/.br variants once,
+and serves them with immutable caching and the matching Content-Encoding.
+
+Brotli variants are written only when the optional `brotli` package is
+installed; gzip variants are always written.
+
+Run `python -m Campus_event_notifier.assets` to build at deploy time;
+otherwise the app builds on startup (unchanged files are skipped, and
+fingerprinted files no longer in the manifest are pruned).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import stat
+from mimetypes import guess_type
+from pathlib import Path
+from typing import Dict, List
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+STATIC_DIR = Path(__file__).parent / "static"
+BUILD_DIR = Path(os.getenv("ASSET_BUILD_DIR", str(Path(__file__).parent / "static_build")))
+ASSETS_URL_PREFIX = "/assets"
+MANIFEST_NAME = "manifest.json"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Only text-like assets benefit from compression
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".html", ".json", ".txt", ".map", ".xml"}
+# Skip a compressed variant unless it saves at least this fraction
+MIN_COMPRESSION_SAVING = 0.05
+
+# Names the build writes: name.<hash>[.ext][.gz|.br]; nothing else is ever pruned
+_BUILT_NAME = re.compile(r"^.+\.[0-9a-f]{12}(\.[^.]+)?(\.gz|\.br)?$")
+
+
+def _fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _hashed_name(rel_path: Path, digest: str) -> str:
+    return str(rel_path.with_name(f"{rel_path.stem}.{digest}{rel_path.suffix}").as_posix())
+
+
+def _write_if_missing(path: Path, data: bytes):
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _compressed_variants(data: bytes) -> Dict[str, bytes]:
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return {
+        suffix: payload for suffix, payload in variants.items()
+        if len(payload) <= len(data) * (1 - MIN_COMPRESSION_SAVING)
+    }
+
+
+class AssetManifest:
+    """Maps logical asset paths (style.css) to fingerprinted ones (style.<hash>.css)"""
+
+    def __init__(self, source_dir: Path = STATIC_DIR, build_dir: Path = BUILD_DIR,
+                 url_prefix: str = ASSETS_URL_PREFIX):
+        self.source_dir = Path(source_dir)
+        self.build_dir = Path(build_dir)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.files: Dict[str, str] = {}
+
+    def build(self) -> Dict[str, str]:
+        """Fingerprint and precompress every static file; returns the manifest"""
+        files = {}
+        written = set()
+        for source in sorted(self.source_dir.rglob("*")):
+            if not source.is_file():
+                continue
+            rel_path = source.relative_to(self.source_dir)
+            data = source.read_bytes()
+            hashed = _hashed_name(rel_path, _fingerprint(data))
+            target = self.build_dir / hashed
+            _write_if_missing(target, data)
+            written.add(target)
+            if rel_path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+                for suffix, payload in _compressed_variants(data).items():
+                    variant = target.with_name(target.name + suffix)
+                    _write_if_missing(variant, payload)
+                    written.add(variant)
+            files[rel_path.as_posix()] = hashed
+
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.build_dir / MANIFEST_NAME
+        tmp = manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        tmp.write_text(json.dumps(files, indent=2, sort_keys=True))
+        os.replace(tmp, manifest_path)
+        self.files = files
+        self._prune(written)
+        return files
+
+    def _prune(self, keep) -> int:
+        """Delete fingerprinted files left over from earlier builds"""
+        removed = 0
+        for path in sorted(self.build_dir.rglob("*"), reverse=True):
+            if path.is_file() and path not in keep and _BUILT_NAME.match(path.name):
+                try:
+                    path.unlink()
+                    removed += 1
+                except FileNotFoundError:  # Another worker pruned it first
+                    pass
+            elif path.is_dir() and not any(path.iterdir()):
+                try:
+                    path.rmdir()
+                except OSError:  # Refilled or removed meanwhile
+                    pass
+        return removed
+
+    def url(self, path: str) -> str:
+        """Return the fingerprinted URL for a static asset (falls back to /static)"""
+        path = path.lstrip("/")
+        hashed = self.files.get(path)
+        if hashed is None:
+            return f"/static/{path}"
+        return f"{self.url_prefix}/{hashed}"
+
+
+def _accepted_encodings(scope) -> List[str]:
+    """Return the encodings the client accepts (q > 0)"""
+    header = Headers(scope=scope).get("accept-encoding", "")
+    accepted = []
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            accepted.append(token)
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves .br/.gz siblings and marks responses immutable"""
+
+    encodings = (("br", ".br"), ("gzip", ".gz"))
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] in ("GET", "HEAD"):
+            accepted = _accepted_encodings(scope)
+            for encoding, suffix in self.encodings:
+                if encoding not in accepted:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    return FileResponse(
+                        full_path,
+                        stat_result=stat_result,
+                        method=scope["method"],
+                        media_type=guess_type(path)[0] or "application/octet-stream",
+                        headers={
+                            "Content-Encoding": encoding,
+                            "Vary": "Accept-Encoding",
+                            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+                        },
+                    )
+
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+# Global manifest instance
+manifest = AssetManifest()
+
+
+def asset_url(path: str) -> str:
+    """Template helper: {{ asset_url('style.css') }}"""
+    return manifest.url(path)
+
+
+if __name__ == "__main__":
+    built = manifest.build()
+    print(f"✅ Built {len(built)} static assets into {manifest.build_dir}")
+    for logical, hashed in built.items():
+        print(f"  - {logical} -> {hashed}")
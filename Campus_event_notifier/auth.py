@@ -71,6 +71,15 @@ def get_current_active_user(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+def get_current_admin_user(current_user: User = Depends(get_current_active_user)):
+    """Get current user, requiring their email to be listed in ADMIN_EMAILS"""
+    admin_emails = {
+        e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()
+    }
+    if current_user.email.lower() not in admin_emails:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
 # User registration function
 def create_user(db: Session, email: str, password: str, username: str, full_name: str = None):
     """Create a new user"""
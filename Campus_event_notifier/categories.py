@@ -0,0 +1,56 @@
+"""
+Categories Module
+Maps an event's location to its home-page category, in Python and as a
+SQL expression, and gives each category a fixed bit for interest masks.
+"""
+
+from typing import Iterable, List
+
+from sqlalchemy import case, func
+
+# Location keyword -> category, checked in order
+CATEGORY_MAP = {
+    'n-block': 'Tech Events',
+    'cricket ground': 'Sports Events',
+    'oat': 'Cultural & Photography Events',
+    'h-block': 'Engineering Events',
+    'library': 'Academic Events'
+}
+OTHER_CATEGORY = 'Other Events'
+
+# Bit positions are stored in subscriber masks: only ever append to this list
+CATEGORIES: List[str] = list(CATEGORY_MAP.values()) + [OTHER_CATEGORY]
+CATEGORY_BITS = {category: 1 << i for i, category in enumerate(CATEGORIES)}
+
+
+def get_event_category(location: str) -> str:
+    location = (location or "").lower()
+    for key, category in CATEGORY_MAP.items():
+        if key in location:
+            return category
+    return OTHER_CATEGORY
+
+
+def category_bit_expression(location_column):
+    """SQL equivalent of CATEGORY_BITS[get_event_category(location)]"""
+    lowered = func.lower(location_column)
+    return case(
+        *[(lowered.contains(key), CATEGORY_BITS[category]) for key, category in CATEGORY_MAP.items()],
+        else_=CATEGORY_BITS[OTHER_CATEGORY],
+    )
+
+
+def interest_mask(categories: Iterable[str]) -> int:
+    """Bit mask for a list of category names; 0 means every category"""
+    mask = 0
+    for category in categories or ():
+        if category not in CATEGORY_BITS:
+            raise ValueError(f"unknown category: {category}")
+        mask |= CATEGORY_BITS[category]
+    return mask
+
+
+def mask_categories(mask: int) -> List[str]:
+    if not mask:
+        return list(CATEGORIES)
+    return [category for category in CATEGORIES if mask & CATEGORY_BITS[category]]
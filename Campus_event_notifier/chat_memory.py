@@ -0,0 +1,182 @@
+"""
+Chat Memory Module
+Per-conversation memory for the chatbot kept inside a token budget: the
+most recent turns are sent verbatim, older turns are folded into a short
+rolling summary, so prompts stop growing after the first few exchanges.
+
+Token counts come from a local estimator (no tokenizer download, no API
+call); it is deliberately a little pessimistic.
+
+Tunables (environment):
+    CHAT_MEMORY_TOKENS        budget for summary + recent turns (default 1200)
+    CHAT_SUMMARY_TOKENS       cap on the rolling summary (default 300)
+    CHAT_MIN_RECENT_TURNS     turns always kept verbatim (default 2)
+    CHAT_MAX_CONVERSATIONS / CHAT_IDLE_SECONDS  store bounds
+"""
+
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional, Tuple
+
+from Campus_event_notifier.metrics import registry
+
+CHAT_MEMORY_TOKENS = int(os.getenv("CHAT_MEMORY_TOKENS", "1200"))
+CHAT_SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "300"))
+CHAT_MIN_RECENT_TURNS = int(os.getenv("CHAT_MIN_RECENT_TURNS", "2"))
+CHAT_MAX_CONVERSATIONS = int(os.getenv("CHAT_MAX_CONVERSATIONS", "5000"))
+CHAT_IDLE_SECONDS = float(os.getenv("CHAT_IDLE_SECONDS", "1800"))
+
+# Longest slice of a message carried into the summary
+SUMMARY_SNIPPET_CHARS = 160
+
+CONVERSATIONS = registry.gauge(
+    "chat_conversations",
+    "Conversations currently held in memory",
+)
+CONVERSATION_EVICTIONS = registry.counter(
+    "chat_conversation_evictions_total",
+    "Conversations dropped from memory",
+    ("reason",),
+)
+MEMORY_TOKENS = registry.histogram(
+    "chat_memory_tokens",
+    "Estimated tokens of conversation memory sent with each prompt",
+    buckets=(0, 50, 100, 200, 400, 800, 1200, 1600, 2400),
+)
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE-style token count: words split every ~4 chars, digits and punctuation separately"""
+    if not text:
+        return 0
+    count = 0
+    for piece in _TOKEN_RE.findall(text):
+        count += 1 + (len(piece) - 1) // 4
+    return count
+
+
+def _snippet(text: str) -> str:
+    """First sentence (or the start) of a message, on one line"""
+    text = " ".join(text.split())
+    sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    if len(sentence) > SUMMARY_SNIPPET_CHARS:
+        sentence = sentence[:SUMMARY_SNIPPET_CHARS].rsplit(" ", 1)[0] + "..."
+    return sentence
+
+
+class Turn:
+    """One question and the assistant's answer"""
+
+    __slots__ = ("user", "assistant", "tokens")
+
+    def __init__(self, user: str, assistant: str):
+        self.user = user
+        self.assistant = assistant
+        self.tokens = estimate_tokens(user) + estimate_tokens(assistant) + 4
+
+
+class Conversation:
+    """Rolling summary plus recent turns, compacted to stay under a token budget"""
+
+    def __init__(self, conversation_id: str, budget: int = CHAT_MEMORY_TOKENS,
+                 summary_budget: int = CHAT_SUMMARY_TOKENS, min_recent: int = CHAT_MIN_RECENT_TURNS):
+        self.id = conversation_id
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.min_recent = min_recent
+        self.summary_lines: Deque[Tuple[str, int]] = deque()
+        self.summary_tokens = 0
+        self.turns: Deque[Turn] = deque()
+        self.turn_tokens = 0
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> int:
+        return self.summary_tokens + self.turn_tokens
+
+    def has_history(self) -> bool:
+        return bool(self.turns or self.summary_lines)
+
+    def add_turn(self, user: str, assistant: str):
+        """Record an exchange, folding the oldest turns into the summary when over budget"""
+        with self._lock:
+            turn = Turn(user, assistant)
+            self.turns.append(turn)
+            self.turn_tokens += turn.tokens
+            while self.tokens > self.budget and len(self.turns) > self.min_recent:
+                self._summarize(self.turns.popleft())
+
+    def _summarize(self, turn: Turn):
+        self.turn_tokens -= turn.tokens
+        line = f"- User asked: {_snippet(turn.user)} Assistant: {_snippet(turn.assistant)}"
+        tokens = estimate_tokens(line)
+        self.summary_lines.append((line, tokens))
+        self.summary_tokens += tokens
+        # The summary rolls too: the oldest points go first
+        while self.summary_tokens > self.summary_budget and len(self.summary_lines) > 1:
+            _, dropped = self.summary_lines.popleft()
+            self.summary_tokens -= dropped
+
+    def render(self) -> str:
+        """Conversation context for the prompt (empty for a new conversation)"""
+        with self._lock:
+            parts = []
+            if self.summary_lines:
+                parts.append("Summary of the earlier conversation:\n" + "\n".join(line for line, _ in self.summary_lines))
+            if self.turns:
+                parts.append("Most recent messages:\n" + "\n".join(
+                    f"User: {turn.user}\nAssistant: {turn.assistant}" for turn in self.turns))
+            MEMORY_TOKENS.observe(self.tokens)
+            return "\n\n".join(parts)
+
+
+class ConversationStore:
+    """In-memory conversations, evicted least-recently-used first and when idle"""
+
+    def __init__(self, max_conversations: int = CHAT_MAX_CONVERSATIONS, idle_seconds: float = CHAT_IDLE_SECONDS):
+        self.max_conversations = max_conversations
+        self.idle_seconds = idle_seconds
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._conversations)
+
+    def _evict(self, now: float):
+        while self._conversations:
+            conversation = next(iter(self._conversations.values()))
+            if len(self._conversations) > self.max_conversations:
+                reason = "capacity"
+            elif now - conversation.last_used > self.idle_seconds:
+                reason = "idle"
+            else:
+                break
+            self._conversations.popitem(last=False)
+            CONVERSATION_EVICTIONS.labels(reason=reason).inc()
+
+    def get(self, conversation_id: Optional[str], now: Optional[float] = None) -> Conversation:
+        """Return the conversation for an id, starting a new one if it's unknown or expired"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._evict(now)
+            conversation = self._conversations.get(conversation_id) if conversation_id else None
+            if conversation is None:
+                conversation = Conversation(secrets.token_urlsafe(16))
+                self._conversations[conversation.id] = conversation
+            else:
+                self._conversations.move_to_end(conversation.id)
+            conversation.last_used = now
+            self._evict(now)
+            CONVERSATIONS.set(len(self._conversations))
+            return conversation
+
+
+# Global conversation store instance
+conversations = ConversationStore()
@@ -1,36 +1,27 @@
-import google.generativeai as genai
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Optional
 from sqlalchemy.orm import Session
-from Campus_event_notifier.database import Event, get_db
-import os
-import traceback
-from dotenv import load_dotenv
-from pathlib import Path
-
-def _get_gemini_key():
-    # Load both root and package .env files and return a cleaned key
-    project_root = Path(__file__).parent.parent
-    pkg_env = Path(__file__).parent / ".env"
-    root_env = project_root / ".env"
-    # Load root first; only use non-empty keys
-    load_dotenv(dotenv_path=root_env)
-    key = os.getenv("GEMINI_API_KEY")
-    if key:
-        k = key.strip('"').strip("'").strip()
-        if k:
-            return k
-
-    # Try package .env next
-    load_dotenv(dotenv_path=pkg_env)
-    key = os.getenv("GEMINI_API_KEY")
-    if key:
-        k = key.strip('"').strip("'").strip()
-        if k:
-            return k
-
-    return None
+from Campus_event_notifier.database import get_db
+from Campus_event_notifier.metrics import registry
+from Campus_event_notifier.llm import llm, LLMUnavailable
+from Campus_event_notifier.singleflight import SingleFlight
+from Campus_event_notifier.recommender import recommender
+from Campus_event_notifier.snapshot import event_snapshot
+from Campus_event_notifier.chat_memory import Conversation
+from Campus_event_notifier.intents import parse_intent, answer as answer_intent
+from fastapi.concurrency import run_in_threadpool
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHAT_REPLIES = registry.counter(
+    "chat_replies_total",
+    "Chat replies by the path that produced them (local database answer, LLM, or fallback while the LLM is down)",
+    ("source",),
+)
+
+FALLBACK_REPLY = "I'm sorry, I'm having trouble accessing the event information right now. Please try again later or contact support if the problem persists."
 
 class EventChatbot:
     def __init__(self):
@@ -49,22 +40,10 @@ class EventChatbot:
         about a specific event, politely let them know and suggest alternatives.
         """
 
-    def get_upcoming_events(self, db: Session, limit: int = 10) -> List[Dict]:
-        """Get upcoming events from database"""
-        today = datetime.now().date()
-        events = db.query(Event).filter(
-            Event.date >= today.strftime("%Y-%m-%d")
-        ).order_by(Event.date).limit(limit).all()
-
-        return [
-            {
-                "name": event.name,
-                "date": event.date,
-                "location": event.location,
-                "description": event.description
-            }
-            for event in events
-        ]
+    async def get_upcoming_events(self, db: Session, limit: int = 10) -> List[Dict]:
+        """Get upcoming events from the in-memory event snapshot"""
+        snapshot = await event_snapshot.current_async(db.get_bind())
+        return snapshot.upcoming(limit=limit)
 
     def format_events_for_prompt(self, events: List[Dict]) -> str:
         """Format events list for AI prompt"""
@@ -80,73 +59,103 @@ class EventChatbot:
 
         return formatted
 
-    async def get_chat_response(self, user_message: str, db: Session) -> str:
+    async def get_chat_response(self, user_message: str, db: Session, history: str = "") -> str:
         """Generate AI response based on user message and event data"""
         try:
-            # Get upcoming events
-            events = self.get_upcoming_events(db)
+            # Get upcoming events, plus the ones most relevant to the question
+            events = await self.get_upcoming_events(db)
+            seen = {event["name"] for event in events}
+            suggestions = await run_in_threadpool(self.get_event_suggestions, user_message, db)
+            for event in suggestions:
+                if event["name"] not in seen:
+                    events.append(event)
+                    seen.add(event["name"])
 
             # Create context-aware prompt
             events_context = self.format_events_for_prompt(events)
 
+            conversation_context = f"Conversation so far:\n{history}\n" if history else ""
             prompt = f"""
             {self.system_prompt}
 
             Current events information:
             {events_context}
 
+            {conversation_context}
             User question: {user_message}
 
             Please provide a helpful, accurate response about the campus events based on the user's question.
             If they're asking about specific types of events or time periods, help them find relevant information.
             """
 
-            # Call Google Gemini API (configure with runtime key)
-            gem_key = _get_gemini_key()
-            if not gem_key:
-                print("⚠️ GEMINI_API_KEY missing when attempting to call Gemini")
+            # Call Google Gemini (deadline and circuit breaker shared with the agent)
+            try:
+                return await llm.generate(prompt, caller="chatbot")
+            except LLMUnavailable as e:
+                if e.reason != "not_configured":
+                    raise
+                logger.warning("GEMINI_API_KEY missing when attempting to call Gemini")
                 return "Error: GEMINI API key not configured on server."
-            genai.configure(api_key=gem_key)
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            response = model.generate_content(prompt)
-            if hasattr(response, 'text'):
-                return response.text.strip()
-            return str(response).strip()
 
+        except LLMUnavailable:
+            raise
         except Exception as e:
-            # Log detailed traceback for debugging
-            print(f"Error in chatbot: {e}")
-            traceback.print_exc()
+            logger.exception("Error in chatbot: %s", e)
             # Return a user-friendly error message; rely on Gemini only
-            return "I'm sorry, I'm having trouble accessing the event information right now. Please try again later or contact support if the problem persists."
+            return FALLBACK_REPLY
 
     def get_event_suggestions(self, user_interests: str, db: Session) -> List[Dict]:
         """Get event suggestions based on user interests"""
-        events = self.get_upcoming_events(db, limit=20)
+        return recommender.recommend(db, user_interests, k=5)
 
-        # Simple keyword matching for interests
-        interests = user_interests.lower().split()
-
-        scored_events = []
-        for event in events:
-            score = 0
-            event_text = f"{event['name']} {event['description']}".lower()
-
-            for interest in interests:
-                if interest in event_text:
-                    score += 1
-
-            if score > 0:
-                scored_events.append((event, score))
-
-        # Sort by relevance score
-        scored_events.sort(key=lambda x: x[1], reverse=True)
-
-        return [event for event, score in scored_events[:5]]
+    def get_fallback_response(self, user_message: str, db: Session) -> str:
+        """Best local answer while the LLM is unavailable: the most relevant upcoming events"""
+        # Called through run_in_threadpool, so the snapshot check may block here
+        events = self.get_event_suggestions(user_message, db) or event_snapshot.current(db.get_bind()).upcoming(limit=5)
+        if not events:
+            return FALLBACK_REPLY
+        lines = ["The AI assistant is unavailable right now, but these upcoming events may help:"]
+        lines.extend(f"• {e['name']} — {e['date']}, {e['location']}" for e in events)
+        return "\n".join(lines)
 
 # Global chatbot instance
 chatbot = EventChatbot()
 
-async def get_chatbot_response(user_message: str, db: Session) -> str:
-    """Helper function to get chatbot response"""
-    return await chatbot.get_chat_response(user_message, db)
+# Identical questions asked concurrently share one Gemini call
+chat_flight = SingleFlight("chat")
+
+def normalize_question(message: str) -> str:
+    """Normalize a question so trivially different phrasings share a key"""
+    message = re.sub(r"\s+", " ", message.lower()).strip()
+    return message.rstrip("?!. ")
+
+class ChatReply(NamedTuple):
+    text: str
+    source: str  # "local" (answered from the database), "llm", or "fallback" (LLM unavailable)
+
+async def get_chatbot_response(user_message: str, db: Session, conversation: Optional[Conversation] = None) -> ChatReply:
+    """Helper function to get chatbot response, remembering the exchange in `conversation`"""
+    # Structured questions (dates, places, categories, names) are answered from the database
+    intent = parse_intent(user_message)
+    response = await run_in_threadpool(answer_intent, db, intent) if intent is not None else None
+    source = "local"
+    if response is None:
+        source = "llm"
+        try:
+            if conversation is not None and conversation.has_history():
+                # Follow-ups depend on their own history, so they can't share an answer
+                response = await chatbot.get_chat_response(user_message, db, conversation.render())
+            else:
+                response = await chat_flight.do(
+                    normalize_question(user_message),
+                    lambda: chatbot.get_chat_response(user_message, db)
+                )
+        except LLMUnavailable as e:
+            # Breaker open, deadline passed or Gemini erroring: answer from the index instead
+            logger.info("Chat falling back to local suggestions (%s)", e.reason)
+            response = await run_in_threadpool(chatbot.get_fallback_response, user_message, db)
+            source = "fallback"
+    CHAT_REPLIES.labels(source=source).inc()
+    if conversation is not None and source != "fallback" and not response.startswith("Error:") and response != FALLBACK_REPLY:
+        conversation.add_turn(user_message, response)
+    return ChatReply(response, source)
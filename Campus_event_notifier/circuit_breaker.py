@@ -0,0 +1,127 @@
+"""
+Circuit Breaker Module
+Stops calling a dependency that keeps failing. After `failure_threshold`
+consecutive failures (slow calls count as failures) the breaker opens and
+callers fail fast for `open_seconds`; it then lets a few probe calls
+through (half-open) and closes again on the first success.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from Campus_event_notifier.metrics import registry
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Gauge values, ordered by severity
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = registry.gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ("breaker",),
+)
+BREAKER_TRANSITIONS = registry.counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes",
+    ("breaker", "state"),
+)
+BREAKER_REJECTIONS = registry.counter(
+    "circuit_breaker_rejections_total",
+    "Calls refused without trying because the breaker was open",
+    ("breaker",),
+)
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the dependency while the breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a timed open state and limited half-open probes"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, slow_call_seconds: Optional[float] = None,
+                 open_seconds: float = 30.0, half_open_probes: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        BREAKER_STATE.labels(breaker=name).set(STATE_VALUES[CLOSED])
+
+    def _transition(self, state: str):
+        if state == self._state:
+            return
+        self._state = state
+        if state == OPEN:
+            self._opened_at = self.clock()
+        if state != HALF_OPEN:
+            self._probes = 0
+        BREAKER_STATE.labels(breaker=self.name).set(STATE_VALUES[state])
+        BREAKER_TRANSITIONS.labels(breaker=self.name, state=state).inc()
+
+    def _current(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current()
+
+    def acquire(self) -> bool:
+        """Admit one call or raise CircuitOpen; returns True if the call is a half-open probe"""
+        with self._lock:
+            state = self._current()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            BREAKER_REJECTIONS.labels(breaker=self.name).inc()
+            retry_after = max(0.0, self._opened_at + self.open_seconds - self.clock()) if state == OPEN else 1.0
+            raise CircuitOpen(self.name, retry_after)
+
+    def record_success(self, elapsed: float = 0.0, probe: bool = False):
+        """Report a completed call; one slower than slow_call_seconds counts as a failure"""
+        if self.slow_call_seconds is not None and elapsed > self.slow_call_seconds:
+            self.record_failure(probe)
+            return
+        with self._lock:
+            if probe:
+                self._probes = max(0, self._probes - 1)
+            self._failures = 0
+            # A call admitted before the breaker opened doesn't prove it recovered
+            if self._current() != OPEN:
+                self._transition(CLOSED)
+
+    def release(self, probe: bool = False):
+        """Give back a probe slot for a call that ended without a verdict (e.g. cancelled)"""
+        if probe:
+            with self._lock:
+                self._probes = max(0, self._probes - 1)
+
+    def record_failure(self, probe: bool = False):
+        """Report a failed call"""
+        with self._lock:
+            if probe:
+                self._probes = max(0, self._probes - 1)
+            self._failures += 1
+            # A failed probe reopens at once; otherwise wait for the threshold
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._transition(OPEN)
@@ -0,0 +1,58 @@
+"""
+Data Version Module
+Tells in-memory indexes when another connection (another worker, a CLI,
+a bulk script) has committed to the database. SQLite's
+`PRAGMA data_version` changes on a connection whenever any *other*
+connection commits, so it is read on a dedicated connection that never
+writes. Commits made through this process's own sessions are reported
+by the indexes' after_commit hooks instead.
+"""
+
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DataVersionWatcher:
+    """PRAGMA data_version on a dedicated connection to one engine"""
+
+    def __init__(self):
+        self._bind = None
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def read(self, bind) -> Optional[int]:
+        """The current data_version, or None if it can't be read (callers should then reload)"""
+        if bind.dialect.name != "sqlite":
+            return None
+        with self._lock:
+            if bind is not self._bind:
+                self._close()
+                self._bind = bind
+            try:
+                if self._connection is None:
+                    self._connection = bind.raw_connection()
+                cursor = self._connection.cursor()
+                try:
+                    cursor.execute("PRAGMA data_version")
+                    return cursor.fetchone()[0]
+                finally:
+                    cursor.close()
+            except Exception:
+                logger.warning("Could not read data_version", exc_info=True)
+                self._close()
+                return None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
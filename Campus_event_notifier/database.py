@@ -1,10 +1,17 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Index, LargeBinary, Boolean, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta
 import json
+import logging
 import os
 
+from Campus_event_notifier.metrics import instrument_engine
+from Campus_event_notifier import query_profiler
+from Campus_event_notifier.minhash import NearDuplicateIndex, event_fingerprint_text
+
+logger = logging.getLogger(__name__)
+
 # Database setup
 DATABASE_URL = "sqlite:///./campus_events.db"
 engine = create_engine(
@@ -20,6 +27,9 @@ engine = create_engine(
     pool_recycle=1800,  # Reduced recycle time
     pool_timeout=10  # Added pool timeout
 )
+instrument_engine(engine)
+if query_profiler.is_enabled():
+    query_profiler.install_query_profiler(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -46,6 +56,9 @@ class Event(Base):
     description = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Supports keyset pagination ordered by (date, id)
+    __table_args__ = (Index("ix_events_date_id", "date", "id"),)
+
     @classmethod
     def create_sample_events(cls, db):
         # Add sample events if none exist
@@ -162,9 +175,137 @@ class ChatMessage(Base):
     response = Column(Text, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    # Retention moves old messages out by age
+    __table_args__ = (Index("ix_chat_messages_timestamp", "timestamp"),)
+
+# Past events moved out of `events` by retention.py
+class ArchivedEvent(Base):
+    __tablename__ = "archived_events"
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, nullable=False, index=True)  # id it had in `events` (SQLite may reuse it)
+    name = Column(String, nullable=False)
+    date = Column(String, nullable=False)
+    location = Column(String, nullable=False)
+    description = Column(Text, nullable=False)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_archived_events_date_id", "date", "event_id"),)
+
+# Old chat history moved out of `chat_messages` by retention.py
+class ArchivedChatMessage(Base):
+    __tablename__ = "archived_chat_messages"
+
+    id = Column(Integer, primary_key=True)
+    message_id = Column(Integer, nullable=False)  # id it had in `chat_messages`
+    user_id = Column(Integer, nullable=False)
+    message = Column(Text, nullable=False)
+    response = Column(Text, nullable=False)
+    timestamp = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_archived_chat_messages_user_timestamp", "user_id", "timestamp"),)
+
+# Outbound emails that failed permanently or ran out of retries
+class DeadLetter(Base):
+    __tablename__ = "dead_letters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String, nullable=False, index=True)
+    subject = Column(String)
+    smtp_code = Column(Integer)
+    reason = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False, default=1)
+    message = Column(LargeBinary)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# Newsletter subscribers and how often they want to hear from us
+class Subscriber(Base):
+    __tablename__ = "subscribers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String, unique=True, index=True, nullable=False)
+    digest_frequency = Column(String, nullable=False, default="daily")  # immediate, daily or weekly
+    interest_mask = Column(Integer, nullable=False, default=0, server_default="0")  # categories.CATEGORY_BITS; 0 = all
+    active = Column(Boolean, nullable=False, default=True)
+    last_digest_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_subscribers_frequency_active", "digest_frequency", "active"),)
+
+# Persisted chunks of the subscriber interest bitmaps (see interests.py)
+class InterestBitmap(Base):
+    __tablename__ = "interest_bitmaps"
+
+    key = Column(String, primary_key=True)
+    chunk = Column(Integer, primary_key=True)
+    bits = Column(LargeBinary, nullable=False)
+
+# Per-day event totals for the calendar view (maintained by event_calendar.py)
+class EventDayCount(Base):
+    __tablename__ = "event_day_counts"
+
+    day = Column(String, primary_key=True)  # YYYY-MM-DD
+    count = Column(Integer, nullable=False, default=0)
+    categories = Column(Text, nullable=False, default="{}")  # JSON: category -> count
+    event_ids = Column(Text, nullable=False, default="[]")  # JSON: first few ids by (date, id)
+
+# Background jobs run after the request returns (see jobs.py)
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    payload = Column(Text, nullable=False, default="{}")  # JSON arguments for the handler
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String)
+    locked_until = Column(DateTime)  # a running job whose lock has lapsed is claimed again
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_jobs_status_run_after", "status", "run_after"),)
+
+# Log of event writes that other workers' in-memory indexes follow (see event_changes.py)
+class EventChange(Base):
+    __tablename__ = "event_changes"
+
+    seq = Column(Integer, primary_key=True)
+    event_id = Column(Integer, nullable=False)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Never reuse a seq after pruning, or followers would skip the new rows
+    __table_args__ = ({"sqlite_autoincrement": True},)
+
 # Create tables
 Base.metadata.create_all(bind=engine)
 
+def ensure_columns():
+    """Add columns declared after a table already existed (create_all skips them)"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.server_default is not None:
+                    column_type = column.type.compile(engine.dialect)
+                    default = column.server_default.arg
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type} NOT NULL DEFAULT {default}'))
+
+ensure_columns()
+
+def ensure_indexes():
+    """Create indexes declared after a table already existed (create_all skips them)"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+ensure_indexes()
+
 def get_db():
     db = SessionLocal()
     try:
@@ -173,52 +314,120 @@ def get_db():
         db.close()
 
 # Migration function to import existing events from db.json
-def migrate_events_from_json():
-    """Import events from db.json to database, adding new ones if they don't exist"""
-    db = SessionLocal()
+def migrate_events_from_json(duplicate_policy: str = None, path: str = None, session_factory=SessionLocal):
+    """Import events from db.json to database, adding new ones if they don't exist
+
+    Near-duplicates of existing (or earlier imported) events are handled per
+    `duplicate_policy` (default from IMPORT_DUPLICATE_POLICY): "skip" leaves
+    them out, "merge" folds them into the matching event, "keep" imports them.
+    """
+    duplicate_policy = (duplicate_policy or os.getenv("IMPORT_DUPLICATE_POLICY", "skip")).lower()
+    db = session_factory()
     try:
         # Load events from JSON
-        db_json_path = os.path.join(os.path.dirname(__file__), "db.json")
+        db_json_path = path or os.path.join(os.path.dirname(__file__), "db.json")
         if os.path.exists(db_json_path):
             with open(db_json_path, "r") as f:
                 events_data = json.load(f)
 
-            # Get existing event names
-            existing_names = {event.name for event in db.query(Event).all()}
+            # One scan of existing events serves the name check, dedupe index and date fix-up
+            existing_events = db.query(Event).all()
+            existing_names = {event.name for event in existing_events}
+            events_by_key = {event.id: event for event in existing_events}
+            duplicates = NearDuplicateIndex()
+            for event in existing_events:
+                duplicates.add(event.id, event_fingerprint_text(event.name, event.description, event.location))
 
             # Import new events
             added_count = 0
-            for event_data in events_data:
-                if event_data["name"] not in existing_names:
-                    event = Event(
-                        name=event_data["name"],
-                        date=event_data["date"],
-                        location=event_data["location"],
-                        description=event_data["description"]
-                    )
-                    db.add(event)
-                    added_count += 1
+            skipped = []
+            merged = []
+            for index, event_data in enumerate(events_data):
+                if event_data["name"] in existing_names:
+                    continue
+                fingerprint = event_fingerprint_text(
+                    event_data["name"], event_data["description"], event_data["location"]
+                )
+                matches = duplicates.query(fingerprint)
+                if matches and duplicate_policy != "keep":
+                    match = events_by_key[matches[0][0]]
+                    if duplicate_policy == "merge":
+                        _merge_event(match, event_data)
+                        merged.append((event_data["name"], match.name))
+                    else:
+                        skipped.append((event_data["name"], match.name))
+                    continue
+
+                event = Event(
+                    name=event_data["name"],
+                    date=event_data["date"],
+                    location=event_data["location"],
+                    description=event_data["description"]
+                )
+                db.add(event)
+                existing_names.add(event.name)
+                # Catch duplicates within the import file itself
+                key = f"import:{index}"
+                events_by_key[key] = event
+                duplicates.add(key, fingerprint)
+                added_count += 1
 
             # Update existing events' dates to future if they are in 2024
             updated_count = 0
-            for event in db.query(Event).all():
+            for event in existing_events:
                 if event.date.startswith('2024'):
                     event.date = event.date.replace('2024', '2025')
                     updated_count += 1
 
-            if updated_count > 0:
+            for name, match in skipped:
+                logger.info("Skipped likely duplicate '%s' (matches '%s')", name, match)
+            for name, match in merged:
+                logger.info("Merged likely duplicate '%s' into '%s'", name, match)
+
+            if updated_count > 0 or added_count > 0 or merged:
                 db.commit()
-                print(f"Updated {updated_count} events' dates to 2025")
+            if updated_count > 0:
+                logger.info("Updated %d events' dates to 2025", updated_count)
 
             if added_count > 0:
-                db.commit()
-                print(f"Successfully added {added_count} new events from db.json to database")
+                logger.info("Added %d new events from db.json to database", added_count)
             else:
-                print("No new events to add")
+                logger.info("No new events to add")
+    except Exception as e:
+        logger.exception("Error migrating events: %s", e)
+    finally:
+        db.close()
+
+def _merge_event(existing: Event, incoming: dict):
+    """Fold an imported near-duplicate into an existing event"""
+    if incoming.get("date") and incoming["date"] > existing.date:
+        existing.date = incoming["date"]
+    if len(incoming.get("description") or "") > len(existing.description or ""):
+        existing.description = incoming["description"]
+    if not existing.location and incoming.get("location"):
+        existing.location = incoming["location"]
+
+def migrate_subscribers_from_file(path: str = None):
+    """Import addresses from the old subscribers.txt into the subscribers table"""
+    path = path or os.path.join(os.path.dirname(__file__), "subscribers.txt")
+    if not os.path.exists(path):
+        return
+    db = SessionLocal()
+    try:
+        with open(path) as f:
+            emails = {line.strip().lower() for line in f if line.strip()}
+        known = {email for (email,) in db.query(Subscriber.email).filter(Subscriber.email.in_(emails))}
+        for email in sorted(emails - known):
+            db.add(Subscriber(email=email))
+        if emails - known:
+            db.commit()
+            logger.info("Imported %d subscribers from %s", len(emails - known), path)
     except Exception as e:
-        print(f"Error migrating events: {e}")
+        db.rollback()
+        logger.exception("Error migrating subscribers: %s", e)
     finally:
         db.close()
 
 # Initialize database with migration
 migrate_events_from_json()
+migrate_subscribers_from_file()
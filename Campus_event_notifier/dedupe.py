@@ -0,0 +1,48 @@
+"""
+Near-Duplicate Detection Module
+Keeps a MinHash/LSH index of every event (name, description, location) in
+sync with the events table, for duplicate checks and cluster reports.
+Committed event writes from any worker are applied before each lookup,
+read from the event_changes log (see event_changes.py).
+"""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from Campus_event_notifier.database import Event
+from Campus_event_notifier.event_changes import EventIndexSync
+from Campus_event_notifier.minhash import NearDuplicateIndex, event_fingerprint_text
+
+
+class EventDuplicateDetector:
+    """Keeps a NearDuplicateIndex of all events in sync with the events table"""
+
+    def __init__(self):
+        self._events = EventIndexSync(
+            NearDuplicateIndex,
+            upsert=lambda index, row: index.add(row.id, event_fingerprint_text(row.name, row.description, row.location)),
+            remove=NearDuplicateIndex.remove,
+            columns=(Event.name, Event.description, Event.location),
+        )
+
+    @property
+    def index(self) -> NearDuplicateIndex:
+        return self._events.index
+
+    def sync(self, db: Session):
+        """Apply event writes committed since the last call (see EventIndexSync)"""
+        self._events.sync(db)
+
+    def find_duplicates(self, db: Session, name: str, description: str, location: str,
+                        exclude_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        self.sync(db)
+        return self.index.query(event_fingerprint_text(name, description, location), exclude=exclude_id)
+
+    def duplicate_clusters(self, db: Session, threshold: Optional[float] = None) -> List[List[int]]:
+        self.sync(db)
+        return self.index.clusters(threshold)
+
+
+# Global detector instance
+duplicate_detector = EventDuplicateDetector()
@@ -0,0 +1,207 @@
+"""
+Delivery Module
+Paces outbound mail with a token bucket per recipient domain, retries
+transient SMTP failures (4xx, dropped connections) with jittered
+exponential backoff, and records permanent failures (5xx, or retries
+exhausted) in the dead_letters table.
+
+Tunables (environment):
+    DELIVERY_DOMAIN_RATE / DELIVERY_DOMAIN_BURST   messages per second per domain
+    DELIVERY_MAX_ATTEMPTS                          attempts before dead-lettering
+    DELIVERY_RETRY_BASE_SECONDS / DELIVERY_RETRY_MAX_SECONDS   backoff bounds
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import random
+import smtplib
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from Campus_event_notifier.admission import RateLimiter
+from Campus_event_notifier.database import SessionLocal, DeadLetter
+from Campus_event_notifier.email_templates import CompiledEmail
+from Campus_event_notifier.metrics import SMTP_PHASE_SECONDS, registry
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_ATTEMPTS = registry.counter(
+    "email_delivery_attempts_total",
+    "Outbound email attempts by outcome",
+    ("outcome",),
+)
+DELIVERY_THROTTLE_SECONDS = registry.counter(
+    "email_delivery_throttle_seconds_total",
+    "Seconds spent waiting on per-domain rate limits or retry backoff",
+)
+
+
+class TransientDeliveryError(Exception):
+    """A failure worth retrying later (4xx reply or lost connection)"""
+
+    def __init__(self, reason: str, code: Optional[int] = None):
+        super().__init__(reason)
+        self.code = code
+
+
+class PermanentDeliveryError(Exception):
+    """A failure that will not succeed on retry (5xx reply)"""
+
+    def __init__(self, reason: str, code: Optional[int] = None):
+        super().__init__(reason)
+        self.code = code
+
+
+def classify_smtp_error(error: Exception) -> Exception:
+    """Map an smtplib exception to a transient or permanent delivery error"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        code, reason = next(iter(error.recipients.values()))
+    elif isinstance(error, smtplib.SMTPResponseException):
+        code, reason = error.smtp_code, error.smtp_error
+    else:
+        # Disconnects, timeouts and socket errors: try again on a new connection
+        return TransientDeliveryError(str(error) or type(error).__name__)
+    if isinstance(reason, bytes):
+        reason = reason.decode(errors="replace")
+    if 400 <= code < 500:
+        return TransientDeliveryError(f"{code} {reason}", code)
+    return PermanentDeliveryError(f"{code} {reason}", code)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng=random) -> float:
+    """Full-jitter exponential backoff for the given (1-based) failed attempt"""
+    return rng.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+@dataclass
+class DeliveryReport:
+    sent: int = 0
+    retried: int = 0
+    dead_lettered: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class DeliveryScheduler:
+    """Sends one compiled message to many recipients, paced and retried"""
+
+    def __init__(self, domain_rate: float, domain_burst: float, max_attempts: int,
+                 retry_base: float, retry_max: float, session_factory=SessionLocal):
+        self.domain_limiter = RateLimiter(domain_rate, domain_burst)
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.session_factory = session_factory
+
+    def deliver(self, message: CompiledEmail, recipients: Iterable[str],
+                connect: Callable[[], smtplib.SMTP],
+                on_result: Optional[Callable[[str, bool], None]] = None) -> DeliveryReport:
+        """Deliver to every recipient over (at most) one connection at a time"""
+        report = DeliveryReport()
+        dead: List[DeadLetter] = []
+        order = itertools.count()
+        # (ready_at, tiebreak, email, attempt); recipients waiting on a domain
+        # bucket or a backoff don't hold up other domains
+        queue = [(0.0, next(order), email, 1) for email in recipients]
+        heapq.heapify(queue)
+        server = None
+
+        def give_up(email, attempt, error):
+            DELIVERY_ATTEMPTS.labels(outcome="dead_letter").inc()
+            report.dead_lettered.append((email, str(error)))
+            dead.append(DeadLetter(
+                email=email, subject=message.subject, smtp_code=getattr(error, "code", None),
+                reason=str(error), attempts=attempt, message=message.for_recipient(email),
+            ))
+            logger.warning("Giving up on %s after %d attempt(s): %s", email, attempt, error,
+                           extra={"smtp_code": getattr(error, "code", None)})
+            if on_result:
+                on_result(email, False)
+
+        try:
+            while queue:
+                ready_at, _, email, attempt = queue[0]
+                now = time.monotonic()
+                if ready_at > now:
+                    DELIVERY_THROTTLE_SECONDS.inc(ready_at - now)
+                    time.sleep(ready_at - now)
+                    continue
+                heapq.heappop(queue)
+
+                domain = email.rsplit("@", 1)[-1].lower()
+                wait = self.domain_limiter.acquire(domain)
+                if wait > 0:
+                    heapq.heappush(queue, (now + wait, next(order), email, attempt))
+                    continue
+
+                try:
+                    if server is None:
+                        try:
+                            server = connect()
+                        except smtplib.SMTPAuthenticationError as e:
+                            # Nothing will get through with bad credentials
+                            error = classify_smtp_error(e)
+                            for _, _, pending, tries in [(0, 0, email, attempt)] + queue:
+                                give_up(pending, tries, error)
+                            queue.clear()
+                            break
+                    with SMTP_PHASE_SECONDS.labels(phase="send").time():
+                        server.sendmail(message.sender, email, message.for_recipient(email))
+                except (smtplib.SMTPException, OSError) as e:
+                    error = classify_smtp_error(e)
+                    # A reply error leaves the session usable, except 421 (server closing)
+                    replied = isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused))
+                    if not replied or error.code == 421:
+                        server = _close_quietly(server)
+                    if isinstance(error, PermanentDeliveryError) or attempt >= self.max_attempts:
+                        give_up(email, attempt, error)
+                    else:
+                        DELIVERY_ATTEMPTS.labels(outcome="retry").inc()
+                        report.retried += 1
+                        delay = backoff_delay(attempt, self.retry_base, self.retry_max)
+                        heapq.heappush(queue, (time.monotonic() + delay, next(order), email, attempt + 1))
+                    continue
+
+                DELIVERY_ATTEMPTS.labels(outcome="sent").inc()
+                report.sent += 1
+                if on_result:
+                    on_result(email, True)
+        finally:
+            _close_quietly(server)
+            if dead:
+                record_dead_letters(dead, self.session_factory)
+        return report
+
+
+def _close_quietly(server: Optional[smtplib.SMTP]) -> None:
+    if server is not None:
+        try:
+            with SMTP_PHASE_SECONDS.labels(phase="quit").time():
+                server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+    return None
+
+
+def record_dead_letters(letters: List[DeadLetter], session_factory=SessionLocal):
+    """Persist dead letters in a single transaction"""
+    db = session_factory()
+    try:
+        db.add_all(letters)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to record %d dead letter(s)", len(letters))
+    finally:
+        db.close()
+
+
+# Global delivery scheduler instance
+delivery = DeliveryScheduler(
+    domain_rate=float(os.getenv("DELIVERY_DOMAIN_RATE", "10")),
+    domain_burst=float(os.getenv("DELIVERY_DOMAIN_BURST", "20")),
+    max_attempts=int(os.getenv("DELIVERY_MAX_ATTEMPTS", "4")),
+    retry_base=float(os.getenv("DELIVERY_RETRY_BASE_SECONDS", "1")),
+    retry_max=float(os.getenv("DELIVERY_RETRY_MAX_SECONDS", "60")),
+)
@@ -0,0 +1,196 @@
+"""
+Digest Module
+Batches event notifications per subscriber: immediate subscribers hear
+about new events on the next short sweep, daily and weekly subscribers
+get one digest of new and upcoming events per period.
+
+Every subscriber's event list comes from a single grouped query per run,
+and subscribers with the same list share one rendered message.
+
+A run works from one instant, `now`, in naive UTC like the created_at and
+last_digest_at columns it is compared with. Event dates are written in
+local time, so the lookahead starts from the local date at that instant.
+"""
+
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import String, and_, case, cast, func, or_
+from sqlalchemy.orm import Session
+
+from Campus_event_notifier.categories import category_bit_expression, interest_mask
+from Campus_event_notifier.database import SessionLocal, Event, Subscriber
+from Campus_event_notifier.email_templates import CompiledEmail, PUBLIC_BASE_URL, event_announcement, render_email
+from Campus_event_notifier.notification import send_bulk
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ("immediate", "daily", "weekly")
+DEFAULT_FREQUENCY = os.getenv("DIGEST_DEFAULT_FREQUENCY", "daily")
+
+# How far ahead each digest looks for upcoming events (new events are always included)
+LOOKAHEAD = {
+    "immediate": timedelta(0),
+    "daily": timedelta(days=1),
+    "weekly": timedelta(days=7),
+}
+PERIOD_NAMES = {"immediate": "latest", "daily": "daily", "weekly": "weekly"}
+
+# Subscriber ids per UPDATE when stamping last_digest_at
+UPDATE_CHUNK = 500
+
+
+def local_date(now: datetime) -> date:
+    """The local calendar date at a naive UTC instant"""
+    return now.replace(tzinfo=timezone.utc).astimezone().date()
+
+
+def normalize_frequency(value: Optional[str]) -> str:
+    """Validate a frequency choice, defaulting when none is given"""
+    value = (value or DEFAULT_FREQUENCY).strip().lower()
+    if value not in FREQUENCIES:
+        raise ValueError(f"frequency must be one of {', '.join(FREQUENCIES)}")
+    return value
+
+
+def upsert_subscriber(db: Session, email: str, frequency: Optional[str] = None,
+                      categories: Optional[List[str]] = None) -> Subscriber:
+    """Create or reactivate a subscriber, updating their frequency/interests if given"""
+    email = email.strip().lower()
+    mask = interest_mask(categories) if categories is not None else None
+    subscriber = db.query(Subscriber).filter(Subscriber.email == email).first()
+    if subscriber is None:
+        subscriber = Subscriber(email=email, digest_frequency=normalize_frequency(frequency), interest_mask=mask or 0)
+        db.add(subscriber)
+    else:
+        subscriber.active = True
+        if frequency:
+            subscriber.digest_frequency = normalize_frequency(frequency)
+        if mask is not None:
+            subscriber.interest_mask = mask
+    db.commit()
+    return subscriber
+
+
+@dataclass
+class DigestBatch:
+    """Subscribers who get exactly the same digest"""
+    events: List[Tuple[int, bool]]  # (event id, new since their last digest)
+    recipients: List[Tuple[int, str]] = field(default_factory=list)
+
+
+def collect_digests(db: Session, frequency: str, now: Optional[datetime] = None) -> Dict[tuple, DigestBatch]:
+    """Group due subscribers by the exact set of events their digest should contain"""
+    now = now or datetime.utcnow()
+    today = local_date(now)
+    # Daily covers today's events, weekly the next seven days; runs don't overlap
+    horizon = (today + LOOKAHEAD[frequency]).isoformat()
+    since = func.coalesce(Subscriber.last_digest_at, Subscriber.created_at)
+    is_new = Event.created_at > since
+
+    interested = or_(
+        Subscriber.interest_mask == 0,
+        Subscriber.interest_mask.op("&")(category_bit_expression(Event.location)) != 0,
+    )
+
+    # One set-based pass: upcoming events in the subscriber's categories that
+    # are new to them or fall inside the lookahead, one row per subscriber
+    entry = cast(Event.id, String) + ":" + cast(case((is_new, 1), else_=0), String)
+    rows = (
+        db.query(Subscriber.id, Subscriber.email, func.group_concat(entry))
+        .join(Event, and_(Event.date >= today.isoformat(), or_(Event.date < horizon, is_new), interested))
+        .filter(Subscriber.digest_frequency == frequency, Subscriber.active.is_(True))
+        .group_by(Subscriber.id, Subscriber.email)
+    )
+
+    batches: Dict[tuple, DigestBatch] = {}
+    for subscriber_id, email, entries in rows:
+        events = tuple(sorted(
+            (int(event_id), flag == "1")
+            for event_id, flag in (item.split(":") for item in entries.split(","))
+        ))
+        batch = batches.get(events)
+        if batch is None:
+            batch = batches[events] = DigestBatch(list(events))
+        batch.recipients.append((subscriber_id, email))
+    return batches
+
+
+def render_digest(frequency: str, events: List[Event], new_ids: set) -> CompiledEmail:
+    """Render one digest; a single new event for immediate subscribers is a plain announcement"""
+    if frequency == "immediate" and len(events) == 1:
+        event = events[0]
+        return event_announcement(event.name, event.date, event.location, event.description)
+    period = PERIOD_NAMES[frequency]
+    return render_email(
+        "digest", f"Your {period} Campus Events digest: {len(events)} event{'s' if len(events) != 1 else ''}",
+        period=period, base_url=PUBLIC_BASE_URL,
+        events=[
+            {"name": e.name, "date": e.date, "location": e.location,
+             "description": e.description, "is_new": e.id in new_ids}
+            for e in events
+        ],
+    )
+
+
+@dataclass
+class DigestRun:
+    frequency: str
+    subscribers: int = 0
+    messages_sent: int = 0
+    distinct_digests: int = 0
+    # What one email per event per subscriber would have cost
+    per_event_messages: int = 0
+
+
+def run_digest(frequency: str, now: Optional[datetime] = None, session_factory=SessionLocal) -> DigestRun:
+    """Collect, render and send every due digest for one frequency"""
+    frequency = normalize_frequency(frequency)
+    now = now or datetime.utcnow()
+    result = DigestRun(frequency)
+    db = session_factory()
+    try:
+        batches = collect_digests(db, frequency, now)
+        event_ids = {event_id for events in batches for event_id, _ in events}
+        events_by_id = {e.id: e for e in db.query(Event).filter(Event.id.in_(event_ids))} if event_ids else {}
+
+        delivered: List[int] = []
+        for events, batch in batches.items():
+            ordered = sorted((events_by_id[i] for i, _ in events if i in events_by_id), key=lambda e: (e.date, e.id))
+            if not ordered:
+                continue
+            message = render_digest(frequency, ordered, {i for i, new in events if new})
+            ids_by_email = {email: subscriber_id for subscriber_id, email in batch.recipients}
+
+            def on_result(email, ok, ids_by_email=ids_by_email):
+                if ok:
+                    delivered.append(ids_by_email[email])
+
+            result.distinct_digests += 1
+            result.subscribers += len(batch.recipients)
+            result.per_event_messages += len(batch.recipients) * len(ordered)
+            result.messages_sent += send_bulk(message, list(ids_by_email), on_result=on_result)
+
+        # Only subscribers who actually got their digest move their window forward
+        for start in range(0, len(delivered), UPDATE_CHUNK):
+            chunk = delivered[start:start + UPDATE_CHUNK]
+            db.query(Subscriber).filter(Subscriber.id.in_(chunk)).update(
+                {Subscriber.last_digest_at: now}, synchronize_session=False
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Digest run failed for %s subscribers", frequency)
+    finally:
+        db.close()
+
+    logger.info(
+        "%s digest: %d subscribers, %d distinct digests, %d sent (vs %d one-per-event)",
+        frequency, result.subscribers, result.distinct_digests, result.messages_sent, result.per_event_messages,
+        extra={"digest": frequency, "messages_sent": result.messages_sent},
+    )
+    return result
+
@@ -0,0 +1,184 @@
+"""
+Email Templates Module
+Renders each email once into a pre-encoded MIME message (plain-text and
+HTML alternatives) and fills in per-recipient fields with a byte join.
+
+Per-recipient fields are left in the rendered message as NUL-delimited
+markers, so a 20k-recipient blast serializes the MIME structure once and
+only joins a handful of byte segments per recipient.
+
+Bodies are quoted-printable, encoded here rather than by the email
+package so the markers survive intact: they never get split by a soft
+line break, and the values filled in are encoded the same way, keeping
+every line well under SMTP's 998-byte limit.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+from email.message import EmailMessage
+from email.policy import SMTP
+from email.utils import formatdate, make_msgid
+from functools import lru_cache
+from html import escape as html_escape
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+# Unsubscribe links are signed with the same key as the login JWTs
+from Campus_event_notifier.auth import SECRET_KEY
+
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000").rstrip("/")
+
+# Fields that differ per recipient; everything else is rendered once
+RECIPIENT_FIELDS = ("recipient_email", "unsubscribe_url")
+
+# Longest encoded line, counting the trailing "=" of a soft line break (RFC 2045)
+QP_LINE_LENGTH = 76
+
+_env = Environment(
+    loader=FileSystemLoader(str(Path(__file__).parent / "templates" / "email")),
+    autoescape=select_autoescape(["html"]),
+    keep_trailing_newline=True,
+)
+
+
+def _marker(part: str, field: str) -> str:
+    return f"\x00{part}:{field}\x00"
+
+
+def _qp_encode(text: str) -> str:
+    """Quoted-printable with CRLF line ends; markers are copied through and count as zero width"""
+    lines = []
+    for line in text.replace("\r\n", "\n").split("\n"):
+        out: List[str] = []
+        width = 0
+        pieces = line.split("\x00")
+        for index, piece in enumerate(pieces):
+            if index % 2:
+                out.append(f"\x00{piece}\x00")
+                continue
+            data = piece.encode("utf-8")
+            line_end = len(data) - 1 if index == len(pieces) - 1 else -1
+            for position, byte in enumerate(data):
+                if (33 <= byte <= 126 and byte != 61) or (byte in (9, 32) and position != line_end):
+                    token = chr(byte)
+                else:
+                    token = f"={byte:02X}"
+                if width + len(token) > QP_LINE_LENGTH - 1:
+                    out.append("=\r\n")
+                    width = 0
+                out.append(token)
+                width += len(token)
+        lines.append("".join(out))
+    return "\r\n".join(lines)
+
+
+def _qp_part(body: str, subtype: str) -> EmailMessage:
+    part = EmailMessage(policy=SMTP)
+    part["Content-Type"] = f'text/{subtype}; charset="utf-8"'
+    part["Content-Transfer-Encoding"] = "quoted-printable"
+    part.set_payload(_qp_encode(body))
+    return part
+
+
+def unsubscribe_token(email: str) -> str:
+    """Signed, URL-safe token identifying a subscriber"""
+    payload = base64.urlsafe_b64encode(email.strip().lower().encode()).rstrip(b"=")
+    signature = hmac.new(SECRET_KEY.encode(), payload, hashlib.sha256).digest()[:16]
+    return f"{payload.decode()}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode()}"
+
+
+def verify_unsubscribe_token(token: str) -> Optional[str]:
+    """Return the email address for a valid token, None otherwise"""
+    try:
+        payload, signature = token.split(".", 1)
+        expected = hmac.new(SECRET_KEY.encode(), payload.encode(), hashlib.sha256).digest()[:16]
+        given = base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4))
+        if not hmac.compare_digest(expected, given):
+            return None
+        return base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def unsubscribe_url(email: str) -> str:
+    return f"{PUBLIC_BASE_URL}/unsubscribe/{unsubscribe_token(email)}"
+
+
+class CompiledEmail:
+    """A serialized MIME message with per-recipient holes"""
+
+    __slots__ = ("subject", "sender", "_domain", "_literals", "_fields")
+
+    def __init__(self, subject: str, sender: str, raw: bytes):
+        self.subject = subject
+        self.sender = sender
+        self._domain = sender.rsplit("@", 1)[-1]
+        pieces = raw.split(b"\x00")
+        # Even pieces are literal bytes, odd pieces are "part:field" markers
+        self._literals: List[bytes] = pieces[0::2]
+        self._fields: List[Tuple[str, str]] = [tuple(p.decode().split(":", 1)) for p in pieces[1::2]]
+
+    def for_recipient(self, email: str, **extra: str) -> bytes:
+        """The complete message bytes for one recipient"""
+        email = email.replace("\r", "").replace("\n", "")
+        values = {"recipient_email": email, "unsubscribe_url": unsubscribe_url(email), **extra}
+        encoded: Dict[Tuple[str, str], bytes] = {}
+        # Envelope headers that must be unique per message go in front
+        header = f"To: {email}\r\nDate: {formatdate(localtime=True)}\r\nMessage-ID: {make_msgid(domain=self._domain)}\r\n"
+        chunks = [header.encode(), self._literals[0]]
+        for key, literal in zip(self._fields, self._literals[1:]):
+            value = encoded.get(key)
+            if value is None:
+                part, field = key
+                text = values.get(field, "")
+                value = encoded[key] = _qp_encode(html_escape(text) if part == "html" else text).encode()
+            chunks.append(value)
+            chunks.append(literal)
+        return b"".join(chunks)
+
+
+def compile_email(subject: str, text: str, html: Optional[str] = None,
+                  sender: Optional[str] = None) -> CompiledEmail:
+    """Encode a message once; text/html may contain markers from _marker()"""
+    sender = sender or os.getenv("EMAIL_USERNAME") or "noreply@localhost"
+    if html is None:
+        msg = _qp_part(text, "plain")
+    else:
+        msg = EmailMessage(policy=SMTP)
+        msg.make_alternative()
+        msg.attach(_qp_part(text, "plain"))
+        msg.attach(_qp_part(html, "html"))
+    msg["From"] = f"Campus Events <{sender}>"
+    msg["Subject"] = subject
+    msg["MIME-Version"] = "1.0"
+    return CompiledEmail(subject, sender, msg.as_bytes())
+
+
+def render_email(template: str, subject: str, **context) -> CompiledEmail:
+    """Render templates/email/<template>.txt (and .html if present) once"""
+    # NUL delimits the markers, so it must never come from event content
+    context = {k: v.replace("\x00", "") if isinstance(v, str) else v for k, v in context.items()}
+    rendered = {}
+    for part, suffix in (("text", ".txt"), ("html", ".html")):
+        name = template + suffix
+        if name not in _env.list_templates():
+            continue
+        markers = {field: _marker(part, field) for field in RECIPIENT_FIELDS}
+        rendered[part] = _env.get_template(name).render(**context, **markers)
+    return compile_email(subject, rendered["text"], rendered.get("html"))
+
+
+def event_announcement(name: str, date: str, location: str, description: str = "") -> CompiledEmail:
+    return render_email(
+        "event_announcement", f"Upcoming Event: {name}",
+        name=name, date=date, location=location, description=description,
+    )
+
+
+@lru_cache(maxsize=1)
+def welcome_email() -> CompiledEmail:
+    return render_email("welcome", "Welcome to Campus Events!")
@@ -0,0 +1,152 @@
+"""
+Event Calendar Module
+Materialized per-day event counts for the month calendar. Each event
+write recomputes the one or two days it touched from the (date, id)
+index, so a month view is a primary-key range read of at most 31 rows
+no matter how many events the month holds.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import event as sa_event, func, inspect as sa_inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from Campus_event_notifier.categories import get_event_category
+from Campus_event_notifier.database import Event, EventDayCount
+
+logger = logging.getLogger(__name__)
+
+# Event ids kept per day so the calendar can preview a day without another count
+DAY_EVENT_IDS = int(os.getenv("CALENDAR_DAY_EVENT_IDS", "3"))
+
+_DAY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_MONTH_RE = re.compile(r"^(\d{4})-(\d{2})$")
+
+# Events whose stored date starts with a calendar day (the rest can't be placed)
+_DATED = Event.date.op("GLOB")("[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*")
+
+
+def event_day(value) -> Optional[str]:
+    """The YYYY-MM-DD day of a stored event date, or None if it has none"""
+    match = _DAY_RE.match(str(value or ""))
+    if not match:
+        return None
+    try:
+        return date.fromisoformat(match.group(0)).isoformat()
+    except ValueError:
+        return None
+
+
+def month_bounds(month: str):
+    """Return the first day of a YYYY-MM month and of the month after, or raise ValueError"""
+    match = _MONTH_RE.match(month or "")
+    if not match:
+        raise ValueError("month must look like YYYY-MM")
+    first = date(int(match.group(1)), int(match.group(2)), 1)
+    following = (first + timedelta(days=32)).replace(day=1)
+    return first, following
+
+
+def refresh_day(connection, day: str):
+    """Recompute one day's row from the events table"""
+    next_day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+    rows = connection.execute(
+        select(Event.id, Event.location)
+        .where(Event.date >= day, Event.date < next_day)
+        .order_by(Event.date, Event.id)
+    ).all()
+    table = EventDayCount.__table__
+    if not rows:
+        connection.execute(table.delete().where(table.c.day == day))
+        return
+    categories: Dict[str, int] = {}
+    for _, location in rows:
+        category = get_event_category(location)
+        categories[category] = categories.get(category, 0) + 1
+    values = {
+        "count": len(rows),
+        "categories": json.dumps(categories, sort_keys=True),
+        "event_ids": json.dumps([event_id for event_id, _ in rows[:DAY_EVENT_IDS]]),
+    }
+    stmt = sqlite_insert(table).values(day=day, **values)
+    connection.execute(stmt.on_conflict_do_update(index_elements=["day"], set_=values))
+
+
+def rebuild(connection):
+    """Recompute every day from scratch"""
+    connection.execute(EventDayCount.__table__.delete())
+    days = connection.execute(select(func.substr(Event.date, 1, 10)).where(_DATED).distinct()).scalars()
+    for day in {event_day(value) for value in days} - {None}:
+        refresh_day(connection, day)
+
+
+class EventCalendar:
+    """Reads month views, rebuilding the table once if it has drifted from events"""
+
+    def __init__(self):
+        self._checked = False
+        self._lock = threading.Lock()
+
+    def ensure_consistent(self, bind):
+        """Rebuild once per process if totals don't match (e.g. rows written by bulk SQL)"""
+        if self._checked:
+            return
+        with self._lock:
+            if self._checked:
+                return
+            with bind.begin() as connection:
+                events = connection.execute(select(func.count()).select_from(Event).where(_DATED)).scalar()
+                counted = connection.execute(select(func.coalesce(func.sum(EventDayCount.count), 0))).scalar()
+                if events != counted:
+                    logger.info("Rebuilding event day counts (%d events, %d counted)", events, counted)
+                    rebuild(connection)
+            self._checked = True
+
+    def month(self, db, month: str) -> Dict:
+        """Per-day counts, categories and first event ids for one YYYY-MM month"""
+        first, following = month_bounds(month)
+        self.ensure_consistent(db.get_bind())
+        rows = db.query(EventDayCount).filter(
+            EventDayCount.day >= first.isoformat(), EventDayCount.day < following.isoformat()
+        ).order_by(EventDayCount.day).all()
+        days: List[Dict] = [
+            {
+                "date": row.day,
+                "count": row.count,
+                "categories": json.loads(row.categories),
+                "event_ids": json.loads(row.event_ids),
+            }
+            for row in rows
+        ]
+        return {"month": month, "total": sum(d["count"] for d in days), "days": days}
+
+
+# Global event calendar instance
+event_calendar = EventCalendar()
+
+
+@sa_event.listens_for(Event, "after_insert")
+@sa_event.listens_for(Event, "after_delete")
+def _refresh_event_day(mapper, connection, target):
+    day = event_day(target.date)
+    if day:
+        refresh_day(connection, day)
+
+
+@sa_event.listens_for(Event, "after_update")
+def _refresh_moved_event_days(mapper, connection, target):
+    state = sa_inspect(target)
+    date_history = state.attrs.date.history
+    if not (date_history.has_changes() or state.attrs.location.history.has_changes()):
+        return
+    # The event's current day, plus its old day if the update moved it
+    days = {event_day(target.date)}
+    days.update(event_day(value) for value in date_history.deleted or ())
+    for day in days - {None}:
+        refresh_day(connection, day)
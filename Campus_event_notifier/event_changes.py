@@ -0,0 +1,156 @@
+"""
+Event Changes Module
+Lets the in-memory event indexes (recommender, duplicate detector) follow
+event writes from every worker. Each ORM write to an event appends its id
+to the event_changes table in the same transaction, so a rolled-back
+write leaves nothing to apply. An index remembers the last seq it
+applied and reads the newer rows once a commit in this process
+(after_commit) or SQLite's data_version (any other connection) shows
+there may be some. EventIndexSync wraps that loop for an index that only
+needs to be told how to add/replace and remove one event.
+
+Retention prunes old rows; a follower whose position was pruned away is
+told to reload from scratch.
+"""
+
+import itertools
+import threading
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional, Set
+
+from sqlalchemy import delete, event as sa_event, func, insert, select
+from sqlalchemy.orm import Session, object_session
+
+from Campus_event_notifier.data_version import DataVersionWatcher
+from Campus_event_notifier.database import Event, EventChange
+
+# Bumped after every commit that logged an event change
+_generations = itertools.count(1)
+_write_generation = 0
+
+
+class EventChangeFollower:
+    """One index's position in the event_changes log"""
+
+    def __init__(self):
+        self._bind = None
+        self._seq: Optional[int] = None
+        self._generation: Optional[int] = None
+        self._data_version: Optional[int] = None
+        self._watcher = DataVersionWatcher()
+        self._lock = threading.Lock()
+
+    def reset(self, db: Session):
+        """Follow from the current end of the log; call just before a full load"""
+        connection = db.connection()
+        with self._lock:
+            self._bind = connection.engine
+            self._generation = _write_generation
+            self._data_version = self._watcher.read(self._bind)
+            self._seq = connection.execute(select(func.max(EventChange.seq))).scalar() or 0
+
+    def poll(self, db: Session) -> Optional[Set[int]]:
+        """Ids of events changed since the last poll, or None if the caller must reload everything"""
+        connection = db.connection()
+        with self._lock:
+            bind = connection.engine
+            if self._seq is None or bind is not self._bind:
+                return None
+            if db.info.get("event_changes_logged"):
+                # Rows this session has yet to commit (or roll back) must not be applied
+                return set()
+            generation = _write_generation
+            data_version = self._watcher.read(bind)
+            if generation == self._generation and data_version is not None and data_version == self._data_version:
+                return set()
+            oldest = connection.execute(select(func.min(EventChange.seq))).scalar()
+            if oldest is not None and oldest > self._seq + 1:
+                # Rows we hadn't applied yet were pruned
+                return None
+            rows = connection.execute(
+                select(EventChange.seq, EventChange.event_id)
+                .where(EventChange.seq > self._seq)
+                .order_by(EventChange.seq)
+            ).all()
+            self._generation, self._data_version = generation, data_version
+            if rows:
+                self._seq = rows[-1].seq
+            return {row.event_id for row in rows}
+
+
+class EventIndexSync:
+    """Keeps an in-memory index of events in step with the event_changes log.
+
+    `upsert(index, row)` adds or replaces one event from a row of `columns`
+    (plus Event.id); `remove(index, event_id)` drops a deleted one. A full
+    load fills a fresh `new_index()` and swaps it in, so readers never see
+    a half-built index.
+    """
+
+    batch_size = 500
+
+    def __init__(self, new_index: Callable[[], Any], upsert: Callable[[Any, Any], None],
+                 remove: Callable[[Any, int], None], columns: Iterable):
+        self.index = new_index()
+        self._new_index = new_index
+        self._upsert = upsert
+        self._remove = remove
+        self._columns = (Event.id, *columns)
+        self._changes = EventChangeFollower()
+        self._lock = threading.Lock()
+
+    def _rows(self, db: Session, ids: Optional[Iterable[int]] = None):
+        query = db.query(*self._columns)
+        if ids is not None:
+            query = query.filter(Event.id.in_(list(ids)))
+        return query.yield_per(1000)
+
+    def sync(self, db: Session):
+        """Build the index on first use, then apply event writes committed since the last call"""
+        with self._lock:
+            changed = self._changes.poll(db)
+            if changed is None:
+                self._changes.reset(db)
+                index = self._new_index()
+                for row in self._rows(db):
+                    self._upsert(index, row)
+                self.index = index
+                return
+            changed = sorted(changed)
+            for start in range(0, len(changed), self.batch_size):
+                ids = changed[start:start + self.batch_size]
+                found = set()
+                for row in self._rows(db, ids):
+                    self._upsert(self.index, row)
+                    found.add(row.id)
+                for event_id in set(ids) - found:
+                    self._remove(self.index, event_id)
+
+
+def prune_event_changes(db: Session, before: datetime) -> int:
+    """Delete log rows written before `before`; returns how many"""
+    pruned = db.execute(delete(EventChange).where(EventChange.changed_at < before)).rowcount
+    db.commit()
+    return pruned
+
+
+@sa_event.listens_for(Event, "after_insert")
+@sa_event.listens_for(Event, "after_update")
+@sa_event.listens_for(Event, "after_delete")
+def _log_event_change(mapper, connection, target):
+    connection.execute(insert(EventChange).values(event_id=target.id, changed_at=datetime.utcnow()))
+    session = object_session(target)
+    if session is not None:
+        session.info["event_changes_logged"] = True
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _changes_committed(session):
+    global _write_generation
+    if session.info.pop("event_changes_logged", None):
+        _write_generation = next(_generations)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _changes_rolled_back(session):
+    session.info.pop("event_changes_logged", None)
@@ -0,0 +1,81 @@
+"""
+Fragment Cache Module
+Caches rendered event cards and category sections keyed by event version,
+so pages are assembled by concatenating already-rendered HTML.
+"""
+
+import hashlib
+import threading
+from typing import Dict, Iterable, List
+
+from cachetools import LRUCache
+from markupsafe import Markup
+
+from Campus_event_notifier.metrics import record_cache_lookup
+
+EVENT_CARD_TEMPLATE = "partials/event_card.html"
+CATEGORY_SECTION_TEMPLATE = "partials/category_section.html"
+
+_VERSION_FIELDS = ("id", "name", "date", "location", "description")
+
+
+def event_version(event: Dict) -> str:
+    """Return a short fingerprint of the displayed fields of an event"""
+    digest = hashlib.blake2b(digest_size=8)
+    for field in _VERSION_FIELDS:
+        digest.update(str(event.get(field, "")).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class FragmentCache:
+    """LRU cache of rendered template fragments"""
+
+    def __init__(self, env, maxsize: int = 4096):
+        self.env = env
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def render(self, template_name: str, key, **context) -> Markup:
+        """Render a fragment, reusing the cached HTML for the same key"""
+        cache_key = (template_name, key)
+        with self._lock:
+            html = self._cache.get(cache_key)
+        record_cache_lookup("fragments", html is not None)
+        if html is None:
+            html = Markup(self.env.get_template(template_name).render(**context))
+            with self._lock:
+                self._cache[cache_key] = html
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def event_card(self, event: Dict, variant: str = "home") -> Markup:
+        """Render one event card; cached until the event's fields change"""
+        version = event.get("version") or event_version(event)
+        return self.render(EVENT_CARD_TEMPLATE, (variant, version), event=event, variant=variant)
+
+    def event_cards(self, events: Iterable[Dict], variant: str = "home") -> Markup:
+        """Concatenate the cached cards for a list of events"""
+        return Markup("").join(self.event_card(event, variant) for event in events)
+
+    def category_section(self, category: str, events: List[Dict], variant: str = "home") -> Markup:
+        """Render a category heading plus its cards; cached by the set of event versions"""
+        versions = tuple(event.get("version") or event_version(event) for event in events)
+        key = (variant, category, versions)
+        with self._lock:
+            html = self._cache.get((CATEGORY_SECTION_TEMPLATE, key))
+        if html is not None:
+            record_cache_lookup("fragments", True)
+            return html
+        cards_html = self.event_cards(events, variant)
+        return self.render(CATEGORY_SECTION_TEMPLATE, key, category=category, cards_html=cards_html)
+
+    def events_by_category(self, events_by_category: Dict[str, List[Dict]], variant: str = "home") -> Markup:
+        """Assemble the grouped event listing from cached section fragments"""
+        return Markup("").join(
+            self.category_section(category, events, variant)
+            for category, events in events_by_category.items()
+        )
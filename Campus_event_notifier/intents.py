@@ -0,0 +1,277 @@
+"""
+Intent Module
+Local parser for structured event questions: dates ("this Friday",
+"next week", "Dec 15"), places ("H-Block", "cricket ground"),
+categories ("tech events") and name lookups ("when is the cricket
+tournament"). Parsed questions are answered with one query over the
+(date, id) index; anything open-ended is left for the LLM.
+"""
+
+import calendar
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from Campus_event_notifier.categories import CATEGORY_BITS, CATEGORY_MAP, category_bit_expression
+from Campus_event_notifier.database import Event
+from Campus_event_notifier.recommender import STOPWORDS, stem
+from Campus_event_notifier.records import EventRecord, load_event_records, select_events
+
+# Most events listed in one local answer
+MAX_RESULTS = 8
+
+# Questions longer than this are treated as open-ended
+MAX_WORDS = 25
+
+WEEKDAYS = {name.lower(): i for i, name in enumerate(calendar.day_name)}
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+
+CATEGORY_WORDS = {
+    "tech": "Tech Events", "technology": "Tech Events", "technical": "Tech Events",
+    "sport": "Sports Events", "sports": "Sports Events",
+    "cultural": "Cultural & Photography Events", "culture": "Cultural & Photography Events",
+    "photography": "Cultural & Photography Events",
+    "engineering": "Engineering Events",
+    "academic": "Academic Events",
+}
+
+_OPEN_ENDED = re.compile(
+    r"\b(why|how (?:do|does|can|should)|should i|recommend|suggest|best|compare|explain|help me|"
+    r"what (?:do|would) you|opinion|worth)\b"
+)
+_UPCOMING = re.compile(r"\b(upcoming|what'?s on|coming up|any events|all events|list (?:the )?events)\b")
+_BLOCK = re.compile(r"\b([a-z])[\s-]?block\b")
+_NAME = re.compile(
+    r"\b(?:(?:when|where|what time) (?:is|are|does|will)|when'?s|where'?s|tell me (?:more )?about|"
+    r"details (?:on|of|for|about)|info(?:rmation)? (?:on|about))\s+(?:the\s+)?(?P<name>[^?!.]+)"
+)
+_NAME_TRAILER = re.compile(r"\s+(?:happening|held|taking place|start(?:ing)?|be|on)\s*$")
+
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_IN_DAYS = re.compile(r"\b(?:in|next|within) (\d{1,3}) days?\b")
+_WEEKDAY = re.compile(r"\b(?:(this|next|on|coming) )?(" + "|".join(WEEKDAYS) + r")\b")
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+_MONTH_DAY = re.compile(r"\b(" + _MONTH_NAMES + r")\.? (\d{1,2})(?:st|nd|rd|th)?\b")
+_DAY_MONTH = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)? (?:of )?(" + _MONTH_NAMES + r")\b")
+# "may" alone is too common a word; only "in May" counts
+_MONTH = re.compile(r"\b(?:(?:in|during) (may)|(" + "|".join(name for name in MONTHS if name != "may") + r"))\b")
+
+
+@dataclass
+class Intent:
+    """Slots parsed from a question; None means "not constrained" """
+    start: Optional[date] = None
+    end: Optional[date] = None  # inclusive
+    when: str = ""              # how the date range was phrased, for the reply
+    location: Optional[str] = None
+    category: Optional[str] = None
+    name: Optional[str] = None
+
+    def has_filters(self) -> bool:
+        return any((self.start, self.location, self.category))
+
+
+def _month_range(year: int, month: int):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _future_date(today: date, month: int, day: int) -> Optional[date]:
+    """The next month/day on or after today (this year or next)"""
+    try:
+        candidate = date(today.year, month, day)
+        return candidate if candidate >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+def parse_date_range(text: str, today: date):
+    """Return (start, end, phrase) for the first date expression in text, or None"""
+    week_start = today - timedelta(days=today.weekday())
+    if "day after tomorrow" in text:
+        day = today + timedelta(days=2)
+        return day, day, "the day after tomorrow"
+    if re.search(r"\b(today|tonight)\b", text):
+        return today, today, "today"
+    if "tomorrow" in text:
+        day = today + timedelta(days=1)
+        return day, day, "tomorrow"
+    if "next weekend" in text:
+        saturday = week_start + timedelta(days=12)
+        return saturday, saturday + timedelta(days=1), "next weekend"
+    if "weekend" in text:
+        saturday = week_start + timedelta(days=5)
+        return max(saturday, today), saturday + timedelta(days=1), "this weekend"
+    if "next week" in text:
+        monday = week_start + timedelta(days=7)
+        return monday, monday + timedelta(days=6), "next week"
+    if re.search(r"\bthis week\b", text):
+        return today, week_start + timedelta(days=6), "this week"
+    if "next month" in text:
+        year, month = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+        start, end = _month_range(year, month)
+        return start, end, "next month"
+    if "this month" in text:
+        return today, _month_range(today.year, today.month)[1], "this month"
+
+    match = _IN_DAYS.search(text)
+    if match:
+        days = int(match.group(1))
+        return today, today + timedelta(days=days), f"in the next {days} days"
+
+    match = _ISO_DATE.search(text)
+    if match:
+        try:
+            day = date(*map(int, match.groups()))
+            return day, day, f"on {day:%B %d, %Y}"
+        except ValueError:
+            pass
+
+    match = _MONTH_DAY.search(text) or _DAY_MONTH.search(text)
+    if match:
+        month_name, day_number = match.groups() if match.re is _MONTH_DAY else match.groups()[::-1]
+        day = _future_date(today, MONTHS[month_name], int(day_number))
+        if day:
+            return day, day, f"on {day:%B %d}"
+
+    match = _WEEKDAY.search(text)
+    if match:
+        modifier, name = match.groups()
+        day = today + timedelta(days=(WEEKDAYS[name] - today.weekday()) % 7)
+        if modifier == "next":
+            # "next Friday" skips the Friday still to come this week
+            if day <= week_start + timedelta(days=6):
+                day += timedelta(days=7)
+        return day, day, f"on {day:%A, %B %d}"
+
+    match = _MONTH.search(text)
+    if match:
+        month = MONTHS[match.group(1) or match.group(2)]
+        year = today.year if month >= today.month else today.year + 1
+        start, end = _month_range(year, month)
+        return max(start, today), end, f"in {calendar.month_name[month]}"
+    return None
+
+
+def parse_intent(message: str, today: Optional[date] = None) -> Optional[Intent]:
+    """Parse a structured event question, or return None to leave it to the LLM"""
+    text = " ".join(message.lower().split())
+    if not text or len(text.split()) > MAX_WORDS or _OPEN_ENDED.search(text):
+        return None
+    today = today or date.today()
+    intent = Intent()
+
+    date_range = parse_date_range(text, today)
+    if date_range:
+        intent.start, intent.end, intent.when = date_range
+
+    match = _BLOCK.search(text)
+    if match:
+        intent.location = f"{match.group(1)}-block"
+    else:
+        for keyword in CATEGORY_MAP:
+            if re.search(rf"\b{re.escape(keyword)}\b", text):
+                intent.location = keyword
+                break
+
+    if intent.location is None:
+        for word, category in CATEGORY_WORDS.items():
+            if re.search(rf"\b{word}\b", text):
+                intent.category = category
+                break
+
+    match = _NAME.search(text)
+    if match:
+        name = _NAME_TRAILER.sub("", match.group("name")).strip()
+        if name:
+            intent.name = name
+
+    if intent.has_filters() or intent.name or _UPCOMING.search(text):
+        return intent
+    return None
+
+
+def _name_terms(name: str) -> List[str]:
+    words = re.findall(r"[a-z0-9]+", name)
+    return [stem(w) for w in words if w not in STOPWORDS and w not in ("next", "upcoming")]
+
+
+def find_events(db: Session, intent: Intent, today: Optional[date] = None,
+                limit: int = MAX_RESULTS) -> List[EventRecord]:
+    """Events matching every slot of the intent, soonest first"""
+    today = today or date.today()
+    start = max(intent.start or today, today)
+    criteria = [Event.date >= start.isoformat()]
+    if intent.end is not None:
+        # Dates are stored as ISO strings, with or without a time part
+        criteria.append(Event.date < (intent.end + timedelta(days=1)).isoformat())
+    if intent.location:
+        criteria.append(func.lower(Event.location).contains(intent.location))
+    if intent.category:
+        criteria.append(category_bit_expression(Event.location) == CATEGORY_BITS[intent.category])
+    return load_event_records(db, select_events(*criteria).limit(limit))
+
+
+def find_by_name(db: Session, name: str, today: Optional[date] = None) -> List[EventRecord]:
+    """Upcoming events whose name contains every term of `name`"""
+    terms = _name_terms(name)
+    if not terms:
+        return []
+    today = today or date.today()
+    lowered = func.lower(Event.name)
+    statement = select_events(Event.date >= today.isoformat(), *[lowered.contains(term) for term in terms])
+    return load_event_records(db, statement.limit(3))
+
+
+def _format_date(value) -> str:
+    try:
+        return date.fromisoformat(str(value)[:10]).strftime("%a, %b %d")
+    except ValueError:
+        return str(value)
+
+
+def _describe(intent: Intent) -> str:
+    parts = []
+    if intent.category:
+        parts.append(intent.category.lower())
+    else:
+        parts.append("events")
+    if intent.location:
+        parts.append(f"at {intent.location.title() if '-' in intent.location else intent.location}")
+    if intent.when:
+        parts.append(intent.when)
+    elif not intent.start:
+        parts[0] = "upcoming " + parts[0]
+    return " ".join(parts)
+
+
+def answer(db: Session, intent: Intent, today: Optional[date] = None) -> Optional[str]:
+    """Answer a parsed question from the database, or None to defer to the LLM"""
+    if intent.name:
+        events = find_by_name(db, intent.name, today)
+        if events:
+            first = events[0]
+            reply = f"{first.name} is on {_format_date(first.date)} at {first.location}."
+            if first.description:
+                reply += f" {first.description}"
+            for other in events[1:]:
+                reply += f"\nAlso matching: {other.name} ({_format_date(other.date)}, {other.location})."
+            return reply
+        if not intent.has_filters():
+            # Probably not an event name after all; let the LLM interpret it
+            return None
+
+    events = find_events(db, intent, today)
+    description = _describe(intent)
+    if not events:
+        return f"I couldn't find any {description}."
+    lines = [f"Here are the {description}:"]
+    lines.extend(f"• {event.name} — {_format_date(event.date)}, {event.location}" for event in events)
+    if len(events) == MAX_RESULTS:
+        lines.append("Ask about a specific day or place to narrow this down.")
+    return "\n".join(lines)
@@ -0,0 +1,335 @@
+"""
+Interest Index Module
+Compressed bitmap index over subscriber ids for audience targeting:
+one bitmap per category, per digest frequency, for "wants everything"
+and for active subscribers. "Who should get this H-Block event?" is a
+couple of ORs and ANDs over those bitmaps instead of a scan.
+
+Bitmaps are split roaring-style into 65,536-id chunks held as Python
+ints; only non-empty chunks exist. A subscriber write sets or clears
+just that subscriber's bit in the affected chunks with a read-modify-write
+inside the same transaction (which already holds the write lock), so
+workers never overwrite each other's bits with a stale copy. Recomputing
+a whole chunk from the subscribers rows is kept for rebuilds and for rows
+whose previous settings weren't loaded. Each process reloads the persisted
+chunks before a read once its own commits, or SQLite's data_version
+(commits from other workers), show they changed.
+"""
+
+import itertools
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import event as sa_event, func, inspect as sa_inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from Campus_event_notifier.categories import CATEGORIES, CATEGORY_BITS
+from Campus_event_notifier.data_version import DataVersionWatcher
+from Campus_event_notifier.database import Subscriber, InterestBitmap
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BITS = 1 << 16
+CHUNK_BYTES = CHUNK_BITS // 8
+
+ALL_KEY = "all"            # every indexed subscriber (consistency check on load)
+ACTIVE_KEY = "active"
+EVERYTHING_KEY = "interest:*"  # interest_mask == 0
+
+_SETTINGS = ("active", "digest_frequency", "interest_mask")
+
+# Bumped after every commit that changed subscribers; loads from before it are stale
+_generations = itertools.count(1)
+_write_generation = 0
+
+
+def category_key(category: str) -> str:
+    return f"interest:{category}"
+
+
+def frequency_key(frequency: str) -> str:
+    return f"frequency:{frequency}"
+
+
+class Bitmap:
+    """Sparse set of non-negative ints stored as 65,536-bit chunks"""
+
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks: Optional[Dict[int, int]] = None):
+        self.chunks: Dict[int, int] = chunks or {}
+
+    def add(self, value: int) -> int:
+        chunk, bit = divmod(value, CHUNK_BITS)
+        self.chunks[chunk] = self.chunks.get(chunk, 0) | (1 << bit)
+        return chunk
+
+    def discard(self, value: int) -> int:
+        chunk, bit = divmod(value, CHUNK_BITS)
+        bits = self.chunks.get(chunk, 0) & ~(1 << bit)
+        if bits:
+            self.chunks[chunk] = bits
+        else:
+            self.chunks.pop(chunk, None)
+        return chunk
+
+    def __contains__(self, value: int) -> bool:
+        chunk, bit = divmod(value, CHUNK_BITS)
+        return bool(self.chunks.get(chunk, 0) >> bit & 1)
+
+    def __len__(self) -> int:
+        return sum(bits.bit_count() for bits in self.chunks.values())
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        chunks = dict(self.chunks)
+        for chunk, bits in other.chunks.items():
+            chunks[chunk] = chunks.get(chunk, 0) | bits
+        return Bitmap(chunks)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        chunks = {}
+        for chunk, bits in self.chunks.items():
+            both = bits & other.chunks.get(chunk, 0)
+            if both:
+                chunks[chunk] = both
+        return Bitmap(chunks)
+
+    def __iter__(self) -> Iterator[int]:
+        for chunk in sorted(self.chunks):
+            bits, base = self.chunks[chunk], chunk * CHUNK_BITS
+            while bits:
+                low = bits & -bits
+                yield base + low.bit_length() - 1
+                bits ^= low
+
+    def max(self) -> Optional[int]:
+        if not self.chunks:
+            return None
+        chunk = max(self.chunks)
+        return chunk * CHUNK_BITS + self.chunks[chunk].bit_length() - 1
+
+
+class InterestIndex:
+    """Bitmaps of subscriber ids, loaded from the persisted chunks"""
+
+    def __init__(self):
+        self.bitmaps: Dict[str, Bitmap] = {}
+        self._bind = None
+        self._generation: Optional[int] = None
+        self._data_version: Optional[int] = None
+        self._watcher = DataVersionWatcher()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def keys_for(active: bool, frequency: str, mask: int) -> Set[str]:
+        """Every bitmap a subscriber with these settings belongs to"""
+        keys = {ALL_KEY, frequency_key(frequency)}
+        if active:
+            keys.add(ACTIVE_KEY)
+        if not mask:
+            keys.add(EVERYTHING_KEY)
+        keys.update(category_key(c) for c in CATEGORIES if mask & CATEGORY_BITS[c])
+        return keys
+
+    @classmethod
+    def refresh_chunk(cls, connection, chunk: int):
+        """Recompute one chunk of every bitmap from the subscribers rows and persist it"""
+        low = chunk * CHUNK_BITS
+        rows = connection.execute(
+            select(Subscriber.id, Subscriber.active, Subscriber.digest_frequency, Subscriber.interest_mask)
+            .where(Subscriber.id >= low, Subscriber.id < low + CHUNK_BITS)
+        )
+        chunk_bits: Dict[str, int] = {}
+        for subscriber_id, active, frequency, mask in rows:
+            bit = 1 << (subscriber_id - low)
+            for key in cls.keys_for(active, frequency, mask or 0):
+                chunk_bits[key] = chunk_bits.get(key, 0) | bit
+        table = InterestBitmap.__table__
+        connection.execute(table.delete().where(table.c.chunk == chunk))
+        if chunk_bits:
+            connection.execute(table.insert(), [
+                {"key": key, "chunk": chunk, "bits": bits.to_bytes(CHUNK_BYTES, "little")}
+                for key, bits in chunk_bits.items()
+            ])
+
+    @staticmethod
+    def apply_bits(connection, changes: Dict[Tuple[str, int], List[int]]):
+        """Set and clear individual bits in the persisted chunks; changes maps (key, chunk) to [set, clear]"""
+        table = InterestBitmap.__table__
+        by_chunk: Dict[int, Dict[str, List[int]]] = {}
+        for (key, chunk), masks in changes.items():
+            by_chunk.setdefault(chunk, {})[key] = masks
+        for chunk, keys in sorted(by_chunk.items()):
+            stored = dict(connection.execute(
+                select(table.c.key, table.c.bits)
+                .where(table.c.chunk == chunk, table.c.key.in_(sorted(keys)))
+                .with_for_update()
+            ).all())
+            for key, (set_bits, clear_bits) in sorted(keys.items()):
+                old = int.from_bytes(stored[key], "little") if key in stored else 0
+                bits = (old | set_bits) & ~clear_bits
+                where = (table.c.key == key) & (table.c.chunk == chunk)
+                if key not in stored:
+                    if bits:
+                        connection.execute(table.insert().values(key=key, chunk=chunk,
+                                                                 bits=bits.to_bytes(CHUNK_BYTES, "little")))
+                elif not bits:
+                    connection.execute(table.delete().where(where))
+                elif bits != old:
+                    connection.execute(table.update().where(where).values(bits=bits.to_bytes(CHUNK_BYTES, "little")))
+
+    @classmethod
+    def rebuild(cls, connection):
+        """Recompute every chunk from the subscribers table"""
+        logger.info("Rebuilding subscriber interest bitmaps")
+        connection.execute(InterestBitmap.__table__.delete())
+        chunks = {subscriber_id // CHUNK_BITS for subscriber_id in connection.execute(select(Subscriber.id)).scalars()}
+        for chunk in sorted(chunks):
+            cls.refresh_chunk(connection, chunk)
+
+    @staticmethod
+    def _read(connection) -> Dict[str, Bitmap]:
+        bitmaps: Dict[str, Bitmap] = {}
+        for key, chunk, bits in connection.execute(
+                select(InterestBitmap.key, InterestBitmap.chunk, InterestBitmap.bits)):
+            bitmaps.setdefault(key, Bitmap()).chunks[chunk] = int.from_bytes(bits, "little")
+        return bitmaps
+
+    def ensure_loaded(self, connection) -> bool:
+        """Reload the persisted chunks if a commit here or elsewhere changed them; True if they had to be rebuilt"""
+        bind = connection.engine
+        with self._lock:
+            # Read both before the chunks so a commit racing the load triggers another one
+            generation = _write_generation
+            data_version = self._watcher.read(bind)
+            if (bind is self._bind and generation == self._generation
+                    and data_version is not None and data_version == self._data_version):
+                return False
+            bitmaps = self._read(connection)
+            count, max_id = connection.execute(select(func.count(Subscriber.id), func.max(Subscriber.id))).one()
+            indexed = bitmaps.get(ALL_KEY, Bitmap())
+            rebuilt = len(indexed) != count or indexed.max() != max_id
+            if rebuilt:
+                # Rows written behind the ORM's back (bulk SQL, or before the index existed)
+                self.rebuild(connection)
+                bitmaps = self._read(connection)
+            self.bitmaps = bitmaps
+            self._bind, self._generation, self._data_version = bind, generation, data_version
+            return rebuilt
+
+    def audience(self, db: Session, categories: List[str], frequency: Optional[str] = None) -> Bitmap:
+        """Active subscribers interested in any of `categories` (or in everything)"""
+        if self.ensure_loaded(db.connection()):
+            db.commit()  # keep the rebuilt chunks
+        with self._lock:
+            wanted = Bitmap(dict(self.bitmaps.get(EVERYTHING_KEY, Bitmap()).chunks))
+            for category in categories:
+                wanted = wanted | self.bitmaps.get(category_key(category), Bitmap())
+            audience = wanted & self.bitmaps.get(ACTIVE_KEY, Bitmap())
+            if frequency:
+                audience = audience & self.bitmaps.get(frequency_key(frequency), Bitmap())
+            return audience
+
+    @staticmethod
+    def emails(db: Session, audience: Bitmap, chunk_size: int = 900) -> Iterator[str]:
+        """Resolve a bitmap of subscriber ids to addresses, one IN query per chunk"""
+        ids = list(audience)
+        for start in range(0, len(ids), chunk_size):
+            rows = db.query(Subscriber.email).filter(Subscriber.id.in_(ids[start:start + chunk_size]))
+            for (email,) in rows:
+                yield email
+
+
+# Global interest index instance
+interest_index = InterestIndex()
+
+
+def _settings(state, previous: bool):
+    """The subscriber's (active, frequency, mask) before or after this flush; None if not loaded"""
+    values = []
+    for name in _SETTINGS:
+        if previous:
+            history = state.attrs[name].history
+            if history.deleted:
+                values.append(history.deleted[0])
+                continue
+            if history.added:
+                return None  # Overwritten without the old value ever being loaded
+        if name not in state.dict:
+            return None
+        values.append(state.dict[name])
+    active, frequency, mask = values
+    return InterestIndex.keys_for(bool(active), frequency, mask or 0)
+
+
+def _record_bits(target, old_keys: Optional[Set[str]], new_keys: Optional[Set[str]]):
+    session = object_session(target)
+    if session is None:
+        return
+    chunk, bit = divmod(target.id, CHUNK_BITS)
+    seen = session.info.setdefault("interest_ids", set())
+    if old_keys is None or new_keys is None or target.id in seen:
+        # Unknown previous settings, or the same id written twice in one flush
+        session.info.setdefault("interest_chunks", set()).add(chunk)
+        return
+    seen.add(target.id)
+    changes = session.info.setdefault("interest_bits", {})
+    mask = 1 << bit
+    for key in new_keys - old_keys:
+        masks = changes.setdefault((key, chunk), [0, 0])
+        masks[0] |= mask
+        masks[1] &= ~mask
+    for key in old_keys - new_keys:
+        masks = changes.setdefault((key, chunk), [0, 0])
+        masks[1] |= mask
+        masks[0] &= ~mask
+
+
+@sa_event.listens_for(Subscriber, "after_insert")
+def _subscriber_inserted(mapper, connection, target):
+    _record_bits(target, set(), _settings(sa_inspect(target), previous=False))
+
+
+@sa_event.listens_for(Subscriber, "after_delete")
+def _subscriber_deleted(mapper, connection, target):
+    _record_bits(target, _settings(sa_inspect(target), previous=True), set())
+
+
+@sa_event.listens_for(Subscriber, "after_update")
+def _subscriber_updated(mapper, connection, target):
+    state = sa_inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _SETTINGS):
+        _record_bits(target, _settings(state, previous=True), _settings(state, previous=False))
+
+
+@sa_event.listens_for(Session, "after_flush")
+def _apply_touched_bits(session, flush_context):
+    # Once per flush, in the flush's transaction, so a bulk insert reads and writes each blob once
+    changes = session.info.pop("interest_bits", None) or {}
+    chunks = session.info.pop("interest_chunks", None) or set()
+    session.info.pop("interest_ids", None)
+    if changes or chunks:
+        connection = session.connection()
+        InterestIndex.apply_bits(connection, {k: v for k, v in changes.items() if k[1] not in chunks})
+        for chunk in sorted(chunks):
+            InterestIndex.refresh_chunk(connection, chunk)
+        session.info["interest_index_changed"] = True
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _changes_committed(session):
+    global _write_generation
+    if session.info.pop("interest_index_changed", None):
+        _write_generation = next(_generations)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _changes_rolled_back(session):
+    # The chunks rolled back with the subscriber rows, but a read in between
+    # may have loaded the flushed bits, so reload on the next read
+    global _write_generation
+    for name in ("interest_bits", "interest_chunks", "interest_ids"):
+        session.info.pop(name, None)
+    if session.info.pop("interest_index_changed", None):
+        _write_generation = next(_generations)
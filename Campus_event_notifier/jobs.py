@@ -0,0 +1,298 @@
+"""
+Jobs Module
+A small persisted job queue for side effects that shouldn't hold up a
+request, such as welcome emails. Handlers enqueue a row in `jobs` and
+return; a pool of worker threads claims jobs with a conditional UPDATE,
+runs them and records the outcome, retrying failures with exponential
+backoff up to max_attempts.
+
+Execution is at-least-once: a claimed job holds a lock until
+JOB_LEASE_SECONDS, and a job whose worker died (or overran the lease)
+is claimed again once the lock lapses. Handlers must tolerate running
+twice. Every app worker may run a pool; claims are atomic across them.
+
+Tunables (environment):
+    JOB_WORKERS              worker threads per process, 0 to disable (default 2)
+    JOB_POLL_SECONDS         idle wait between queue checks (default 1)
+    JOB_LEASE_SECONDS        how long a claimed job stays locked (default 300)
+    JOB_MAX_ATTEMPTS         attempts before a job is marked failed (default 5)
+    JOB_RETRY_BASE_SECONDS   first retry delay, doubled per attempt (default 30)
+    JOB_RETRY_MAX_SECONDS    longest retry delay (default 3600)
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from Campus_event_notifier.database import SessionLocal, Job
+from Campus_event_notifier.email_templates import CompiledEmail, compile_email, welcome_email
+from Campus_event_notifier.metrics import registry
+from Campus_event_notifier.notification import send_bulk
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Claim attempts per poll when another worker wins the race for a job
+CLAIM_RETRIES = 3
+
+JOBS_FINISHED = registry.counter(
+    "jobs_finished_total",
+    "Job attempts by outcome (succeeded, retried, failed)",
+    ("kind", "outcome"),
+)
+JOB_SECONDS = registry.histogram(
+    "job_duration_seconds",
+    "Time spent running one job attempt",
+    ("kind",),
+)
+
+HANDLERS: Dict[str, Callable] = {}
+
+
+def job_handler(kind: str):
+    """Register the function that runs jobs of `kind`; it is called with the payload as keyword arguments"""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+class ClaimedJob(NamedTuple):
+    id: int
+    kind: str
+    payload: Dict
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    """The jobs table: enqueue, claim, and record outcomes"""
+
+    def __init__(self, session_factory=SessionLocal, lease_seconds: float = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS, retry_base: float = JOB_RETRY_BASE_SECONDS,
+                 retry_max: float = JOB_RETRY_MAX_SECONDS, clock: Callable[[], datetime] = datetime.utcnow):
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.clock = clock
+
+    def enqueue(self, db: Session, kind: str, payload: Optional[Dict] = None,
+                delay: float = 0.0, max_attempts: Optional[int] = None) -> int:
+        """Persist a job and return its id"""
+        if kind not in HANDLERS:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        now = self.clock()
+        job = Job(kind=kind, payload=json.dumps(payload or {}), status=QUEUED,
+                  max_attempts=max_attempts or self.max_attempts,
+                  run_after=now + timedelta(seconds=delay), created_at=now, updated_at=now)
+        db.add(job)
+        db.commit()
+        return job.id
+
+    def claim(self, worker_id: str) -> Optional[ClaimedJob]:
+        """Lock the next due job (or one whose lock has lapsed) for this worker"""
+        now = self.clock()
+        claimable = or_(
+            and_(Job.status == QUEUED, Job.run_after <= now),
+            and_(Job.status == RUNNING, Job.locked_until < now),
+        )
+        db = self.session_factory()
+        try:
+            for _ in range(CLAIM_RETRIES):
+                job_id = db.execute(
+                    select(Job.id).where(claimable).order_by(Job.run_after, Job.id).limit(1)
+                ).scalar()
+                if job_id is None:
+                    return None
+                # Only one worker's UPDATE matches while the job is still claimable
+                claimed = db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, claimable)
+                    .values(status=RUNNING, locked_by=worker_id,
+                            locked_until=now + timedelta(seconds=self.lease_seconds),
+                            attempts=Job.attempts + 1, updated_at=now)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                db.commit()
+                if claimed:
+                    row = db.execute(
+                        select(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts).where(Job.id == job_id)
+                    ).one()
+                    return ClaimedJob(row.id, row.kind, json.loads(row.payload or "{}"), row.attempts, row.max_attempts)
+            return None
+        finally:
+            db.close()
+
+    def _finish(self, job: ClaimedJob, worker_id: str, **values) -> bool:
+        db = self.session_factory()
+        try:
+            updated = db.execute(
+                update(Job)
+                .where(Job.id == job.id, Job.locked_by == worker_id, Job.status == RUNNING)
+                .values(locked_by=None, locked_until=None, updated_at=self.clock(), **values)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if not updated:
+            # The lock lapsed and another worker took the job over; its outcome wins
+            logger.warning("Job %d (%s) was reclaimed before %s finished it", job.id, job.kind, worker_id)
+        return bool(updated)
+
+    def complete(self, job: ClaimedJob, worker_id: str) -> bool:
+        return self._finish(job, worker_id, status=SUCCEEDED, last_error=None)
+
+    def fail(self, job: ClaimedJob, worker_id: str, error: str) -> str:
+        """Requeue with backoff, or mark failed after the last attempt; returns the new status"""
+        if job.attempts >= job.max_attempts:
+            self._finish(job, worker_id, status=FAILED, last_error=error)
+            return FAILED
+        delay = min(self.retry_max, self.retry_base * 2 ** (job.attempts - 1))
+        self._finish(job, worker_id, status=QUEUED, last_error=error,
+                     run_after=self.clock() + timedelta(seconds=delay))
+        return QUEUED
+
+    def run_one(self, worker_id: str) -> bool:
+        """Claim and run one job; False if none was due"""
+        job = self.claim(worker_id)
+        if job is None:
+            return False
+        if job.attempts > job.max_attempts:
+            # Reclaimed after its worker died on the final attempt
+            self._finish(job, worker_id, status=FAILED, last_error="Lock expired on the final attempt")
+            JOBS_FINISHED.labels(kind=job.kind, outcome=FAILED).inc()
+            return True
+        handler = HANDLERS.get(job.kind)
+        start = time.perf_counter()
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind '{job.kind}'")
+            handler(**job.payload)
+        except Exception as e:
+            status = self.fail(job, worker_id, f"{type(e).__name__}: {e}")
+            outcome = "retried" if status == QUEUED else FAILED
+            logger.warning("Job %d (%s) attempt %d/%d failed: %s", job.id, job.kind, job.attempts, job.max_attempts, e)
+        else:
+            self.complete(job, worker_id)
+            outcome = SUCCEEDED
+        JOB_SECONDS.labels(kind=job.kind).observe(time.perf_counter() - start)
+        JOBS_FINISHED.labels(kind=job.kind, outcome=outcome).inc()
+        return True
+
+    def status(self, db: Session, job_id: int) -> Optional[Dict]:
+        """Public view of a job's progress (no payload or error text), or None if unknown"""
+        job = db.get(Job, job_id)
+        if job is None:
+            return None
+        return {
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "attempts": job.attempts,
+            "max_attempts": job.max_attempts,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+            "next_attempt_at": job.run_after.isoformat() if job.status == QUEUED else None,
+        }
+
+
+class JobRunner:
+    """Worker threads that drain a JobQueue"""
+
+    def __init__(self, queue: JobQueue, workers: int = JOB_WORKERS, poll_seconds: float = JOB_POLL_SECONDS):
+        self.queue = queue
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        if self._threads or self.workers <= 0:
+            return
+        self._stop.clear()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(f"{prefix}:{index}",),
+                                      name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Started %d job workers", self.workers)
+
+    def wake(self):
+        """Have an idle worker check the queue now instead of at its next poll"""
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self, worker_id: str):
+        while not self._stop.is_set():
+            try:
+                ran = self.queue.run_one(worker_id)
+            except Exception:
+                logger.exception("Job worker %s failed to poll the queue", worker_id)
+                ran = False
+            if not ran:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+
+# Global job queue and runner instances
+job_queue = JobQueue()
+job_runner = JobRunner(job_queue)
+
+
+def enqueue(db: Session, kind: str, **payload) -> int:
+    """Queue a job for the background workers and return its id"""
+    job_id = job_queue.enqueue(db, kind, payload)
+    job_runner.wake()
+    return job_id
+
+
+def _send_once(email: str, message: CompiledEmail):
+    """Send one message; raise only if it may still get through on a later attempt"""
+    settled: Dict[str, bool] = {}
+    send_bulk(message, [email], on_result=settled.__setitem__)
+    if email not in settled:
+        # Never reached a verdict (mail not configured, or the send blew up)
+        raise RuntimeError("email could not be sent")
+    if not settled[email]:
+        # Delivery already retried it and wrote a dead letter; another job attempt would repeat that
+        logger.warning("'%s' to %s was dead-lettered; not retrying", message.subject, email)
+
+
+@job_handler("subscriber_welcome")
+def send_subscriber_welcome(email: str):
+    _send_once(email, welcome_email())
+
+
+@job_handler("account_welcome")
+def send_account_welcome(email: str):
+    _send_once(email, compile_email("Welcome!", "You have successfully registered for Campus Event Notifier!"))
@@ -0,0 +1,127 @@
+"""
+Leader Election Module
+Lease-based leader election over a SQLite lock row, so exactly one worker
+process runs singleton work such as the scheduler and reminder sweeps.
+
+The holder renews its lease with a heartbeat; if it dies, the lease
+expires after LEADER_LEASE_SECONDS and another worker takes over.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from Campus_event_notifier import shared_state
+from Campus_event_notifier.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", "30"))
+
+IS_LEADER = registry.gauge(
+    "leader_is_leader",
+    "1 if this worker currently holds the named lease",
+    ("lease",),
+)
+
+
+class LeaderLease:
+    """A named lease that at most one holder owns at a time"""
+
+    def __init__(self, name: str, ttl: float = LEASE_SECONDS, path: str = None,
+                 holder_id: Optional[str] = None, clock: Callable[[], float] = time.time):
+        self.name = name
+        self.ttl = ttl
+        self.path = path
+        self.clock = clock
+        self.holder_id = holder_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._expires_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._init_schema()
+
+    def _conn(self):
+        return shared_state.connect(self.path)
+
+    def _init_schema(self):
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    @property
+    def is_leader(self) -> bool:
+        # Stop acting as leader a little before the lease actually lapses
+        return self.clock() < self._expires_at - min(1.0, self.ttl / 10)
+
+    def try_acquire(self) -> bool:
+        """Take or renew the lease if it is free, expired, or already ours"""
+        now = self.clock()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at "
+                "WHERE leases.holder = excluded.holder OR leases.expires_at < ?",
+                (self.name, self.holder_id, now + self.ttl, now)
+            )
+            acquired = cursor.rowcount == 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._expires_at = now + self.ttl if acquired else 0.0
+        IS_LEADER.labels(lease=self.name).set(1 if acquired else 0)
+        return acquired
+
+    def release(self):
+        """Give up the lease so another worker can take over immediately"""
+        self._conn().execute(
+            "DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, self.holder_id)
+        )
+        self._expires_at = 0.0
+        IS_LEADER.labels(lease=self.name).set(0)
+
+    def current_holder(self) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT holder, expires_at FROM leases WHERE name = ?", (self.name,)
+        ).fetchone()
+        if row is None or row[1] < self.clock():
+            return None
+        return row[0]
+
+    def start_heartbeat(self, on_change: Callable[[bool], None] = None):
+        """Keep trying to acquire/renew the lease in a background thread"""
+        if self._thread is not None:
+            return
+
+        def run():
+            was_leader = False
+            while not self._stop.is_set():
+                try:
+                    leader = self.try_acquire()
+                except Exception as e:
+                    logger.warning("Lease heartbeat failed for %s: %s", self.name, e)
+                    leader = False
+                if leader != was_leader:
+                    logger.info("%s %s lease '%s'", self.holder_id, "acquired" if leader else "lost", self.name)
+                    if on_change:
+                        on_change(leader)
+                    was_leader = leader
+                self._stop.wait(self.ttl / 3)
+
+        self._thread = threading.Thread(target=run, name=f"lease-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop_heartbeat(self, release: bool = True):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if release:
+            self.release()
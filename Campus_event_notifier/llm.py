@@ -0,0 +1,209 @@
+"""
+LLM Module
+The one path to Gemini shared by the chatbot and the agent: API key
+lookup, a per-call deadline, an optional hedged second request, and a
+circuit breaker so an outage makes callers fail fast instead of each
+waiting out the SDK's own timeout.
+
+Tunables (environment):
+    GEMINI_MODEL                   model name (default gemini-2.0-flash)
+    LLM_TIMEOUT_SECONDS            overall deadline per call (default 20)
+    LLM_HEDGE_AFTER_SECONDS        send a second request if the first hasn't
+                                   answered by then (default 0 = never)
+    LLM_BREAKER_FAILURES           consecutive failures that open the breaker (default 5)
+    LLM_BREAKER_SLOW_SECONDS       successful calls slower than this count as failures (default 10)
+    LLM_BREAKER_OPEN_SECONDS       how long the breaker stays open (default 30)
+    LLM_BREAKER_HALF_OPEN_PROBES   calls let through to test recovery (default 1)
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from pathlib import Path
+from typing import Optional
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+from Campus_event_notifier.circuit_breaker import CircuitBreaker, CircuitOpen
+from Campus_event_notifier.metrics import registry, time_gemini_call
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+
+LLM_HEDGES = registry.counter(
+    "llm_hedged_requests_total",
+    "Second requests sent because the first was slow, by which one answered",
+    ("winner",),
+)
+
+
+def get_gemini_key() -> Optional[str]:
+    """Return a cleaned GEMINI_API_KEY from the environment, root .env or package .env"""
+    project_root = Path(__file__).parent.parent
+    for env_file in (project_root / ".env", Path(__file__).parent / ".env"):
+        # Root first; only use a key that's non-empty after stripping
+        load_dotenv(dotenv_path=env_file)
+        key = os.getenv("GEMINI_API_KEY")
+        if key:
+            key = key.strip('"').strip("'").strip()
+            if key:
+                return key
+    return None
+
+
+class LLMUnavailable(Exception):
+    """No answer from the LLM; `reason` is not_configured, circuit_open, timeout or error"""
+
+    def __init__(self, reason: str, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class GeminiBackend:
+    """Blocking calls to the Gemini SDK"""
+
+    def __init__(self, model: str = GEMINI_MODEL):
+        self.model = model
+
+    def configured(self) -> bool:
+        return get_gemini_key() is not None
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        genai.configure(api_key=get_gemini_key())
+        response = genai.GenerativeModel(self.model).generate_content(
+            prompt, request_options={"timeout": timeout}
+        )
+        if hasattr(response, "text"):
+            return response.text.strip()
+        return str(response).strip()
+
+
+class FakeLLM:
+    """Local stand-in for Gemini with injectable latency and faults (tests and benchmarks)"""
+
+    def __init__(self, reply: str = "OK", latency: float = 0.0, failure_rate: float = 0.0,
+                 hang_rate: float = 0.0, hang_seconds: float = 60.0, seed: Optional[int] = None):
+        self.reply = reply
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def configured(self) -> bool:
+        return True
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        self.calls += 1
+        roll = self._random.random()
+        if roll < self.hang_rate:
+            time.sleep(min(self.hang_seconds, timeout))
+            raise TimeoutError("fake LLM hung")
+        time.sleep(self.latency)
+        if roll < self.hang_rate + self.failure_rate:
+            raise RuntimeError("fake LLM failure")
+        return self.reply
+
+
+class LLMClient:
+    """Deadline, hedging and circuit breaking around one backend"""
+
+    def __init__(self, backend=None, breaker: Optional[CircuitBreaker] = None,
+                 timeout: float = 20.0, hedge_after: float = 0.0):
+        self.backend = backend or GeminiBackend()
+        self.breaker = breaker or CircuitBreaker("llm")
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+
+    def _call(self, prompt: str, caller: str) -> str:
+        with time_gemini_call(caller):
+            return self.backend.generate(prompt, self.timeout)
+
+    def _start(self, prompt: str, caller: str) -> asyncio.Future:
+        task = asyncio.ensure_future(asyncio.to_thread(self._call, prompt, caller))
+        # Abandoned attempts keep running in their thread; don't warn about their results
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _attempt(self, prompt: str, caller: str, hedge: bool) -> str:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        first = self._start(prompt, caller)
+        pending = {first}
+        hedged = False
+        if hedge and 0 < self.hedge_after < self.timeout:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_after)
+            if not done:
+                pending.add(self._start(prompt, caller))
+                hedged = True
+
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                if task.exception() is None:
+                    if hedged:
+                        LLM_HEDGES.labels(winner="first" if task is first else "hedge").inc()
+                    for other in pending:
+                        other.cancel()
+                    return task.result()
+                error = task.exception()
+
+        if pending:
+            for task in pending:
+                task.cancel()
+            raise asyncio.TimeoutError(f"no response within {self.timeout:g}s")
+        raise error
+
+    async def generate(self, prompt: str, caller: str) -> str:
+        """Return the model's reply or raise LLMUnavailable"""
+        if not self.backend.configured():
+            raise LLMUnavailable("not_configured", "GEMINI_API_KEY not configured on the server")
+        try:
+            probe = self.breaker.acquire()
+        except CircuitOpen as e:
+            raise LLMUnavailable("circuit_open", str(e), retry_after=e.retry_after) from e
+
+        start = time.perf_counter()
+        try:
+            # Probes test recovery with a single request; hedging would double the load
+            text = await self._attempt(prompt, caller, hedge=not probe)
+        except asyncio.TimeoutError as e:
+            self.breaker.record_failure(probe)
+            logger.warning("LLM call from %s timed out after %.1fs", caller, time.perf_counter() - start)
+            raise LLMUnavailable("timeout", str(e)) from e
+        except Exception as e:
+            self.breaker.record_failure(probe)
+            logger.warning("LLM call from %s failed: %s", caller, e)
+            raise LLMUnavailable("error", f"Gemini call failed: {e}") from e
+        except BaseException:
+            # Cancelled by the caller: says nothing about Gemini, but the probe slot must be freed
+            self.breaker.release(probe)
+            raise
+        self.breaker.record_success(time.perf_counter() - start, probe)
+        return text
+
+
+# Global LLM client instance
+llm = LLMClient(
+    breaker=CircuitBreaker(
+        "gemini",
+        failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+        slow_call_seconds=float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "10")),
+        open_seconds=float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30")),
+        half_open_probes=int(os.getenv("LLM_BREAKER_HALF_OPEN_PROBES", "1")),
+    ),
+    timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "20")),
+    hedge_after=float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0")),
+)
@@ -0,0 +1,227 @@
+"""
+Logging Module
+Non-blocking structured logging: callers only put records on a bounded
+queue, and a QueueListener thread formats them as JSON and writes them out.
+
+Tunables (environment):
+    LOG_LEVEL              root level for the app (default INFO)
+    LOG_LEVELS             per-module overrides, e.g. "Campus_event_notifier.notification=WARNING,sqlalchemy.engine=INFO"
+    LOG_FORMAT             json (default) or text
+    LOG_QUEUE_SIZE         records buffered before new ones are dropped
+    LOG_RATE_LIMIT_BURST / LOG_RATE_LIMIT_INTERVAL   per-message-template budget
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from Campus_event_notifier.metrics import registry
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped_total",
+    "Log records dropped before reaching the output",
+    ("reason",),
+)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "request_id", "suppressed"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request ID (runs in the caller's thread)"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most `burst` records per message template through per interval.
+
+    Errors always pass. The first record after a window with drops carries
+    a `suppressed` count so the volume isn't silently lost.
+    """
+
+    def __init__(self, burst: int = 20, interval: float = 10.0, max_keys: int = 5000):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_keys = max_keys
+        self._windows: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                if len(self._windows) >= self.max_keys:
+                    self._windows.clear()
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+        LOG_RECORDS_DROPPED.labels(reason="rate_limited").inc()
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when full"""
+
+    def prepare(self, record):
+        # Merge args and render the traceback here, so the record pickles/copies
+        # cleanly, but leave the JSON formatting to the listener thread
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.labels(reason="queue_full").inc()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any extra= fields included"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{line} [req={request_id}]" if request_id else line
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Parse "module=LEVEL,other=LEVEL" into logger names and levels"""
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(stream=None) -> None:
+    """Route the app's loggers through the queue; safe to call more than once"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(TextFormatter() if os.getenv("LOG_FORMAT", "json") == "text" else JsonFormatter())
+
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000"))))
+        handler.addFilter(RequestIdFilter())
+        handler.addFilter(RateLimitFilter(
+            burst=int(os.getenv("LOG_RATE_LIMIT_BURST", "20")),
+            interval=float(os.getenv("LOG_RATE_LIMIT_INTERVAL", "10")),
+        ))
+
+        app_logger = logging.getLogger("Campus_event_notifier")
+        app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        app_logger.addHandler(handler)
+        app_logger.propagate = False
+        for name, level in parse_levels(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(name).setLevel(level)
+            if not name.startswith("Campus_event_notifier") and handler not in logging.getLogger(name).handlers:
+                logging.getLogger(name).addHandler(handler)
+
+        _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush whatever is still queued and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+class RequestIdMiddleware:
+    """ASGI middleware that assigns each request an ID for its log records"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers") or []).get(REQUEST_ID_HEADER.lower().encode())
+        request_id = incoming.decode("latin-1")[:64] if incoming else uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.lower().encode(), request_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -1,23 +1,19 @@
-from fastapi import FastAPI, Request, Form, Depends, HTTPException, Query, Body
+from fastapi import FastAPI, Request, Form, Depends, HTTPException, Query, Body, BackgroundTasks
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, PlainTextResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 import json
+import logging
+from html import escape as html_escape
 from dotenv import load_dotenv
 import os
+import time
 from pathlib import Path
+from typing import List
 from datetime import datetime, timedelta
 
-# Import local modules (use package-less imports so module path resolution stays simple)
-from Campus_event_notifier.database import get_db, Event, User
-from Campus_event_notifier.auth import authenticate_user, create_access_token, get_current_active_user, create_user, SECRET_KEY, ALGORITHM
-from Campus_event_notifier.notification import send_notification
-from Campus_event_notifier.agent import ask_agentic_ai
-from Campus_event_notifier.chatbot import get_chatbot_response
-from jose import jwt as jose_jwt
-
 # Load environment variables from both project root and package .env (if present)
 project_root = Path(__file__).parent.parent
 pkg_env = Path(__file__).parent / ".env"
@@ -26,15 +22,43 @@ root_env = project_root / ".env"
 load_dotenv(dotenv_path=root_env)
 load_dotenv(dotenv_path=pkg_env)
 
-# Debug: print both .env paths and current GEMINI_API_KEY (masked) at startup
-try:
-    print(f"root .env path: {root_env} (exists={root_env.exists()})")
-    print(f"package .env path: {pkg_env} (exists={pkg_env.exists()})")
-    import os
-    gem = os.getenv("GEMINI_API_KEY")
-    print("GEMINI_API_KEY (repr):", repr(gem))
-except Exception:
-    pass
+# Configure logging before importing database.py, whose import-time migrations log at INFO
+from Campus_event_notifier.logging_config import setup_logging, RequestIdMiddleware
+setup_logging()
+
+# Import local modules (use package-less imports so module path resolution stays simple)
+from Campus_event_notifier.database import get_db, engine, Event, User, Subscriber
+from Campus_event_notifier.auth import authenticate_user, create_access_token, get_current_active_user, get_current_admin_user, create_user, SECRET_KEY, ALGORITHM
+from Campus_event_notifier.email_templates import verify_unsubscribe_token
+from Campus_event_notifier.agent import ask_agentic_ai
+from Campus_event_notifier.llm import llm
+from Campus_event_notifier.chatbot import get_chatbot_response
+from Campus_event_notifier.chat_memory import Conversation, conversations
+from Campus_event_notifier.metrics import registry, MetricsMiddleware, CONTENT_TYPE_LATEST
+from Campus_event_notifier import query_profiler
+from Campus_event_notifier.fragments import FragmentCache
+from Campus_event_notifier.pagination import fetch_events_page, InvalidCursor
+from Campus_event_notifier.assets import manifest as asset_manifest, asset_url, PrecompressedStaticFiles
+from Campus_event_notifier.admission import llm_admission
+from Campus_event_notifier.recommender import recommender
+from Campus_event_notifier.dedupe import duplicate_detector
+from Campus_event_notifier.scheduler import start_event_scheduler
+from Campus_event_notifier.digest import normalize_frequency, run_digest, upsert_subscriber
+from Campus_event_notifier.categories import CATEGORIES, get_event_category, interest_mask
+from Campus_event_notifier.interests import interest_index
+from Campus_event_notifier.event_calendar import event_calendar
+from Campus_event_notifier.records import load_event_records
+from Campus_event_notifier.snapshot import event_snapshot
+from Campus_event_notifier.jobs import enqueue as enqueue_job, job_queue, job_runner
+from Campus_event_notifier.retention import search_archived_events, archived_chat_history
+from jose import jwt as jose_jwt
+
+logger = logging.getLogger(__name__)
+
+# Debug: log both .env paths and whether GEMINI_API_KEY is set (never the key itself)
+logger.debug("root .env path: %s (exists=%s)", root_env, root_env.exists())
+logger.debug("package .env path: %s (exists=%s)", pkg_env, pkg_env.exists())
+logger.debug("GEMINI_API_KEY configured: %s", bool(os.getenv("GEMINI_API_KEY")))
 
 app = FastAPI(title="Campus Event Notifier", version="2.0")
 
@@ -55,6 +79,16 @@ from fastapi.middleware.gzip import GZipMiddleware
 # Add Gzip compression
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
+# Opt-in per-request query counting and N+1 detection (QUERY_PROFILER=1)
+if query_profiler.is_enabled():
+    app.add_middleware(query_profiler.QueryProfilerMiddleware, router=app.router)
+
+# Record per-route latency and in-flight requests (sees the full request)
+app.add_middleware(MetricsMiddleware, router=app.router)
+
+# Tag every log record with the request's ID (outermost, so everything below is covered)
+app.add_middleware(RequestIdMiddleware)
+
 # Mount static files
 static_path = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(
@@ -63,99 +97,70 @@ app.mount("/static", StaticFiles(
     check_dir=True
 ), name="static")
 
-# Set up templates
-templates = Jinja2Templates(directory=str(Path(__file__).parent / "templates"))
+# Fingerprinted, precompressed assets served with immutable caching
+asset_manifest.build()
+app.mount("/assets", PrecompressedStaticFiles(
+    directory=str(asset_manifest.build_dir),
+    check_dir=True
+), name="assets")
+
+# Set up templates with a persistent bytecode cache so compiled templates survive restarts
+from jinja2 import FileSystemBytecodeCache
+template_cache_dir = Path(os.getenv("TEMPLATE_CACHE_DIR", str(Path(__file__).parent / ".template_cache")))
+template_cache_dir.mkdir(parents=True, exist_ok=True)
+templates = Jinja2Templates(
+    directory=str(Path(__file__).parent / "templates"),
+    bytecode_cache=FileSystemBytecodeCache(str(template_cache_dir)),
+    auto_reload=os.getenv("TEMPLATE_AUTO_RELOAD", "0") == "1",
+)
+templates.env.globals["asset_url"] = asset_url
+templates.env.globals["interest_categories"] = CATEGORIES
+fragments = FragmentCache(templates.env)
+
+
+@app.on_event("startup")
+async def precompile_templates():
+    """Compile every HTML template once at startup (fills the bytecode cache)"""
+    for name in templates.env.list_templates(filter_func=lambda n: n.endswith(".html")):
+        templates.env.get_template(name)
 
-# Cache for events data
 from fastapi.concurrency import run_in_threadpool
-from cachetools import TTLCache
 import asyncio
+import threading
+
+
+async def current_event_snapshot():
+    """The event snapshot, checking for writes off the event loop only when a check is due"""
+    return await event_snapshot.current_async(engine)
+
+
+@app.on_event("startup")
+async def start_background_scheduler():
+    """Run the reminder scheduler in the background; only the lease holder fires jobs"""
+    if os.getenv("ENABLE_SCHEDULER", "0") == "1":
+        threading.Thread(target=start_event_scheduler, name="event-scheduler", daemon=True).start()
+
 
-# Cache events for 5 minutes
-events_cache = TTLCache(maxsize=100, ttl=300)
+@app.on_event("startup")
+async def start_job_workers():
+    """Run queued background jobs (welcome emails) in this worker; JOB_WORKERS=0 disables"""
+    job_runner.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    job_runner.stop()
 
 # Basic route for home page
 @app.get("/", response_class=HTMLResponse)
-async def home(request: Request, db: Session = Depends(get_db)):
-    # Try to get events from cache first
-    cache_key = 'upcoming_events'
-    cached_events = events_cache.get(cache_key)
-    
-    if cached_events is not None:
-        return templates.TemplateResponse(
-            "index.html",
-            {"request": request, "events_by_category": cached_events}
-        )
-    
-    # Get events from database
-    def get_events():
-        current_time = datetime.now()
-        # Since date is stored as string, we need to filter differently
-        all_events = db.query(Event).order_by(Event.date).limit(20).all()
-        # Filter events that are upcoming (assuming date strings are in future)
-        upcoming_events = []
-        for event in all_events:
-            try:
-                if isinstance(event.date, str):
-                    event_datetime = datetime.strptime(event.date, "%Y-%m-%d %H:%M:%S.%f")
-                else:
-                    event_datetime = event.date
-                if event_datetime >= current_time:
-                    upcoming_events.append(event)
-            except:
-                # If date parsing fails, include the event anyway
-                upcoming_events.append(event)
-        return upcoming_events
-    
-    # Run database query in thread pool
-    events = await run_in_threadpool(get_events)
-
-    # Use a dictionary for faster category lookup
-    category_map = {
-        'n-block': 'Tech Events',
-        'cricket ground': 'Sports Events',
-        'oat': 'Cultural & Photography Events',
-        'h-block': 'Engineering Events',
-        'library': 'Academic Events'
-    }
-
-    def get_event_category(location):
-        location = location.lower()
-        for key, category in category_map.items():
-            if key in location:
-                return category
-        return 'Other Events'
-
-    # Group events by category
-    events_by_category = {}
-    for event in events:
-        category = get_event_category(event.location)
-        if category not in events_by_category:
-            events_by_category[category] = []
-
-        # Parse date string to datetime for formatting
-        try:
-            if isinstance(event.date, str):
-                event_date = datetime.strptime(event.date, "%Y-%m-%d %H:%M:%S.%f")
-            else:
-                event_date = event.date
-            formatted_date = event_date.strftime("%B %d, %Y")
-        except:
-            formatted_date = event.date  # fallback to raw date
-
-        events_by_category[category].append({
-            "name": event.name,
-            "date": formatted_date,
-            "location": event.location,
-            "description": event.description,
-            "category": category
-        })
-    
+async def home(request: Request):
+    # Upcoming events come pre-sorted, pre-formatted and pre-grouped from the in-memory snapshot
+    snapshot = await current_event_snapshot()
     return templates.TemplateResponse(
-        "index.html", 
+        "index.html",
         {
             "request": request,
-            "events_by_category": events_by_category
+            "events_html": fragments.events_by_category(snapshot.upcoming_by_category(limit=20))
         }
     )
 
@@ -178,7 +183,7 @@ app.add_middleware(
 
 # Subscribe endpoint
 @app.post("/subscribe")
-async def subscribe(request: Request, form_data: dict = Body(...)):
+async def subscribe(request: Request, form_data: dict = Body(...), db: Session = Depends(get_db)):
     try:
         email = form_data.get("email")
         if not email:
@@ -203,55 +208,32 @@ async def subscribe(request: Request, form_data: dict = Body(...)):
                 }
             )
         
-        print(f"📝 Processing subscription for: {email}")
-        
-        # Save subscriber to file
-        subscriber_file = Path(__file__).parent / "subscribers.txt"
-        with open(subscriber_file, "a") as f:
-            f.write(f"{email}\n")
-        print(f"✅ Saved subscriber to {subscriber_file}")
-        
-        # Send welcome email
-        subject = "Welcome to Campus Events!"
-        message = f"""
-Dear Subscriber,
-
-Thank you for subscribing to Campus Events! 🎉
-
-You'll now receive notifications about:
-• New campus events
-• Event updates and changes
-• Upcoming event reminders
-
-Stay tuned for exciting events happening on campus!
+        try:
+            frequency = normalize_frequency(form_data.get("frequency"))
+            categories = form_data.get("categories")
+            interest_mask(categories or [])
+        except (ValueError, TypeError) as e:
+            return JSONResponse(status_code=400, content={"message": str(e), "success": False})
 
-Best regards,
-The Campus Events Team
-"""
+        logger.info("Processing subscription for %s (%s)", email, frequency)
         
-        from Campus_event_notifier.notification import send_notification
-        email_sent = send_notification(email, subject, message)
+        # Save (or reactivate) the subscriber with their digest preference
+        await run_in_threadpool(upsert_subscriber, db, email, frequency, categories)
         
-        if not email_sent:
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "message": "Subscribed successfully, but email notification failed",
-                    "success": True,
-                    "email_sent": False
-                }
-            )
+        # The welcome email goes out from a background job so SMTP never delays the response
+        job_id = await run_in_threadpool(enqueue_job, db, "subscriber_welcome", email=email)
         
         return JSONResponse(
             status_code=200,
             content={
                 "message": "Subscribed successfully!",
                 "success": True,
-                "email_sent": True
+                "email_queued": True,
+                "job_id": job_id
             }
         )
     except Exception as e:
-        print(f"❌ Error in subscription: {str(e)}")
+        logger.exception("Error in subscription: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -261,9 +243,9 @@ async def is_database_empty(db: Session) -> bool:
     return db.query(Event).count() == 0
 
 # Agentic AI endpoint (JSON)
-@app.post("/agent")
+@app.post("/agent", dependencies=[Depends(llm_admission)])
 async def agent_endpoint(prompt: str = Body(..., embed=True)):
-    response = ask_agentic_ai(prompt)
+    response = await ask_agentic_ai(prompt)
     return {"response": response}
 
 # Authentication routes
@@ -317,16 +299,7 @@ async def logout():
 
 # Load events from database
 def load_events(db: Session):
-    events = db.query(Event).all()
-    return [
-        {
-            "name": event.name,
-            "date": event.date,
-            "location": event.location,
-            "description": event.description
-        }
-        for event in events
-    ]
+    return load_event_records(db)
 
 # Home page: display events + subscription form
 @app.get("/", response_class=HTMLResponse)
@@ -371,9 +344,9 @@ async def register(
     db: Session = Depends(get_db)
 ):
     try:
-        create_user(db, email, password, username, full_name)
-        # Send welcome notification
-        send_notification(email, "Welcome!", "You have successfully registered for Campus Event Notifier!")
+        await run_in_threadpool(create_user, db, email, password, username, full_name)
+        # Send welcome notification from a background job
+        await run_in_threadpool(enqueue_job, db, "account_welcome", email=email)
         return RedirectResponse(url="/login", status_code=302)
     except HTTPException as e:
         return templates.TemplateResponse(
@@ -391,15 +364,50 @@ async def logout():
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(
     request: Request,
-    current_user: dict = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_active_user)
 ):
-    events = load_events(db)
+    # Only the first page is rendered server-side; the rest is fetched on scroll
+    snapshot = await current_event_snapshot()
+    events, next_cursor = snapshot.first_page()
     return templates.TemplateResponse(
         "dashboard.html",
-        {"request": request, "events": events, "user": current_user}
+        {
+            "request": request,
+            "total_events": len(snapshot),
+            "events_html": fragments.event_cards(events, variant="dashboard"),
+            "next_cursor": next_cursor,
+            "user": current_user
+        }
     )
 
+# Paginated events for infinite scroll (HTML fragment or JSON); same login as the dashboard it feeds
+@app.get("/api/events")
+async def events_page(
+    cursor: str = Query(None),
+    limit: int = Query(None),
+    format: str = Query("json"),
+    current_user: dict = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    try:
+        events, next_cursor = fetch_events_page(db, cursor, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "html":
+        html = fragments.event_cards(events, variant="dashboard")
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        return HTMLResponse(content=str(html), headers=headers)
+    return {"events": events, "next_cursor": next_cursor}
+
+# Progress of a background job (e.g. the welcome email queued by /subscribe)
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: int, db: Session = Depends(get_db)):
+    status = job_queue.status(db, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
 # Helper: optional user from access_token cookie (does not raise)
 def _get_user_from_request(request: Request, db: Session):
     token = request.cookies.get("access_token")
@@ -425,46 +433,190 @@ async def chat_page(request: Request, question: str = Query(None), db: Session =
         return templates.TemplateResponse("chat.html", {"request": request, "user": user, "initial_question": question})
     except Exception as e:
         # Log and render template with an error message instead of raising 401
-        print(f"⚠️ Error while serving /chat: {e}")
+        logger.warning("Error while serving /chat: %s", e)
         return templates.TemplateResponse("chat.html", {"request": request, "user": None, "initial_question": question, "error": "Authentication not required to view this page."})
 
+CONVERSATION_COOKIE = "chat_conversation"
+
+def _get_conversation(request: Request, conversation_id: str = None) -> Conversation:
+    """Conversation named by the form field or cookie (a new one if unknown)"""
+    return conversations.get(conversation_id or request.cookies.get(CONVERSATION_COOKIE))
+
+def _remember_conversation(response, conversation: Conversation):
+    response.set_cookie(key=CONVERSATION_COOKIE, value=conversation.id, httponly=True, samesite="lax")
+    return response
+
 # POST route used by the HTML form (returns rendered page)
-@app.post("/chat", response_class=HTMLResponse)
-async def chat_form(request: Request, message: str = Form(...), db: Session = Depends(get_db)):
+@app.post("/chat", response_class=HTMLResponse, dependencies=[Depends(llm_admission)])
+async def chat_form(request: Request, message: str = Form(...), conversation_id: str = Form(None), db: Session = Depends(get_db)):
     user = _get_user_from_request(request, db)
+    conversation = _get_conversation(request, conversation_id)
     # Prefer chatbot logic if available, else fallback to agent
     try:
         # if get_chatbot_response is async, await it; if not, call directly
-        resp = get_chatbot_response(message, db)
+        resp = get_chatbot_response(message, db, conversation)
         if hasattr(resp, "__await__"):
-            ai_response = await resp
-        else:
-            ai_response = resp
+            resp = await resp
+        ai_response, source = resp
     except Exception:
-        ai_response = ask_agentic_ai(message)
+        ai_response, source = await ask_agentic_ai(message), "llm"
 
     # If the chatbot/agent returned an error string starting with 'Error:', show a friendly message
     if isinstance(ai_response, str) and ai_response.startswith("Error:"):
         friendly = "The AI assistant is not available right now. Please ensure GEMINI_API_KEY is configured."
-        return templates.TemplateResponse("chat.html", {"request": request, "ai_response": friendly, "user_message": message, "user": user, "error_detail": ai_response})
+        return _remember_conversation(templates.TemplateResponse("chat.html", {"request": request, "ai_response": friendly, "user_message": message, "user": user, "error_detail": ai_response}), conversation)
 
-    return templates.TemplateResponse("chat.html", {"request": request, "ai_response": ai_response, "user_message": message, "user": user})
+    return _remember_conversation(templates.TemplateResponse("chat.html", {"request": request, "ai_response": ai_response, "source": source, "user_message": message, "user": user}), conversation)
 
 # API route for async/JS clients (returns JSON)
-@app.post("/api/chat")
-async def chat_api(request: Request, message: str = Form(...), db: Session = Depends(get_db)):
+@app.post("/api/chat", dependencies=[Depends(llm_admission)])
+async def chat_api(request: Request, message: str = Form(...), conversation_id: str = Form(None), db: Session = Depends(get_db)):
+    conversation = _get_conversation(request, conversation_id)
     try:
-        resp = get_chatbot_response(message, db)
+        resp = get_chatbot_response(message, db, conversation)
         if hasattr(resp, "__await__"):
-            ai_response = await resp
-        else:
-            ai_response = resp
+            resp = await resp
+        ai_response, source = resp
     except Exception:
-        ai_response = ask_agentic_ai(message)
+        ai_response, source = await ask_agentic_ai(message), "llm"
     if isinstance(ai_response, str) and ai_response.startswith("Error:"):
         # Return 503 with a helpful message and the raw detail in a separate field
-        return JSONResponse(status_code=503, content={"error": "AI assistant unavailable. Please configure GEMINI_API_KEY.", "detail": ai_response})
-    return JSONResponse({"response": ai_response})
+        return _remember_conversation(JSONResponse(status_code=503, content={"error": "AI assistant unavailable. Please configure GEMINI_API_KEY.", "detail": ai_response, "source": source, "conversation_id": conversation.id}), conversation)
+    return _remember_conversation(JSONResponse({"response": ai_response, "source": source, "conversation_id": conversation.id}), conversation)
+
+# Event recommendations for a free-text query, or the signed-in user's chat history
+@app.get("/api/recommendations")
+async def recommendations(
+    request: Request,
+    q: str = Query(None),
+    k: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    if q:
+        events = await run_in_threadpool(recommender.recommend, db, q, k)
+    else:
+        user = _get_user_from_request(request, db)
+        if not user:
+            raise HTTPException(status_code=400, detail="Provide a query (q) or sign in")
+        events = await run_in_threadpool(recommender.recommend_for_user, db, user.id, k)
+    return {"recommendations": events}
+
+# Admin: search archived (past) events
+@app.get("/api/admin/archive/events")
+async def archived_events(
+    q: str = Query(None),
+    since: str = Query(None),
+    until: str = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    events = await run_in_threadpool(search_archived_events, db, q, since, until, limit)
+    return {
+        "events": [
+            {"id": e.event_id, "name": e.name, "date": e.date, "location": e.location,
+             "description": e.description, "archived_at": e.archived_at.isoformat() if e.archived_at else None}
+            for e in events
+        ]
+    }
+
+# Admin: a user's archived chat history
+@app.get("/api/admin/archive/chat/{user_id}")
+async def archived_chat(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    messages = await run_in_threadpool(archived_chat_history, db, user_id, limit)
+    return {
+        "messages": [
+            {"id": m.message_id, "message": m.message, "response": m.response,
+             "timestamp": m.timestamp.isoformat() if m.timestamp else None}
+            for m in messages
+        ]
+    }
+
+# Admin: likely duplicate event clusters
+@app.get("/api/admin/duplicates")
+async def duplicate_clusters(
+    threshold: float = Query(None, ge=0.0, le=1.0),
+    admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    clusters = await run_in_threadpool(duplicate_detector.duplicate_clusters, db, threshold)
+    ids = [event_id for cluster in clusters for event_id in cluster]
+    events = {e.id: e for e in db.query(Event).filter(Event.id.in_(ids)).all()} if ids else {}
+    return {
+        "clusters": [
+            [
+                {"id": event_id, "name": events[event_id].name, "date": events[event_id].date,
+                 "location": events[event_id].location}
+                for event_id in cluster if event_id in events
+            ]
+            for cluster in clusters
+        ]
+    }
+
+# Admin: check a candidate event for near-duplicates before adding it
+@app.post("/api/admin/duplicates/check")
+async def check_duplicate(
+    payload: dict = Body(...),
+    admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    matches = await run_in_threadpool(
+        duplicate_detector.find_duplicates, db,
+        payload.get("name", ""), payload.get("description", ""), payload.get("location", "")
+    )
+    return {"matches": [{"id": event_id, "similarity": round(sim, 3)} for event_id, sim in matches]}
+
+# Month calendar: per-day counts from the materialized event_day_counts table
+@app.get("/api/calendar")
+async def calendar_month(month: str = Query(None), db: Session = Depends(get_db)):
+    month = month or datetime.now().strftime("%Y-%m")
+    try:
+        return await run_in_threadpool(event_calendar.month, db, month)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Admin: size an audience from the interest bitmaps
+@app.get("/api/admin/audience")
+async def audience_size(
+    category: List[str] = Query(...),
+    frequency: str = Query(None),
+    admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    unknown = [c for c in category if c not in CATEGORIES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown category: {unknown[0]}")
+    start = time.perf_counter()
+    audience = await run_in_threadpool(interest_index.audience, db, category, frequency)
+    return {
+        "categories": category,
+        "frequency": frequency,
+        "subscribers": len(audience),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+# Admin: announce a new event now instead of at the next immediate sweep.
+# Daily and weekly subscribers get it in their digest, as they chose; the
+# sweep stamps last_digest_at, so nobody is sent it a second time.
+@app.post("/api/admin/events/{event_id}/announce", status_code=202)
+async def announce_event(
+    event_id: int,
+    background_tasks: BackgroundTasks,
+    admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    event = db.query(Event).filter(Event.id == event_id).first()
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    category = get_event_category(event.location)
+    audience = await run_in_threadpool(interest_index.audience, db, [category], "immediate")
+    background_tasks.add_task(run_digest, "immediate")
+    return {"event_id": event_id, "category": category, "recipients": len(audience)}
 
 # Subscribe user for notifications (updated for authenticated users)
 @app.post("/subscribe")
@@ -474,9 +626,25 @@ async def subscribe(
     current_user: dict = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    # Send welcome notification
-    send_notification(email, "Welcome!", "You will now receive event notifications from Campus Event Smart Notifier.")
-    return {"message": f"Subscribed {email} successfully!"}
+    await run_in_threadpool(upsert_subscriber, db, email)
+    # Send welcome notification from a background job
+    job_id = await run_in_threadpool(enqueue_job, db, "subscriber_welcome", email=email)
+    return {"message": f"Subscribed {email} successfully!", "job_id": job_id}
+
+@app.get("/unsubscribe/{token}", response_class=HTMLResponse)
+async def unsubscribe(token: str, db: Session = Depends(get_db)):
+    """One-click unsubscribe link included in every notification email"""
+    email = verify_unsubscribe_token(token)
+    if email is None:
+        raise HTTPException(status_code=400, detail="Invalid unsubscribe link")
+
+    # Through the ORM (not a bulk update) so the interest index sees the change
+    subscriber = db.query(Subscriber).filter(Subscriber.email == email).first()
+    if subscriber is not None:
+        subscriber.active = False
+        db.commit()
+    logger.info("Unsubscribed %s", email)
+    return HTMLResponse(f"<p>{html_escape(email)} has been unsubscribed from Campus Events.</p>")
 
 # Test endpoint to check if static files are working
 @app.get("/test-static")
@@ -484,13 +652,19 @@ async def test_static():
     return {"message": "Static files should be accessible at /static/style.css"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Expose application metrics in Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/debug/gemini")
 async def debug_gemini():
     """Return masked GEMINI_API_KEY presence for debugging."""
     import os
     val = os.getenv("GEMINI_API_KEY")
     if not val:
-        return {"gemini_present": False, "value_masked": None}
+        return {"gemini_present": False, "value_masked": None, "circuit": llm.breaker.state}
     v = val.strip('"').strip("'")
     masked = v[:4] + "..." + v[-4:] if len(v) > 8 else "****"
-    return {"gemini_present": True, "value_masked": masked}
+    return {"gemini_present": True, "value_masked": masked, "circuit": llm.breaker.state}
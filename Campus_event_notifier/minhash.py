@@ -0,0 +1,149 @@
+"""
+MinHash Module
+MinHash signatures over character shingles, indexed with LSH banding so
+likely near-duplicates are found without comparing every pair.
+"""
+
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+SHINGLE_SIZE = 5
+NUM_PERM = 120
+BANDS = 20            # 20 bands x 6 rows: pairs above ~0.6 Jaccard become candidates
+ROWS_PER_BAND = NUM_PERM // BANDS
+DEFAULT_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.6"))
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1234)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+_PUNCT_RE = re.compile(r"[^a-z0-9 ]+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    text = _PUNCT_RE.sub(" ", (text or "").lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def event_fingerprint_text(name: str, description: str, location: str) -> str:
+    return f"{normalize(name)} | {normalize(description)} | {normalize(location)}"
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """Hash each character k-gram to a 31-bit integer"""
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8")) & _MERSENNE_PRIME}
+    return {
+        zlib.crc32(text[i:i + size].encode("utf-8")) & _MERSENNE_PRIME
+        for i in range(len(text) - size + 1)
+    }
+
+
+def minhash(shingle_set: Set[int]) -> np.ndarray:
+    """MinHash signature: for each permutation (a*x + b) mod p, the minimum over shingles"""
+    x = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+    hashed = (np.outer(_PERM_A, x) + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def estimated_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+def _band_keys(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    return [
+        (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes())
+        for band in range(BANDS)
+    ]
+
+
+class NearDuplicateIndex:
+    """LSH index of MinHash signatures supporting add, remove and query"""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[Hashable]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def add(self, key: Hashable, text: str):
+        signature = minhash(shingles(text))
+        with self._lock:
+            self.remove(key)
+            self._signatures[key] = signature
+            for band_key in _band_keys(signature):
+                self._buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            signature = self._signatures.pop(key, None)
+            if signature is None:
+                return
+            for band_key in _band_keys(signature):
+                bucket = self._buckets.get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band_key]
+
+    def _candidates(self, signature: np.ndarray) -> Set[Hashable]:
+        found = set()
+        for band_key in _band_keys(signature):
+            found |= self._buckets.get(band_key, set())
+        return found
+
+    def query(self, text: str, threshold: Optional[float] = None,
+              exclude: Optional[Hashable] = None) -> List[Tuple[Hashable, float]]:
+        """Return (key, estimated Jaccard) for indexed items similar to `text`"""
+        threshold = self.threshold if threshold is None else threshold
+        signature = minhash(shingles(text))
+        with self._lock:
+            matches = []
+            for key in self._candidates(signature):
+                if key == exclude:
+                    continue
+                similarity = estimated_similarity(signature, self._signatures[key])
+                if similarity >= threshold:
+                    matches.append((key, similarity))
+        return sorted(matches, key=lambda m: m[1], reverse=True)
+
+    def clusters(self, threshold: Optional[float] = None) -> List[List[Hashable]]:
+        """Group indexed items into clusters of likely duplicates (size >= 2)"""
+        threshold = self.threshold if threshold is None else threshold
+        parent: Dict[Hashable, Hashable] = {}
+
+        def find(k):
+            while parent.get(k, k) != k:
+                parent[k] = parent.get(parent[k], parent[k])
+                k = parent[k]
+            return k
+
+        with self._lock:
+            # Only pairs sharing an LSH bucket are ever compared
+            for members in self._buckets.values():
+                if len(members) < 2:
+                    continue
+                members = list(members)
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        parent.setdefault(a, a)
+                        parent.setdefault(b, b)
+                        if find(a) == find(b):
+                            continue
+                        if estimated_similarity(self._signatures[a], self._signatures[b]) >= threshold:
+                            parent[find(a)] = find(b)
+
+        groups: Dict[Hashable, List[Hashable]] = {}
+        for key in list(parent):
+            groups.setdefault(find(key), []).append(key)
+        return [sorted(group) for group in groups.values() if len(group) > 1]
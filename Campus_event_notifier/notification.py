@@ -1,86 +1,86 @@
+import logging
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import os
+from typing import Callable, Iterable, Optional
 from Campus_event_notifier.database import get_db, Event
+from Campus_event_notifier.email_templates import CompiledEmail, compile_email, event_announcement
+from Campus_event_notifier.delivery import delivery
+from Campus_event_notifier.metrics import SMTP_PHASE_SECONDS, SMTP_SENDS
 
-def send_notification(email: str, subject: str, message: str):
-    """
-    Send an email notification using Gmail SMTP
-    """
-    try:
-        # Email configuration from environment variables
-        sender_email = os.getenv("EMAIL_USERNAME")
-        sender_password = os.getenv("EMAIL_PASSWORD")
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
 
-        if not sender_email or not sender_password:
-            print("❌ Email configuration missing. Check EMAIL_USERNAME and EMAIL_PASSWORD in .env")
-            return False
+logger = logging.getLogger(__name__)
 
-        print(f"📧 Attempting to send email from {sender_email} to {email}")
-
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = f"Campus Events <{sender_email}>"
-        msg['To'] = email
-        msg['Subject'] = subject
+def _open_smtp(sender_email: str, sender_password: str) -> smtplib.SMTP:
+    """
+    Connect, upgrade to TLS and log in to the SMTP server (Gmail by default)
+    """
+    logger.debug("Connecting to SMTP server %s:%d", SMTP_HOST, SMTP_PORT)
+    with SMTP_PHASE_SECONDS.labels(phase="connect").time():
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+    if SMTP_STARTTLS:
+        with SMTP_PHASE_SECONDS.labels(phase="tls").time():
+            server.starttls()
 
-        # Add body
-        msg.attach(MIMEText(message, 'plain'))
+    with SMTP_PHASE_SECONDS.labels(phase="login").time():
+        server.login(sender_email, sender_password)
+    logger.debug("SMTP login successful")
+    return server
 
-        try:
-            # Create SMTP session
-            print("📨 Connecting to Gmail SMTP server...")
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
+def send_bulk(message: CompiledEmail, recipients: Iterable[str],
+              on_result: Optional[Callable[[str, bool], None]] = None) -> int:
+    """
+    Send a pre-rendered message to many recipients over one SMTP connection,
+    paced per domain with retries (see delivery.py).
+    Returns the number of recipients the server accepted; on_result, if given,
+    is called with (email, accepted) once each recipient is settled.
+    """
+    sender_email = os.getenv("EMAIL_USERNAME")
+    sender_password = os.getenv("EMAIL_PASSWORD")
 
-            # Login
-            print("🔐 Attempting to login...")
-            server.login(sender_email, sender_password)
-            print("✅ Login successful")
+    if not sender_email or not sender_password:
+        logger.error("Email configuration missing. Check EMAIL_USERNAME and EMAIL_PASSWORD in .env")
+        return 0
 
-            # Send email
-            text = msg.as_string()
-            print("📤 Sending email...")
-            server.sendmail(sender_email, email, text)
+    try:
+        report = delivery.deliver(
+            message, recipients,
+            connect=lambda: _open_smtp(sender_email, sender_password),
+            on_result=on_result,
+        )
+    except Exception as e:
+        SMTP_SENDS.labels(result="error").inc()
+        logger.exception("Failed to send email: %s", e)
+        return 0
 
-            # Close connection
-            server.quit()
-            print(f"✅ Email sent successfully to {email}")
-            return True
+    SMTP_SENDS.labels(result="sent").inc(report.sent)
+    if report.dead_lettered:
+        SMTP_SENDS.labels(result="smtp_error").inc(len(report.dead_lettered))
+    return report.sent
 
-        except smtplib.SMTPAuthenticationError:
-            print("❌ SMTP Authentication failed. Check your email and app password")
-            return False
-        except smtplib.SMTPException as e:
-            print(f"❌ SMTP error occurred: {e}")
-            return False
-        except Exception as e:
-            print(f"❌ Failed to send email: {str(e)}")
-            return False
+def send_message(email: str, message: CompiledEmail) -> bool:
+    """
+    Send a pre-rendered message to a single recipient
+    """
+    if send_bulk(message, [email]) == 1:
+        logger.info("Email '%s' sent to %s", message.subject, email)
+        return True
+    return False
 
+def send_notification(email: str, subject: str, message: str):
+    """
+    Send a plain-text email notification using Gmail SMTP
+    """
+    try:
+        return send_message(email, compile_email(subject, message))
     except Exception as e:
-        print(f"❌ Error in send_notification: {str(e)}")
+        logger.exception("Error in send_notification: %s", e)
         return False
 
 def send_event_notification(email: str, event_name: str, event_date: str, event_location: str):
     """
     Send a formatted event notification
     """
-    subject = f"Upcoming Event: {event_name}"
-    message = f"""
-    Hello!
-
-    We have an exciting event coming up:
-
-    📅 Event: {event_name}
-    📆 Date: {event_date}
-    📍 Location: {event_location}
-
-    Don't miss out! Mark your calendar and join us.
-
-    Best regards,
-    Campus Event Notifier Team
-    """
-
-    return send_notification(email, subject, message.strip())
+    return send_message(email, event_announcement(event_name, event_date, event_location))
@@ -0,0 +1,69 @@
+"""
+Pagination Module
+Keyset (seek) pagination over events ordered by (date, id).
+"""
+
+import base64
+import json
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from Campus_event_notifier.database import Event
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100  # Hard server-side cap, whatever the client asks for
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(date: str, event_id: int) -> str:
+    """Encode the sort key of the last event on a page as an opaque cursor"""
+    raw = json.dumps([date, event_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, event_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(date), int(event_id)
+    except Exception:
+        raise InvalidCursor("Invalid pagination cursor")
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def fetch_events_page(db: Session, cursor: Optional[str] = None,
+                      limit: Optional[int] = None) -> Tuple[List[Dict], Optional[str]]:
+    """Return one page of events after `cursor` and the cursor for the next page"""
+    limit = clamp_page_size(limit)
+    query = db.query(Event.id, Event.name, Event.date, Event.location, Event.description)
+    if cursor:
+        after_date, after_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Event.date, Event.id) > tuple_(after_date, after_id))
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(Event.date, Event.id).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    events = [
+        {
+            "id": row.id,
+            "name": row.name,
+            "date": row.date,
+            "location": row.location,
+            "description": row.description
+        }
+        for row in rows
+    ]
+    next_cursor = encode_cursor(rows[-1].date, rows[-1].id) if has_more else None
+    return events, next_cursor
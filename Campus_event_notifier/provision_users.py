@@ -0,0 +1,220 @@
+"""
+User Provisioning Module
+Bulk account creation for a term's student roster. The CSV is streamed
+in batches; each batch is checked against existing emails and usernames
+with chunked IN queries, its passwords are bcrypt-hashed across a
+process pool, and its users are inserted in one transaction.
+
+Usage:
+    python -m Campus_event_notifier.provision_users roster.csv [--workers N]
+        [--batch-size N] [--passwords-out credentials.csv]
+
+The roster needs `email` and `username` columns; `full_name` and
+`password` are optional. Rows without a password get a generated one,
+written to --passwords-out (rows are rejected if it isn't given).
+"""
+
+import argparse
+import csv
+import logging
+import os
+import secrets
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from Campus_event_notifier.auth import get_password_hash
+from Campus_event_notifier.database import SessionLocal, User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+# Bound parameters per IN (...) query, well under SQLite's variable limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+@dataclass
+class ProvisionReport:
+    rows: int = 0
+    created: int = 0
+    existing: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    batches: int = 0
+    hash_seconds: float = 0.0
+    seconds: float = 0.0
+
+    @property
+    def per_second(self) -> float:
+        return self.created / self.seconds if self.seconds else 0.0
+
+
+def read_roster(path: str) -> Iterator[Dict[str, str]]:
+    """Stream roster rows with lower-cased header names and stripped values"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames:
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        for row in reader:
+            yield {key: (value or "").strip() for key, value in row.items() if key}
+
+
+def _batches(rows: Iterable[Dict[str, str]], size: int) -> Iterator[List[Dict[str, str]]]:
+    batch: List[Dict[str, str]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def existing_accounts(db: Session, emails: List[str], usernames: List[str],
+                      chunk_size: int = LOOKUP_CHUNK_SIZE):
+    """Return the emails and usernames that already belong to a user"""
+    found_emails: Set[str] = set()
+    found_usernames: Set[str] = set()
+    for start in range(0, len(emails), chunk_size):
+        chunk = emails[start:start + chunk_size]
+        found_emails.update(db.execute(select(User.email).where(User.email.in_(chunk))).scalars())
+    for start in range(0, len(usernames), chunk_size):
+        chunk = usernames[start:start + chunk_size]
+        found_usernames.update(db.execute(select(User.username).where(User.username.in_(chunk))).scalars())
+    return found_emails, found_usernames
+
+
+def _insert_batch(db: Session, users: List[Dict]) -> List[Dict]:
+    """Insert a batch in one transaction (row by row after a conflict); returns the users inserted"""
+    try:
+        db.execute(insert(User), users)
+        db.commit()
+        return users
+    except IntegrityError:
+        # Someone registered one of these accounts since the existence check
+        db.rollback()
+    inserted = []
+    for user in users:
+        try:
+            db.execute(insert(User), [user])
+            db.commit()
+            inserted.append(user)
+        except IntegrityError:
+            db.rollback()
+            logger.info("Skipping %s: account created concurrently", user["email"])
+    return inserted
+
+
+def provision_users(rows: Iterable[Dict[str, str]], pool: Optional[Executor] = None,
+                    batch_size: int = DEFAULT_BATCH_SIZE, passwords_out=None,
+                    session_factory=SessionLocal,
+                    on_batch: Optional[Callable[[ProvisionReport], None]] = None) -> ProvisionReport:
+    """Create accounts for roster rows, skipping invalid rows, in-file duplicates and existing users"""
+    start = time.perf_counter()
+    report = ProvisionReport()
+    seen_emails: Set[str] = set()
+    seen_usernames: Set[str] = set()
+    writer = csv.writer(passwords_out) if passwords_out is not None else None
+    if writer:
+        writer.writerow(["email", "username", "password"])
+
+    db = session_factory()
+    try:
+        for batch in _batches(rows, batch_size):
+            report.rows += len(batch)
+            candidates = []
+            for row in batch:
+                email = row.get("email", "")
+                username = row.get("username", "")
+                if "@" not in email or not username or (not row.get("password") and writer is None):
+                    report.invalid += 1
+                    continue
+                if email in seen_emails or username in seen_usernames:
+                    report.duplicates += 1
+                    continue
+                seen_emails.add(email)
+                seen_usernames.add(username)
+                candidates.append((email, username, row.get("full_name") or None, row.get("password")))
+
+            found_emails, found_usernames = existing_accounts(
+                db, [c[0] for c in candidates], [c[1] for c in candidates]
+            )
+            new = [c for c in candidates if c[0] not in found_emails and c[1] not in found_usernames]
+            report.existing += len(candidates) - len(new)
+            if not new:
+                continue
+
+            passwords = [password or secrets.token_urlsafe(12) for _, _, _, password in new]
+            hash_start = time.perf_counter()
+            if pool is not None:
+                hashes = list(pool.map(get_password_hash, passwords, chunksize=8))
+            else:
+                hashes = [get_password_hash(password) for password in passwords]
+            report.hash_seconds += time.perf_counter() - hash_start
+
+            users = [
+                {"email": email, "username": username, "full_name": full_name,
+                 "hashed_password": hashed, "is_active": 1}
+                for (email, username, full_name, _), hashed in zip(new, hashes)
+            ]
+            inserted = _insert_batch(db, users)
+            report.created += len(inserted)
+            report.batches += 1
+            if writer:
+                generated = {email: password for (email, _, _, given), password in zip(new, passwords) if not given}
+                for user in inserted:
+                    if user["email"] in generated:
+                        writer.writerow([user["email"], user["username"], generated[user["email"]]])
+            report.seconds = time.perf_counter() - start
+            if on_batch:
+                on_batch(report)
+    finally:
+        db.close()
+
+    report.seconds = time.perf_counter() - start
+    logger.info(
+        "Provisioned %d of %d roster rows in %.1fs (%.1f accounts/s; %d existing, %d duplicate, %d invalid)",
+        report.created, report.rows, report.seconds, report.per_second,
+        report.existing, report.duplicates, report.invalid,
+    )
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create user accounts from a CSV roster")
+    parser.add_argument("roster", help="CSV with email, username and optional full_name, password columns")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="password hashing processes (0 hashes in this process)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--passwords-out", help="write generated passwords for rows without one to this CSV")
+    args = parser.parse_args(argv)
+
+    def progress(report: ProvisionReport):
+        print(f"  {report.rows:>8,} rows read  {report.created:>8,} created  "
+              f"{report.per_second:7.1f} accounts/s")
+
+    passwords_out = open(args.passwords_out, "w", newline="", encoding="utf-8") if args.passwords_out else None
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 0 else None
+    try:
+        report = provision_users(read_roster(args.roster), pool=pool, batch_size=args.batch_size,
+                                 passwords_out=passwords_out, on_batch=progress)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if passwords_out is not None:
+            passwords_out.close()
+
+    print(f"Created {report.created:,} accounts from {report.rows:,} rows in {report.seconds:.1f}s "
+          f"({report.per_second:.1f} accounts/s, {args.workers} hashing workers)")
+    print(f"Skipped {report.existing:,} existing, {report.duplicates:,} duplicate and {report.invalid:,} invalid rows")
+    if report.created:
+        print(f"Hashing took {report.hash_seconds:.1f}s ({report.created / report.hash_seconds:.1f} hashes/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Query Profiler Module
+Opt-in SQL profiling built on SQLAlchemy engine events: slow-query log,
+per-request query counts and repeated-statement (N+1) detection.
+
+Enable with QUERY_PROFILER=1. Tunables:
+    SLOW_QUERY_MS          statements slower than this are logged (default 100)
+    N_PLUS_ONE_THRESHOLD   identical statements per request before flagging (default 3)
+    SLOW_QUERY_LOG_PARAMS  also log a slow statement's bound parameters at DEBUG
+                           (default off: they hold emails and password hashes)
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from Campus_event_notifier.metrics import registry, route_template
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+QUERY_TIME_HEADER = "X-Query-Time-Ms"
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled() -> bool:
+    """Return True when the profiler has been switched on via QUERY_PROFILER"""
+    return os.getenv("QUERY_PROFILER", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "3"))
+SLOW_QUERY_LOG_PARAMS = os.getenv("SLOW_QUERY_LOG_PARAMS", "").strip().lower() in ("1", "true", "yes", "on")
+
+SLOW_QUERIES = registry.counter(
+    "db_slow_queries_total",
+    "Statements slower than SLOW_QUERY_MS",
+    ("route",),
+)
+REQUEST_QUERY_COUNT = registry.histogram(
+    "db_queries_per_request",
+    "Number of SQL statements issued per request",
+    ("route",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+REPEATED_STATEMENTS = registry.counter(
+    "db_repeated_statements_total",
+    "Requests flagged for repeating an identical statement (possible N+1)",
+    ("route",),
+)
+
+
+class RequestQueryStats:
+    """Queries issued while serving a single request"""
+
+    __slots__ = ("route", "count", "total_seconds", "statements")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_seconds += elapsed
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int = None):
+        """Return (statement, count) pairs executed at least `threshold` times"""
+        threshold = threshold or N_PLUS_ONE_THRESHOLD
+        return [(stmt, n) for stmt, n in self.statements.most_common() if n >= threshold]
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    """Return the query stats for the request being served, if any"""
+    return _current_stats.get()
+
+
+def _short(statement: str, limit: int = 200) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+def install_query_profiler(engine):
+    """Attach slow-query logging and per-request counting to an engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("profiler_start_time")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = _current_stats.get()
+        route = stats.route if stats is not None else "background"
+        if stats is not None:
+            stats.record(statement, elapsed)
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            SLOW_QUERIES.labels(route=route).inc()
+            logger.warning("Slow query (%.1f ms) on %s: %s", elapsed * 1000, route, _short(statement))
+            if SLOW_QUERY_LOG_PARAMS:
+                logger.debug("Slow query params: %r", parameters)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("profiler_start_time"):
+            conn.info["profiler_start_time"].pop()
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware that scopes query stats to a request and reports them"""
+
+    def __init__(self, app, router):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(route_template(self.router, scope))
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            # Headers go out with the start message, so report what we have so far
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()))
+                headers.append((QUERY_TIME_HEADER.lower().encode(), f"{stats.total_seconds * 1000:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            REQUEST_QUERY_COUNT.labels(route=stats.route).observe(stats.count)
+            repeated = stats.repeated()
+            if repeated:
+                REPEATED_STATEMENTS.labels(route=stats.route).inc()
+                for statement, count in repeated:
+                    logger.warning("Possible N+1 on %s: statement ran %dx: %s", stats.route, count, _short(statement))
@@ -0,0 +1,267 @@
+"""
+Event Recommendation Module
+TF-IDF index over all events, kept in flat NumPy arrays and updated
+incrementally as events are written. A query (or a user's chat history)
+is scored against every event with one vectorized pass plus top-k.
+
+Before each query the index applies committed event writes from any
+worker, read from the event_changes log (see event_changes.py).
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from Campus_event_notifier.database import Event, ChatMessage
+from Campus_event_notifier.event_changes import EventIndexSync
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were
+will with about any me my i you your we our what which when where who how show tell find
+there some events event happening
+""".split())
+
+# Longest suffixes first; a light stemmer so "workshops"/"workshop" and "competitions"/"competition" meet
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "ied", "ers", "er", "ed", "es", "s")
+
+
+def stem(token: str) -> str:
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            if suffix in ("ies", "ied"):
+                token += "y"
+            return token
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and stem"""
+    return [stem(t) for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def event_text(name: str, description: str, location: str = "") -> str:
+    # The name is repeated so title matches outweigh description matches
+    return f"{name} {name} {description} {location}"
+
+
+class _GrowableArray:
+    """Append-only NumPy buffer with amortized O(1) appends"""
+
+    def __init__(self, dtype, capacity: int = 1024):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        n = len(values)
+        if self.size + n > len(self.data):
+            new_capacity = max(len(self.data) * 2, self.size + n)
+            grown = np.zeros(new_capacity, dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:self.size + n] = values
+        self.size += n
+
+    def view(self):
+        return self.data[:self.size]
+
+
+class TfidfIndex:
+    """Sparse TF-IDF matrix stored as COO triplets with in-place tombstoning"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.vocab: Dict[str, int] = {}
+        self._df = _GrowableArray(np.float64)
+        self._rows = _GrowableArray(np.int32, 4096)
+        self._cols = _GrowableArray(np.int32, 4096)
+        self._vals = _GrowableArray(np.float32, 4096)
+        self._slot_of: Dict[int, int] = {}        # event id -> row
+        self._ids = _GrowableArray(np.int64)
+        self._dates = _GrowableArray("<U32")
+        self._active = _GrowableArray(np.bool_)
+        self._ranges: List[Tuple[int, int]] = []  # row -> (start, end) in the COO arrays
+        self._terms: List[Tuple[int, ...]] = []   # row -> columns, for df bookkeeping
+        self._dead = 0
+        self._norms: Optional[np.ndarray] = None
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def _column(self, term: str) -> int:
+        col = self.vocab.get(term)
+        if col is None:
+            col = len(self.vocab)
+            self.vocab[term] = col
+            self._df.extend([0.0])
+        return col
+
+    def _retire(self, row: int):
+        start, end = self._ranges[row]
+        self._vals.data[start:end] = 0.0
+        self._dead += end - start
+        for col in self._terms[row]:
+            self._df.data[col] -= 1
+        self._terms[row] = ()
+
+    def upsert(self, event_id: int, text: str, date: str):
+        """Add or replace one event's vector"""
+        counts = Counter(tokenize(text))
+        with self._lock:
+            row = self._slot_of.get(event_id)
+            if row is None:
+                row = len(self._ranges)
+                self._slot_of[event_id] = row
+                self._ids.extend([event_id])
+                self._dates.extend([date or ""])
+                self._active.extend([True])
+                self._ranges.append((0, 0))
+                self._terms.append(())
+            else:
+                self._retire(row)
+                self._dates.data[row] = date or ""
+                self._active.data[row] = True
+
+            cols = [self._column(term) for term in counts]
+            weights = [1.0 + math.log(n) for n in counts.values()]
+            start = self._rows.size
+            self._rows.extend([row] * len(cols))
+            self._cols.extend(cols)
+            self._vals.extend(weights)
+            self._ranges[row] = (start, self._rows.size)
+            self._terms[row] = tuple(cols)
+            for col in cols:
+                self._df.data[col] += 1
+            self._norms = None
+            if self._dead > self._rows.size // 2:
+                self._compact()
+
+    def remove(self, event_id: int):
+        with self._lock:
+            row = self._slot_of.pop(event_id, None)
+            if row is None:
+                return
+            self._retire(row)
+            self._active.data[row] = False
+            self._norms = None
+
+    def _compact(self):
+        """Drop tombstoned triplets once they make up half the arrays"""
+        rows, cols, vals = self._rows.view(), self._cols.view(), self._vals.view()
+        order = np.argsort(rows, kind="stable")
+        keep = order[vals[order] != 0]
+        new_rows, new_cols, new_vals = rows[keep].copy(), cols[keep].copy(), vals[keep].copy()
+        self._rows.size = self._cols.size = self._vals.size = 0
+        self._rows.extend(new_rows)
+        self._cols.extend(new_cols)
+        self._vals.extend(new_vals)
+        starts = np.searchsorted(new_rows, np.arange(len(self._ranges)), side="left")
+        ends = np.searchsorted(new_rows, np.arange(len(self._ranges)), side="right")
+        self._ranges = list(zip(starts.tolist(), ends.tolist()))
+        self._dead = 0
+
+    def _idf(self) -> np.ndarray:
+        n_docs = len(self._slot_of)
+        return np.log((1.0 + n_docs) / (1.0 + self._df.view())) + 1.0
+
+    def _doc_norms(self, idf: np.ndarray) -> np.ndarray:
+        if self._norms is None:
+            weighted = self._vals.view() * idf[self._cols.view()]
+            sq = np.bincount(self._rows.view(), weights=weighted * weighted, minlength=len(self._ranges))
+            self._norms = np.sqrt(sq)
+        return self._norms
+
+    def search(self, text: str, k: int = 5, min_date: Optional[str] = None) -> List[Tuple[int, float]]:
+        """Return the top-k (event id, cosine score) pairs for free text"""
+        counts = Counter(t for t in tokenize(text) if t in self.vocab)
+        if not counts:
+            return []
+        with self._lock:
+            idf = self._idf()
+            query = np.zeros(len(self.vocab), dtype=np.float64)
+            for term, n in counts.items():
+                col = self.vocab[term]
+                query[col] = (1.0 + math.log(n)) * idf[col]
+            q_norm = np.linalg.norm(query)
+            if q_norm == 0:
+                return []
+
+            # One pass over the matrix: scores = X_tfidf @ q
+            contrib = self._vals.view() * (idf * query)[self._cols.view()]
+            scores = np.bincount(self._rows.view(), weights=contrib, minlength=len(self._ranges))
+            norms = self._doc_norms(idf)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = np.where(norms > 0, scores / (norms * q_norm), 0.0)
+
+            eligible = self._active.view()
+            if min_date:
+                eligible = eligible & (self._dates.view() >= min_date)
+            scores = np.where(eligible, scores, 0.0)
+
+            k = min(k, len(scores))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            ids = self._ids.view()
+            return [(int(ids[row]), float(scores[row])) for row in top if scores[row] > 0]
+
+
+class EventRecommender:
+    """Keeps a TfidfIndex in sync with the events table"""
+
+    def __init__(self):
+        self._events = EventIndexSync(
+            TfidfIndex,
+            upsert=lambda index, row: index.upsert(
+                row.id, event_text(row.name, row.description, row.location), str(row.date)),
+            remove=TfidfIndex.remove,
+            columns=(Event.name, Event.description, Event.location, Event.date),
+        )
+
+    @property
+    def index(self) -> TfidfIndex:
+        return self._events.index
+
+    def sync(self, db: Session):
+        """Apply event writes committed since the last call (see EventIndexSync)"""
+        self._events.sync(db)
+
+    def recommend(self, db: Session, query: str, k: int = 5, upcoming_only: bool = True) -> List[Dict]:
+        """Return the k upcoming events most relevant to `query`"""
+        self.sync(db)
+        min_date = datetime.now().strftime("%Y-%m-%d") if upcoming_only else None
+        ranked = self.index.search(query, k=k, min_date=min_date)
+        if not ranked:
+            return []
+        events = {e.id: e for e in db.query(Event).filter(Event.id.in_([i for i, _ in ranked])).all()}
+        return [
+            {
+                "id": event_id,
+                "name": events[event_id].name,
+                "date": events[event_id].date,
+                "location": events[event_id].location,
+                "description": events[event_id].description,
+                "score": round(score, 4)
+            }
+            for event_id, score in ranked if event_id in events
+        ]
+
+    def recommend_for_user(self, db: Session, user_id: int, k: int = 5, history: int = 20) -> List[Dict]:
+        """Recommend from the user's recent chat questions"""
+        messages = db.query(ChatMessage.message).filter(
+            ChatMessage.user_id == user_id
+        ).order_by(ChatMessage.timestamp.desc()).limit(history).all()
+        return self.recommend(db, " ".join(m.message for m in messages), k=k)
+
+
+# Global recommender instance
+recommender = EventRecommender()
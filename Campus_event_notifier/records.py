@@ -0,0 +1,102 @@
+"""
+Event Records Module
+Compact, read-only event rows for display paths. Only the displayed
+columns are selected through SQLAlchemy Core and each row becomes an
+immutable named tuple, skipping the ORM's identity map and the per-row
+dict copy. Records also answer record["name"] and record.get("name"),
+so templates, prompt formatting and the fragment cache take them
+wherever they took event dicts.
+"""
+
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from Campus_event_notifier.categories import get_event_category
+from Campus_event_notifier.database import Event
+from Campus_event_notifier.fragments import event_version
+
+# Stored event dates with a time of day
+EVENT_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+DISPLAY_DATE_FORMAT = "%B %d, %Y"
+
+EVENT_COLUMNS = (Event.id, Event.name, Event.date, Event.location, Event.description)
+
+
+def parse_event_start(value) -> Optional[datetime]:
+    """The start time of a stored event date, or None if it has no time part"""
+    try:
+        return datetime.strptime(value, EVENT_DATETIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def _getitem(self, key):
+    if isinstance(key, str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    return tuple.__getitem__(self, key)
+
+
+def _get(self, key, default=None):
+    return getattr(self, key, default)
+
+
+def _keys(self):
+    return self._fields
+
+
+class EventRecord(NamedTuple):
+    """One event as stored"""
+
+    id: int
+    name: str
+    date: str
+    location: str
+    description: str
+
+    __getitem__ = _getitem
+    get = _get
+    keys = _keys
+
+    @property
+    def version(self) -> str:
+        return event_version(self)
+
+
+class EventCard(NamedTuple):
+    """One event formatted for an event card"""
+
+    id: int
+    name: str
+    date: str
+    location: str
+    description: str
+    category: str
+    version: str
+
+    __getitem__ = _getitem
+    get = _get
+    keys = _keys
+
+    @classmethod
+    def from_record(cls, record: EventRecord, start: Optional[datetime] = None) -> "EventCard":
+        start = start or parse_event_start(record.date)
+        date = start.strftime(DISPLAY_DATE_FORMAT) if start else record.date
+        fields = (record.id, record.name, date, record.location, record.description)
+        return cls(*fields, get_event_category(record.location), event_version(EventRecord(*fields)))
+
+
+def select_events(*criteria) -> Select:
+    """A Core select of the record columns, ordered by (date, id)"""
+    return select(*EVENT_COLUMNS).where(*criteria).order_by(Event.date, Event.id)
+
+
+def load_event_records(db, statement: Optional[Select] = None) -> List[EventRecord]:
+    """Run a select_events() statement on a session or connection and return records"""
+    rows = db.execute(statement if statement is not None else select_events())
+    return [EventRecord(*row) for row in rows]
@@ -0,0 +1,197 @@
+"""
+Retention Module
+Keeps the hot tables small: events that ended more than
+EVENT_RETENTION_DAYS ago and chat messages older than CHAT_RETENTION_DAYS
+move to archive tables in short batched transactions, then freed pages
+are returned to the OS with an incremental vacuum. Archives stay
+queryable for the admin API.
+
+Events are deleted through the ORM so the calendar, recommender and
+duplicate indexes see them go; chat messages have no listeners and move
+with set-based INSERT ... SELECT / DELETE. The event_changes log those
+indexes follow is trimmed to EVENT_CHANGES_RETENTION_HOURS.
+
+Run once with `python -m Campus_event_notifier.retention`; the scheduler
+runs it daily at RETENTION_RUN_AT.
+
+Tunables (environment):
+    EVENT_RETENTION_DAYS     days after an event before it is archived (default 30)
+    CHAT_RETENTION_DAYS      age of chat messages to archive (default 90)
+    EVENT_CHANGES_RETENTION_HOURS   age of event_changes rows to prune (default 24)
+    RETENTION_BATCH_SIZE     rows moved per transaction (default 500)
+    RETENTION_VACUUM_PAGES   free pages released per run, 0 for all (default 0)
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from Campus_event_notifier.database import (
+    SessionLocal, engine, Event, ChatMessage, ArchivedEvent, ArchivedChatMessage
+)
+from Campus_event_notifier.event_changes import prune_event_changes
+from Campus_event_notifier.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+EVENT_RETENTION_DAYS = int(os.getenv("EVENT_RETENTION_DAYS", "30"))
+CHAT_RETENTION_DAYS = int(os.getenv("CHAT_RETENTION_DAYS", "90"))
+EVENT_CHANGES_RETENTION_HOURS = float(os.getenv("EVENT_CHANGES_RETENTION_HOURS", "24"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+RETENTION_VACUUM_PAGES = int(os.getenv("RETENTION_VACUUM_PAGES", "0"))
+
+# SQLite auto_vacuum modes
+AUTO_VACUUM_INCREMENTAL = 2
+
+ARCHIVED_ROWS = registry.counter(
+    "retention_archived_rows_total",
+    "Rows moved to archive tables",
+    ("table",),
+)
+
+
+@dataclass
+class RetentionRun:
+    events_archived: int = 0
+    chat_messages_archived: int = 0
+    event_changes_pruned: int = 0
+    pages_freed: int = 0
+    seconds: float = 0.0
+
+
+def archive_events(db: Session, before: str, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    """Move events dated before `before` (YYYY-MM-DD) to archived_events, one batch per transaction"""
+    moved = 0
+    while True:
+        batch = (
+            db.query(Event)
+            .filter(Event.date < before)
+            .order_by(Event.date, Event.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return moved
+        db.add_all([
+            ArchivedEvent(event_id=e.id, name=e.name, date=e.date, location=e.location,
+                          description=e.description, created_at=e.created_at)
+            for e in batch
+        ])
+        for event in batch:
+            db.delete(event)
+        db.commit()
+        moved += len(batch)
+        ARCHIVED_ROWS.labels(table="events").inc(len(batch))
+
+
+def archive_chat_messages(db: Session, before: datetime, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    """Move chat messages older than `before` to archived_chat_messages, one batch per transaction"""
+    columns = ("user_id", "message", "response", "timestamp")
+    moved = 0
+    while True:
+        ids = db.execute(
+            select(ChatMessage.id)
+            .where(ChatMessage.timestamp < before)
+            .order_by(ChatMessage.timestamp, ChatMessage.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return moved
+        db.execute(insert(ArchivedChatMessage).from_select(
+            ("message_id",) + columns,
+            select(ChatMessage.id, *(getattr(ChatMessage, c) for c in columns)).where(ChatMessage.id.in_(ids)),
+        ))
+        db.execute(delete(ChatMessage).where(ChatMessage.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+        ARCHIVED_ROWS.labels(table="chat_messages").inc(len(ids))
+
+
+def ensure_incremental_vacuum(bind=engine) -> bool:
+    """Switch the database to incremental auto-vacuum (a one-off full VACUUM); True if already on"""
+    with bind.connect() as conn:
+        mode = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+    if mode == AUTO_VACUUM_INCREMENTAL:
+        return True
+    logger.info("Enabling incremental auto-vacuum (one-time full VACUUM)")
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+    return False
+
+
+def incremental_vacuum(bind=engine, pages: int = RETENTION_VACUUM_PAGES) -> int:
+    """Release up to `pages` free pages (0 = all); returns how many were freed"""
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        # The pragma frees one page per step; executescript steps it to completion
+        conn.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        after = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+    return before - after
+
+
+def run_retention(today: Optional[date] = None) -> RetentionRun:
+    """Archive everything past its retention window, then vacuum"""
+    start = time.perf_counter()
+    today = today or date.today()
+    result = RetentionRun()
+    db = SessionLocal()
+    try:
+        result.events_archived = archive_events(db, (today - timedelta(days=EVENT_RETENTION_DAYS)).isoformat())
+        result.chat_messages_archived = archive_chat_messages(
+            db, datetime.combine(today, datetime.min.time()) - timedelta(days=CHAT_RETENTION_DAYS)
+        )
+        result.event_changes_pruned = prune_event_changes(
+            db, datetime.utcnow() - timedelta(hours=EVENT_CHANGES_RETENTION_HOURS)
+        )
+    except Exception:
+        db.rollback()
+        logger.exception("Retention run failed")
+    finally:
+        db.close()
+
+    if ensure_incremental_vacuum():
+        result.pages_freed = incremental_vacuum()
+    result.seconds = time.perf_counter() - start
+    logger.info(
+        "Retention: archived %d events and %d chat messages, pruned %d event changes, freed %d pages in %.2fs",
+        result.events_archived, result.chat_messages_archived, result.event_changes_pruned,
+        result.pages_freed, result.seconds,
+    )
+    return result
+
+
+def search_archived_events(db: Session, q: Optional[str] = None, since: Optional[str] = None,
+                           until: Optional[str] = None, limit: int = 50) -> List[ArchivedEvent]:
+    """Archived events, newest first, optionally by name substring and date range"""
+    query = db.query(ArchivedEvent)
+    if since:
+        query = query.filter(ArchivedEvent.date >= since)
+    if until:
+        query = query.filter(ArchivedEvent.date < until)
+    if q:
+        query = query.filter(ArchivedEvent.name.ilike(f"%{q}%"))
+    return query.order_by(ArchivedEvent.date.desc(), ArchivedEvent.event_id.desc()).limit(limit).all()
+
+
+def archived_chat_history(db: Session, user_id: int, limit: int = 50) -> List[ArchivedChatMessage]:
+    """A user's archived chat messages, newest first"""
+    return (
+        db.query(ArchivedChatMessage)
+        .filter(ArchivedChatMessage.user_id == user_id)
+        .order_by(ArchivedChatMessage.timestamp.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+if __name__ == "__main__":
+    run = run_retention()
+    print(f"Archived {run.events_archived} events and {run.chat_messages_archived} chat messages, "
+          f"freed {run.pages_freed} pages in {run.seconds:.2f}s")
@@ -3,16 +3,29 @@ Event Scheduler Module
 Handles automated event notifications and reminders
 """
 
+import logging
+import os
 import schedule
 import time
 from datetime import datetime, timedelta
-from Campus_event_notifier.database import get_db, Event
+from Campus_event_notifier.database import SessionLocal, Event
 from Campus_event_notifier.notification import send_event_notification
+from Campus_event_notifier.leader import LeaderLease
+from Campus_event_notifier.digest import run_digest
+from Campus_event_notifier.retention import run_retention
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger(__name__)
+
+IMMEDIATE_SWEEP_MINUTES = int(os.getenv("DIGEST_IMMEDIATE_MINUTES", "15"))
+DIGEST_SEND_AT = os.getenv("DIGEST_SEND_AT", "08:00")
+RETENTION_RUN_AT = os.getenv("RETENTION_RUN_AT", "03:30")
+
 class EventScheduler:
     def __init__(self):
         self.jobs = []
+        # Every worker may start the scheduler; only the lease holder runs jobs
+        self.lease = LeaderLease("scheduler")
 
     def schedule_event_reminders(self, db: Session):
         """
@@ -35,7 +48,7 @@ class EventScheduler:
             if days_until == 1:
                 # In a real implementation, you'd store subscriber emails
                 # For now, this is a placeholder
-                print(f"📅 Reminder scheduled for event: {event.name} on {event.date}")
+                logger.info("Reminder scheduled for event: %s on %s", event.name, event.date)
 
     def start_scheduler(self):
         """
@@ -44,10 +57,20 @@ class EventScheduler:
         # Schedule daily checks at 9 AM
         schedule.every().day.at("09:00").do(self.daily_reminder_check)
 
-        print("🕒 Event scheduler started")
+        # Digests: immediate subscribers on a short sweep, daily/weekly once per period
+        schedule.every(IMMEDIATE_SWEEP_MINUTES).minutes.do(self.send_digests, "immediate")
+        schedule.every().day.at(DIGEST_SEND_AT).do(self.send_digests, "daily")
+        schedule.every().monday.at(DIGEST_SEND_AT).do(self.send_digests, "weekly")
+
+        # Archive past events and old chat history while traffic is low
+        schedule.every().day.at(RETENTION_RUN_AT).do(self.archive_old_rows)
+
+        self.lease.start_heartbeat()
+        logger.info("Event scheduler started")
 
         while True:
-            schedule.run_pending()
+            if self.lease.is_leader:
+                schedule.run_pending()
             time.sleep(60)  # Check every minute
 
     def daily_reminder_check(self):
@@ -55,11 +78,31 @@ class EventScheduler:
         Daily check for events requiring reminders
         """
         try:
-            db = next(get_db())
-            self.schedule_event_reminders(db)
-            db.close()
+            db = SessionLocal()
+            try:
+                self.schedule_event_reminders(db)
+            finally:
+                db.close()
+        except Exception as e:
+            logger.exception("Scheduler error: %s", e)
+
+    def send_digests(self, frequency: str):
+        """
+        Send the due digests for one frequency
+        """
+        try:
+            run_digest(frequency)
+        except Exception as e:
+            logger.exception("Digest error: %s", e)
+
+    def archive_old_rows(self):
+        """
+        Move past events and old chat messages to the archive tables
+        """
+        try:
+            run_retention()
         except Exception as e:
-            print(f"❌ Scheduler error: {e}")
+            logger.exception("Retention error: %s", e)
 
 # Global scheduler instance
 scheduler = EventScheduler()
@@ -0,0 +1,36 @@
+"""
+Shared State Module
+A small SQLite file shared by every worker process on the host, used for
+leader-election leases (see leader.py). Needs no external service.
+
+Cached event data needs no shared cache or invalidation broadcast here:
+each worker's event snapshot (snapshot.py) and in-memory indexes notice
+other workers' commits to the main database through SQLite's
+data_version (data_version.py) and the event_changes log
+(event_changes.py). Fragment caches are keyed by event version, so a
+stale entry is never served.
+"""
+
+import os
+import sqlite3
+import threading
+
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "./shared_state.db")
+
+_local = threading.local()
+
+
+def connect(path: str = None) -> sqlite3.Connection:
+    """Return this thread's connection to the shared state database"""
+    path = path or SHARED_STATE_PATH
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        # Autocommit mode; callers open explicit transactions where they need them
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        connections[path] = conn
+    return conn
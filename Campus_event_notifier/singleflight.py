@@ -0,0 +1,48 @@
+"""
+Single-Flight Module
+Coalesces concurrent calls that share a key into one in-progress
+computation whose result (or exception) every caller receives.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from Campus_event_notifier.metrics import registry
+
+SINGLEFLIGHT_CALLS = registry.counter(
+    "singleflight_calls_total",
+    "Single-flight calls by group and role (leader ran it, coalesced waited on it)",
+    ("group", "role"),
+)
+
+
+class SingleFlight:
+    """Deduplicate concurrent async calls by key"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() for key, or wait for the call already running for key"""
+        task = self._tasks.get(key)
+        if task is None:
+            # Run as its own task so a cancelled leader doesn't cancel the followers
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+            role = "leader"
+        else:
+            role = "coalesced"
+        SINGLEFLIGHT_CALLS.labels(group=self.name, role=role).inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception as retrieved when every caller has gone away
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,222 @@
+"""
+Event Snapshot Module
+An immutable, read-optimized copy of the events table that serves the
+home page, the dashboard's first page and the chatbot without touching
+the database. Rows are sorted by (date, id) and formatted for display
+once per build; views such as "upcoming events grouped by category" are
+computed at most once per snapshot.
+
+Writes never modify a snapshot: a committed event write, or a change in
+SQLite's `PRAGMA data_version` (a commit from another connection or
+worker), makes the next read build a fresh snapshot and swap the
+reference. Where data_version can't be read, every check rebuilds.
+Retention keeps the events table to recent and upcoming
+events, so the whole table fits comfortably in memory.
+
+Tunables (environment):
+    SNAPSHOT_CHECK_SECONDS   how often readers poll data_version for writes
+                             made outside this process, or rebuild when it
+                             can't be read (default 1)
+"""
+
+import bisect
+import itertools
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session, object_session
+
+from Campus_event_notifier.data_version import DataVersionWatcher
+from Campus_event_notifier.database import Event
+from Campus_event_notifier.metrics import registry
+from Campus_event_notifier.pagination import DEFAULT_PAGE_SIZE, encode_cursor
+from Campus_event_notifier.records import EventCard, EventRecord, load_event_records, parse_event_start
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CHECK_SECONDS = float(os.getenv("SNAPSHOT_CHECK_SECONDS", "1"))
+
+# Grouped views kept per snapshot (one per distinct window of upcoming events)
+MAX_VIEWS = 16
+
+SNAPSHOT_REBUILDS = registry.counter(
+    "event_snapshot_rebuilds_total",
+    "Event snapshot rebuilds by what showed the data had changed",
+    ("reason",),
+)
+SNAPSHOT_EVENTS = registry.gauge(
+    "event_snapshot_events",
+    "Events held in the current snapshot",
+)
+
+# Bumped after every commit that wrote events; snapshots built before it are stale
+_generations = itertools.count(1)
+_write_generation = 0
+
+
+class EventSnapshot:
+    """Events sorted by (date, id): raw rows for pages and the chatbot, formatted cards for the home page"""
+
+    __slots__ = ("rows", "dates", "starts", "cards", "generation", "data_version", "built_at", "_views", "_lock")
+
+    def __init__(self, records, generation: int = 0, data_version: Optional[int] = None):
+        self.rows: Tuple[EventRecord, ...] = tuple(records)
+        self.dates: Tuple[str, ...] = tuple(record.date for record in self.rows)
+        self.starts: Tuple[Optional[datetime], ...] = tuple(parse_event_start(date) for date in self.dates)
+        self.cards: Tuple[EventCard, ...] = tuple(
+            EventCard.from_record(record, start) for record, start in zip(self.rows, self.starts)
+        )
+        self.generation = generation
+        self.data_version = data_version
+        self.built_at = time.time()
+        self._views: Dict[Tuple, Mapping] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _upcoming_positions(self, now: datetime, limit: int) -> Tuple[int, int, List[int]]:
+        """Positions of the next `limit` events; events earlier today with a known time are skipped"""
+        first = bisect.bisect_left(self.dates, now.strftime("%Y-%m-%d"))
+        positions: List[int] = []
+        skipped = 0
+        for position in range(first, len(self.rows)):
+            if len(positions) >= limit:
+                break
+            start = self.starts[position]
+            if start is not None and start < now:
+                skipped += 1
+                continue
+            positions.append(position)
+        return first, skipped, positions
+
+    def upcoming(self, now: Optional[datetime] = None, limit: int = 10) -> List[EventRecord]:
+        """The next `limit` events as raw rows"""
+        _, _, positions = self._upcoming_positions(now or datetime.now(), limit)
+        return [self.rows[position] for position in positions]
+
+    def upcoming_by_category(self, now: Optional[datetime] = None, limit: int = 20) -> Mapping[str, Tuple[EventCard, ...]]:
+        """The next `limit` events as display cards grouped by category, built once per window"""
+        first, skipped, positions = self._upcoming_positions(now or datetime.now(), limit)
+        # Within one snapshot, the start position and number of passed events fix the window
+        key = (first, skipped, limit)
+        view = self._views.get(key)
+        if view is not None:
+            return view
+        grouped: Dict[str, List[EventCard]] = {}
+        for position in positions:
+            card = self.cards[position]
+            grouped.setdefault(card.category, []).append(card)
+        view = MappingProxyType({category: tuple(cards) for category, cards in grouped.items()})
+        with self._lock:
+            if len(self._views) >= MAX_VIEWS:
+                self._views.clear()
+            self._views[key] = view
+        return view
+
+    def first_page(self, limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[EventRecord], Optional[str]]:
+        """The first page of all events, matching pagination.fetch_events_page(db)"""
+        events = list(self.rows[:limit])
+        has_more = len(self.rows) > limit
+        next_cursor = encode_cursor(events[-1].date, events[-1].id) if has_more else None
+        return events, next_cursor
+
+
+class SnapshotStore:
+    """Holds the current snapshot and replaces it when the events table changes"""
+
+    def __init__(self, check_seconds: float = SNAPSHOT_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._snapshot: Optional[EventSnapshot] = None
+        self._bind = None
+        self._data_version = DataVersionWatcher()
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def cached(self, bind) -> Optional[EventSnapshot]:
+        """The current snapshot if it needs no database check right now, else None"""
+        snapshot = self._snapshot
+        if (snapshot is None or self._bind is not bind or snapshot.generation != _write_generation
+                or time.monotonic() - self._checked_at >= self.check_seconds):
+            return None
+        return snapshot
+
+    async def current_async(self, bind) -> EventSnapshot:
+        """current() for async callers: checks for writes off the event loop only when a check is due"""
+        snapshot = self.cached(bind)
+        if snapshot is None:
+            snapshot = await run_in_threadpool(self.current, bind)
+        return snapshot
+
+    def current(self, bind) -> EventSnapshot:
+        """The current snapshot, rebuilt first if the events table has changed"""
+        snapshot = self.cached(bind)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            snapshot = self.cached(bind)
+            if snapshot is not None:
+                return snapshot
+            if self._bind is not bind:
+                self._bind = bind
+                self._snapshot = None
+            # Read the generation and data_version before the rows so a concurrent write triggers another build
+            generation = _write_generation
+            data_version = self._data_version.read(bind)
+            snapshot = self._snapshot
+            if snapshot is None:
+                reason = "initial"
+            elif snapshot.generation != generation:
+                reason = "write"
+            elif data_version is None:
+                # No data_version (not SQLite, or the read failed): rebuild on every due check
+                reason = "unversioned"
+            elif data_version != snapshot.data_version:
+                reason = "data_version"
+            else:
+                reason = None
+            if reason:
+                snapshot = self._build(generation, data_version)
+                SNAPSHOT_REBUILDS.labels(reason=reason).inc()
+                SNAPSHOT_EVENTS.set(len(snapshot))
+                logger.debug("Rebuilt event snapshot (%s): %d events", reason, len(snapshot))
+                self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def _build(self, generation: int, data_version: Optional[int]) -> EventSnapshot:
+        with self._bind.connect() as connection:
+            records = load_event_records(connection)
+        return EventSnapshot(records, generation, data_version)
+
+
+# Global event snapshot instance
+event_snapshot = SnapshotStore()
+
+
+@sa_event.listens_for(Event, "after_insert")
+@sa_event.listens_for(Event, "after_update")
+@sa_event.listens_for(Event, "after_delete")
+def _mark_events_written(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info["events_written"] = True
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _events_committed(session):
+    global _write_generation
+    if session.info.pop("events_written", None):
+        _write_generation = next(_generations)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _events_rolled_back(session):
+    session.info.pop("events_written", None)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-recipient email serialization: a fresh MIMEMultipart per
+recipient (the old send_notification path) vs a render-once CompiledEmail
+Usage: python bench_email_templates.py [num_recipients]
+"""
+
+import sys
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from Campus_event_notifier.email_templates import event_announcement, unsubscribe_url
+
+EVENT = {
+    "name": "Annual Tech Symposium",
+    "date": "2026-11-14",
+    "location": "N-Block, Seminar Hall",
+    "description": "Talks on AI, robotics and renewable energy from industry speakers and alumni.",
+}
+
+
+def legacy_message(email):
+    """What send_notification used to build for every recipient"""
+    body = f"""
+    Hello!
+
+    We have an exciting event coming up:
+
+    📅 Event: {EVENT['name']}
+    📆 Date: {EVENT['date']}
+    📍 Location: {EVENT['location']}
+
+    Don't miss out! Mark your calendar and join us.
+
+    Unsubscribe: {unsubscribe_url(email)}
+    """
+    msg = MIMEMultipart()
+    msg['From'] = "Campus Events <events@example.edu>"
+    msg['To'] = email
+    msg['Subject'] = f"Upcoming Event: {EVENT['name']}"
+    msg.attach(MIMEText(body.strip(), 'plain'))
+    return msg.as_string()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    recipients = [f"student{i}@example.edu" for i in range(n)]
+    print(f"📊 Email serialization benchmark with {n:,} recipients")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    legacy_bytes = sum(len(legacy_message(r)) for r in recipients)
+    legacy = time.perf_counter() - start
+    print(f"Per-recipient MIME (text only): {legacy:.2f} s  {legacy / n * 1e6:7.1f} µs/recipient  {legacy_bytes / n:,.0f} B avg")
+
+    start = time.perf_counter()
+    compiled = event_announcement(**EVENT)
+    render = time.perf_counter() - start
+    start = time.perf_counter()
+    compiled_bytes = sum(len(compiled.for_recipient(r)) for r in recipients)
+    blast = time.perf_counter() - start
+    print(f"Render once (text + HTML):      {render * 1000:.2f} ms")
+    print(f"Per-recipient join:             {blast:.2f} s  {blast / n * 1e6:7.1f} µs/recipient  {compiled_bytes / n:,.0f} B avg")
+    print(f"Speedup: {legacy / (render + blast):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
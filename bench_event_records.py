@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark Core-selected event records against ORM objects copied into dicts
+Usage: python bench_event_records.py [num_events ...]   (default: 10000 100000)
+"""
+
+import gc
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier.database import Base, Event
+from Campus_event_notifier.records import load_event_records, select_events
+
+PLACES = ["N-Block, Computer Lab", "University Cricket Ground", "A-Block OAT", "H-Block, ECE Labs",
+          "Central Library", "Auditorium", "Seminar Hall", "Open Grounds"]
+
+
+def populate(engine, n):
+    rng = random.Random(42)
+    rows = [
+        {
+            "name": f"Event {i}",
+            "date": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "location": rng.choice(PLACES),
+            "description": f"Description of event {i} with a few words of detail.",
+        }
+        for i in range(n)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(Event.__table__), rows)
+
+
+def legacy_dicts(db):
+    """The previous read path: full ORM objects copied into dicts field by field"""
+    events = db.query(Event).order_by(Event.date, Event.id).all()
+    return [
+        {
+            "id": event.id,
+            "name": event.name,
+            "date": event.date,
+            "location": event.location,
+            "description": event.description
+        }
+        for event in events
+    ]
+
+
+def records(db):
+    return load_event_records(db, select_events())
+
+
+def measure(Session, load, repeat):
+    """Median wall time, and peak / retained traced memory, for one load in a fresh session"""
+    samples = []
+    for _ in range(repeat):
+        db = Session()
+        gc.collect()
+        start = time.perf_counter()
+        load(db)
+        samples.append(time.perf_counter() - start)
+        db.close()
+
+    db = Session()
+    gc.collect()
+    tracemalloc.start()
+    result = load(db)
+    peak = tracemalloc.get_traced_memory()[1]
+    db.close()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return statistics.median(samples), peak, retained
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for n in sizes:
+        path = os.path.join(tempfile.mkdtemp(), "bench_records.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, n)
+        Session = sessionmaker(bind=engine)
+        repeat = 5 if n <= 20_000 else 3
+
+        print(f"\n📊 Event read path with {n:,} events")
+        print("=" * 60)
+        results = {}
+        for label, load in (("ORM -> dicts", legacy_dicts), ("Core records", records)):
+            seconds, peak, retained = measure(Session, load, repeat)
+            results[label] = (seconds, peak, retained)
+            print(f"{label:<14} {seconds * 1000:8.1f} ms  {seconds / n * 1e6:6.2f} µs/row  "
+                  f"peak {peak / n:6.0f} B/row  kept {retained / n:6.0f} B/row")
+        old, new = results["ORM -> dicts"], results["Core records"]
+        print(f"Records: {old[0] / new[0]:.1f}x faster, {old[1] / new[1]:.1f}x lower peak memory, "
+              f"{old[2] / new[2]:.1f}x less retained")
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
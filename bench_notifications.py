@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Benchmark notification sending against a local SMTP sink
+Usage: python bench_notifications.py [--recipients N] [--concurrency 1,4,16]
+       [--latency-ms MS] [--tls] [--fail-rate P] [--fail-code C] [--domain-rate R] [--per-message]
+
+The sink speaks enough SMTP for smtplib (EHLO, STARTTLS, AUTH PLAIN, MAIL,
+RCPT, DATA) and can add latency to every DATA and reject a fraction of
+messages. Every accepted message is checked against what was sent.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import email
+import io
+import os
+import random
+import ssl
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from email import policy
+
+
+def self_signed_context():
+    """Server-side SSL context with a throwaway certificate for localhost"""
+    from datetime import datetime, timedelta, timezone
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.now(timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name)
+            .public_key(key.public_key()).serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(minutes=1)).not_valid_after(now + timedelta(days=1))
+            .sign(key, hashes.SHA256()))
+    tmp = tempfile.mkdtemp(prefix="smtp-sink-")
+    cert_path, key_path = os.path.join(tmp, "cert.pem"), os.path.join(tmp, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+class SMTPSink:
+    """Minimal asyncio SMTP server that stores every accepted message"""
+
+    def __init__(self, latency=0.0, tls=False, fail_rate=0.0, fail_code=451, seed=0):
+        self.latency = latency
+        self.ssl_context = self_signed_context() if tls else None
+        self.fail_rate = fail_rate
+        self.fail_code = fail_code
+        self.rng = random.Random(seed)
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self.reset()
+
+    def reset(self):
+        self.connections = 0
+        self.rejected = 0
+        self.messages = defaultdict(list)
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        in_tls = False
+        rcpts = []
+
+        async def reply(text):
+            writer.write(text.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 sink ESMTP ready")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip()
+                verb = command[:4].upper()
+                if verb in ("EHLO", "HELO"):
+                    features = ["8BITMIME", "AUTH PLAIN"]
+                    if self.ssl_context and not in_tls:
+                        features.append("STARTTLS")
+                    await reply("\r\n".join(["250-sink"] + [f"250-{f}" for f in features[:-1]] + [f"250 {features[-1]}"]))
+                elif verb == "STAR":
+                    await reply("220 Ready to start TLS")
+                    await writer.start_tls(self.ssl_context)
+                    in_tls = True
+                elif verb == "AUTH":
+                    await reply("235 Authentication successful")
+                elif verb == "MAIL":
+                    rcpts = []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    rcpts.append(command.split(":", 1)[1].strip().strip("<>"))
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        data_line = await reader.readline()
+                        if data_line in (b".\r\n", b""):
+                            break
+                        lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    if self.rng.random() < self.fail_rate:
+                        self.rejected += 1
+                        await reply(f"{self.fail_code} Injected failure")
+                    else:
+                        body = b"".join(lines)
+                        for rcpt in rcpts:
+                            self.messages[rcpt].append(body)
+                        await reply("250 Message accepted")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("250 OK")
+        except (ConnectionError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def run(send_bulk, message, recipients, concurrency, per_message):
+    """Send to every recipient from `concurrency` threads; returns stats"""
+    latencies = []
+    results = {}
+    lock = threading.Lock()
+    chunks = [recipients[i::concurrency] for i in range(concurrency)]
+
+    def worker(chunk):
+        last = [time.perf_counter()]
+
+        def on_result(address, ok):
+            now = time.perf_counter()
+            with lock:
+                latencies.append(now - last[0])
+                results[address] = ok
+            last[0] = now
+
+        if per_message:
+            for address in chunk:
+                last[0] = time.perf_counter()
+                send_bulk(message, [address], on_result=on_result)
+        else:
+            send_bulk(message, chunk, on_result=on_result)
+
+    threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    # send_bulk logs every connection; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    return time.perf_counter() - start, latencies, results
+
+
+def verify(sink, message, results):
+    """Every accepted message arrived exactly once with the bodies we sent"""
+    problems = 0
+    for address, ok in results.items():
+        received = sink.messages.get(address, [])
+        if not ok:
+            problems += bool(received)
+            continue
+        if len(received) != 1:
+            problems += 1
+            continue
+        got = email.message_from_bytes(received[0], policy=policy.default)
+        sent = email.message_from_bytes(message.for_recipient(address), policy=policy.default)
+        if got["To"] != address or any(
+            got.get_body((kind,)).get_content() != sent.get_body((kind,)).get_content()
+            for kind in ("plain", "html")
+        ):
+            problems += 1
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=5000)
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="sink delay per DATA")
+    parser.add_argument("--tls", action="store_true", help="require STARTTLS (self-signed)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of messages rejected")
+    parser.add_argument("--fail-code", type=int, default=451)
+    parser.add_argument("--domain-rate", type=float, default=1e9,
+                        help="per-domain messages/s (DELIVERY_DOMAIN_RATE); unthrottled by default")
+    parser.add_argument("--retry-base-ms", type=float, default=10.0,
+                        help="backoff base for transient failures (DELIVERY_RETRY_BASE_SECONDS)")
+    parser.add_argument("--per-message", action="store_true",
+                        help="also measure one connection per message")
+    args = parser.parse_args()
+
+    sink = SMTPSink(latency=args.latency_ms / 1000, tls=args.tls,
+                    fail_rate=args.fail_rate, fail_code=args.fail_code).start()
+    os.environ.update({
+        "SMTP_HOST": "127.0.0.1", "SMTP_PORT": str(sink.port),
+        "SMTP_STARTTLS": "1" if args.tls else "0",
+        "EMAIL_USERNAME": "bench@example.edu", "EMAIL_PASSWORD": "bench",
+        "DELIVERY_DOMAIN_RATE": str(args.domain_rate), "DELIVERY_DOMAIN_BURST": str(min(args.domain_rate, 1e9)),
+        "DELIVERY_RETRY_BASE_SECONDS": str(args.retry_base_ms / 1000),
+    })
+    from Campus_event_notifier.email_templates import event_announcement
+    from Campus_event_notifier.notification import send_bulk
+
+    message = event_announcement("Annual Tech Symposium", "2026-11-14", "N-Block, Seminar Hall",
+                                 "Talks on AI, robotics and renewable energy.")
+    recipients = [f"student{i}@example.edu" for i in range(args.recipients)]
+
+    print(f"📊 Notification benchmark: {len(recipients):,} recipients, latency {args.latency_ms} ms, "
+          f"TLS {'on' if args.tls else 'off'}, fail rate {args.fail_rate:.1%}")
+    print("=" * 96)
+    print(f"{'mode':<14}{'conc':>5}{'msgs/s':>10}{'conns':>7}{'sent':>8}{'failed':>8}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'intact':>10}")
+
+    modes = [("shared conn", False)] + ([("conn per msg", True)] if args.per_message else [])
+    for label, per_message in modes:
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            sink.reset()
+            elapsed, latencies, results = run(send_bulk, message, recipients, concurrency, per_message)
+            sent = sum(results.values())
+            problems = verify(sink, message, results) + (len(recipients) - len(results))
+            print(f"{label:<14}{concurrency:>5}{len(recipients) / elapsed:>10,.0f}{sink.connections:>7}"
+                  f"{sent:>8}{len(results) - sent:>8}"
+                  f"{percentile(latencies, 0.50) * 1000:>9.2f}{percentile(latencies, 0.95) * 1000:>9.2f}"
+                  f"{percentile(latencies, 0.99) * 1000:>9.2f}{'✅' if not problems else f'❌ {problems}':>10}")
+    sink.stop()
+
+
+if __name__ == "__main__":
+    main()
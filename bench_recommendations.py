@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark the TF-IDF recommendation index against the old keyword loop
+Usage: python bench_recommendations.py [num_events]
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from Campus_event_notifier.recommender import TfidfIndex, event_text
+
+TOPICS = ["AI", "machine learning", "robotics", "cricket", "football", "photography", "music",
+          "dance", "debate", "literature", "chemistry", "renewable energy", "cybersecurity",
+          "web development", "food technology", "startup", "career", "art", "drama", "quiz"]
+KINDS = ["Workshop", "Hackathon", "Tournament", "Contest", "Symposium", "Fair", "Exhibition",
+         "Bootcamp", "Seminar", "Festival", "Meetup", "Competition"]
+PLACES = ["N-Block, Computer Lab", "University Cricket Ground", "A-Block OAT", "H-Block, ECE Labs",
+          "Central Library", "Auditorium", "Seminar Hall", "Open Grounds"]
+QUERIES = ["machine learning workshop", "cricket tournament", "photography contest",
+           "renewable energy seminar", "music festival", "career fair startups", "coding hackathon"]
+
+
+def make_events(n):
+    rng = random.Random(42)
+    events = []
+    for i in range(n):
+        topic = rng.choice(TOPICS)
+        kind = rng.choice(KINDS)
+        events.append({
+            "id": i + 1,
+            "name": f"{topic.title()} {kind} {i}",
+            "date": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "location": rng.choice(PLACES),
+            "description": f"A {kind.lower()} about {topic} with {rng.choice(TOPICS)} and {rng.choice(TOPICS)} sessions."
+        })
+    return events
+
+
+def legacy_suggestions(events, user_interests):
+    """The previous get_event_suggestions keyword loop, applied to every event"""
+    interests = user_interests.lower().split()
+    scored = []
+    for event in events:
+        score = 0
+        text = f"{event['name']} {event['description']}".lower()
+        for interest in interests:
+            if interest in text:
+                score += 1
+        if score > 0:
+            scored.append((event, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:5]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"📊 Recommendation benchmark with {n:,} events")
+    print("=" * 50)
+    events = make_events(n)
+
+    index = TfidfIndex()
+    start = time.perf_counter()
+    for e in events:
+        index.upsert(e["id"], event_text(e["name"], e["description"], e["location"]), e["date"])
+    build = time.perf_counter() - start
+    print(f"Index build:        {build:.2f} s ({n / build:,.0f} events/s), vocab={len(index.vocab)}")
+
+    p50, p95 = timed(lambda: [index.search(q, k=5, min_date="2026-06-01") for q in QUERIES], 20)
+    print(f"TF-IDF query:       p50 {p50 / len(QUERIES):.2f} ms  p95 {p95 / len(QUERIES):.2f} ms per query")
+
+    p50, p95 = timed(lambda: [legacy_suggestions(events, q) for q in QUERIES], 3)
+    print(f"Legacy keyword loop: p50 {p50 / len(QUERIES):.2f} ms  p95 {p95 / len(QUERIES):.2f} ms per query")
+
+    rng = random.Random(7)
+    def update():
+        e = events[rng.randrange(n)]
+        index.upsert(e["id"], event_text(e["name"] + " updated", e["description"], e["location"]), e["date"])
+    p50, p95 = timed(update, 1000)
+    print(f"Incremental upsert: p50 {p50 * 1000:.0f} µs  p95 {p95 * 1000:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
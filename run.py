@@ -41,6 +41,10 @@ def check_environment():
     
     load_dotenv(dotenv_path=env_file)
     load_dotenv(dotenv_path=pkg_env)
+
+    # Before initialize_database(): importing database.py runs migrations that log
+    from Campus_event_notifier.logging_config import setup_logging
+    setup_logging()
     
     print("✅ Environment variables are configured")
     return True
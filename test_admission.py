@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test admission control for the LLM routes
+"""
+
+import asyncio
+
+from Campus_event_notifier.admission import RateLimiter, ConcurrencyLimiter, Overloaded
+
+
+def test_rate_limiter_refill_and_eviction():
+    """Test token refill and that idle/overflow buckets are evicted"""
+    limiter = RateLimiter(rate_per_second=1.0, burst=2, max_keys=2, idle_seconds=60)
+
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("a", now=0) > 0
+    assert limiter.acquire("a", now=1) == 0
+
+    limiter.acquire("b", now=1)
+    limiter.acquire("c", now=1)
+    assert len(limiter) == 2
+
+    limiter.acquire("d", now=100)
+    assert len(limiter) == 1
+    print("✅ Rate limiter refills and evicts buckets")
+
+
+def test_concurrency_limiter_sheds_load():
+    """Test that callers beyond the slots and queue are rejected quickly"""
+    gate = ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=0.5)
+    results = []
+
+    async def worker():
+        try:
+            async with gate.slot():
+                await asyncio.sleep(0.1)
+            results.append("ok")
+        except Overloaded:
+            results.append("rejected")
+
+    async def main():
+        await asyncio.gather(worker(), worker(), worker())
+
+    asyncio.run(main())
+    assert sorted(results) == ["ok", "ok", "rejected"]
+    print("✅ Concurrency limiter admitted 2 and shed 1")
+
+
+if __name__ == "__main__":
+    test_rate_limiter_refill_and_eviction()
+    test_concurrency_limiter_sheds_load()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test the fingerprinted, precompressed static asset pipeline
+"""
+
+import gzip
+import json
+import tempfile
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from Campus_event_notifier import assets
+from Campus_event_notifier.assets import IMMUTABLE_CACHE_CONTROL, AssetManifest, PrecompressedStaticFiles
+
+CSS = "body { color: #333; }\n" * 200
+
+
+def make_manifest():
+    root = Path(tempfile.mkdtemp())
+    source = root / "static"
+    (source / "img").mkdir(parents=True)
+    (source / "style.css").write_text(CSS)
+    (source / "img" / "logo.png").write_bytes(bytes(range(256)) * 4)
+    return source, AssetManifest(source, root / "build", "/assets/")
+
+
+def test_build_fingerprints_and_precompresses():
+    """Test hashed names, the manifest file, .gz/.br variants and URLs"""
+    source, manifest = make_manifest()
+    files = manifest.build()
+    build = manifest.build_dir
+
+    css = files["style.css"]
+    assert css.startswith("style.") and css.endswith(".css") and len(css.split(".")[1]) == 12
+    assert (build / css).read_text() == CSS
+    assert gzip.decompress((build / f"{css}.gz").read_bytes()).decode() == CSS
+    if assets.brotli is not None:
+        assert assets.brotli.decompress((build / f"{css}.br").read_bytes()).decode() == CSS
+
+    # Binary assets are fingerprinted but never compressed
+    logo = files["img/logo.png"]
+    assert logo.startswith("img/logo.") and (build / logo).exists()
+    assert not list(build.glob("img/*.gz")) and not list(build.glob("img/*.br"))
+
+    assert json.loads((build / assets.MANIFEST_NAME).read_text()) == files
+    assert manifest.url("/style.css") == f"/assets/{css}"
+    assert manifest.url("missing.js") == "/static/missing.js"
+
+    # Identical content keeps its name; an edit gets a new one
+    assert manifest.build() == files
+    (source / "style.css").write_text(CSS + "a { color: red; }\n")
+    assert manifest.build()["style.css"] != css
+    print("✅ Assets fingerprinted and precompressed")
+
+
+def test_rebuild_prunes_stale_files():
+    """Test that a rebuild removes outdated fingerprinted files and leaves unrelated ones"""
+    source, manifest = make_manifest()
+    old = manifest.build()
+    (manifest.build_dir / "README.txt").write_text("keep me")
+    (source / "style.css").write_text(CSS + "a { color: red; }\n")
+    (source / "img" / "logo.png").unlink()
+    (source / "img").rmdir()
+    new = manifest.build()
+
+    build = manifest.build_dir
+    remaining = sorted(p.relative_to(build).as_posix() for p in build.rglob("*"))
+    variants = [f"{new['style.css']}{suffix}" for suffix in (".br", ".gz") if (build / f"{new['style.css']}{suffix}").exists()]
+    assert remaining == sorted(["README.txt", assets.MANIFEST_NAME, new["style.css"], *variants])
+    assert not (build / old["style.css"]).exists() and not (build / "img").exists()
+    print("✅ Rebuild prunes stale fingerprinted files")
+
+
+def make_client():
+    source, manifest = make_manifest()
+    files = manifest.build()
+    app = FastAPI()
+    app.mount("/assets", PrecompressedStaticFiles(directory=str(manifest.build_dir)), name="assets")
+    return TestClient(app), files, manifest.build_dir
+
+
+def test_serves_negotiated_encoding_with_immutable_caching():
+    """Test Accept-Encoding negotiation, q=0 exclusion, and the immutable Cache-Control header"""
+    client, files, build = make_client()
+    url = f"/assets/{files['style.css']}"
+    sizes = {None: len(CSS.encode())}
+    for encoding, suffix in (("gzip", ".gz"), ("br", ".br")):
+        variant = build / f"{files['style.css']}{suffix}"
+        if variant.exists():
+            sizes[encoding] = variant.stat().st_size
+
+    cases = [("identity", None), ("gzip", "gzip"), ("gzip;q=0, identity", None)]
+    if assets.brotli is not None:
+        cases += [("gzip, deflate, br", "br"), ("br;q=0, gzip", "gzip")]
+    for accept, encoding in cases:
+        response = client.get(url, headers={"Accept-Encoding": accept})
+        assert response.status_code == 200, accept
+        assert response.headers.get("content-encoding") == encoding, accept
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["content-type"].startswith("text/css")
+        assert int(response.headers["content-length"]) == sizes[encoding], accept
+        assert response.text == CSS, accept  # The client decodes the variant
+
+    logo = client.get(f"/assets/{files['img/logo.png']}", headers={"Accept-Encoding": "gzip, br"})
+    assert logo.status_code == 200 and "content-encoding" not in logo.headers
+    assert logo.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    missing = client.get("/assets/style.000000000000.css")
+    assert missing.status_code == 404 and missing.headers.get("cache-control") != IMMUTABLE_CACHE_CONTROL
+    print("✅ Precompressed variants negotiated and cached immutably")
+
+
+if __name__ == "__main__":
+    test_build_fingerprints_and_precompresses()
+    test_rebuild_prunes_stale_files()
+    test_serves_negotiated_encoding_with_immutable_caching()
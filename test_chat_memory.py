@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test token-budgeted chat memory
+"""
+
+from Campus_event_notifier.chat_memory import Conversation, ConversationStore, estimate_tokens
+
+
+def test_conversation_stays_within_budget():
+    """Test that old turns are folded into the summary and recent ones kept verbatim"""
+    conversation = Conversation("test", budget=300, summary_budget=120, min_recent=2)
+    for i in range(40):
+        conversation.add_turn(
+            f"Question {i}: which events are happening in the library this week?",
+            f"Answer {i}. There is a study skills workshop on Tuesday and a book fair on Friday. " * 3,
+        )
+
+    assert conversation.tokens <= 300
+    assert conversation.summary_tokens <= 120
+    assert len(conversation.turns) >= 2
+    assert conversation.turns[-1].user.startswith("Question 39")
+    rendered = conversation.render()
+    assert "Summary of the earlier conversation" in rendered
+    assert "Question 39" in rendered and "Question 0:" not in rendered
+    assert estimate_tokens(rendered) < 400
+    print(f"✅ 40 turns compacted to ~{conversation.tokens} tokens ({len(conversation.turns)} verbatim)")
+
+
+def test_store_evicts_lru_and_idle_conversations():
+    """Test LRU capacity eviction and idle expiry"""
+    store = ConversationStore(max_conversations=2, idle_seconds=60)
+    first = store.get(None, now=0)
+    second = store.get(None, now=1)
+    assert store.get(first.id, now=2) is first  # first is now most recent
+    store.get(None, now=3)  # evicts second
+    assert len(store) == 2
+    assert store.get(second.id, now=4) is not second
+
+    assert store.get(first.id, now=200) is not first  # idle too long
+    print("✅ Conversation store evicts least-recently-used and idle conversations")
+
+
+if __name__ == "__main__":
+    test_conversation_stays_within_budget()
+    test_store_evicts_lru_and_idle_conversations()
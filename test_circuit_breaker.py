@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test the circuit breaker and hedged LLM calls against a fake LLM
+"""
+
+import asyncio
+import time
+
+from Campus_event_notifier.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from Campus_event_notifier.llm import FakeLLM, LLMClient, LLMUnavailable
+
+
+def test_breaker_opens_fails_fast_and_recovers():
+    """Test closed -> open -> half-open -> closed, with slow calls counted as failures"""
+    now = [0.0]
+    breaker = CircuitBreaker("test", failure_threshold=3, slow_call_seconds=1.0, open_seconds=10, clock=lambda: now[0])
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(elapsed=5.0)  # too slow
+    assert breaker.state == OPEN
+    try:
+        breaker.acquire()
+        assert False, "open breaker admitted a call"
+    except CircuitOpen as e:
+        assert e.retry_after == 10
+
+    now[0] = 10.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.acquire() is True  # the one probe
+    try:
+        breaker.acquire()
+        assert False, "second probe admitted"
+    except CircuitOpen:
+        pass
+    breaker.record_failure(probe=True)
+    assert breaker.state == OPEN
+
+    now[0] = 20.0
+    probe = breaker.acquire()
+    breaker.record_success(elapsed=0.1, probe=probe)
+    assert breaker.state == CLOSED and breaker.acquire() is False
+    print("✅ Breaker opened after 3 failures, failed fast, and closed after a good probe")
+
+
+def test_llm_client_fails_fast_when_gemini_is_down():
+    """Test that a failing backend trips the breaker so later calls skip it entirely"""
+    backend = FakeLLM(failure_rate=1.0, latency=0.01)
+    client = LLMClient(backend, CircuitBreaker("fake_down", failure_threshold=3, open_seconds=60), timeout=1.0)
+
+    async def main():
+        reasons = []
+        for _ in range(10):
+            try:
+                await client.generate("hi", caller="test")
+            except LLMUnavailable as e:
+                reasons.append(e.reason)
+        return reasons
+
+    start = time.perf_counter()
+    reasons = asyncio.run(main())
+    assert reasons == ["error"] * 3 + ["circuit_open"] * 7
+    assert backend.calls == 3
+    assert time.perf_counter() - start < 0.5
+    print("✅ 7 of 10 calls failed fast once the breaker opened")
+
+
+class FirstCallHangs(FakeLLM):
+    def generate(self, prompt, timeout):
+        if self.calls == 0:
+            self.calls += 1
+            time.sleep(0.5)
+            raise TimeoutError("hung")
+        return super().generate(prompt, timeout)
+
+
+def test_llm_client_deadline_and_hedge():
+    """Test the per-call deadline and that a hedged request rescues a hung one"""
+    async def main():
+        hung = LLMClient(FakeLLM(hang_rate=1.0, hang_seconds=0.5), CircuitBreaker("fake_hung"), timeout=0.1)
+        try:
+            await hung.generate("hi", caller="test")
+            assert False, "deadline not enforced"
+        except LLMUnavailable as e:
+            assert e.reason == "timeout"
+
+        # First attempt hangs, the hedge (sent after 50 ms) answers
+        hedged = LLMClient(FirstCallHangs(reply="hedged"), CircuitBreaker("fake_hedge"), timeout=0.4, hedge_after=0.05)
+        start = time.perf_counter()
+        assert await hedged.generate("hi", caller="test") == "hedged"
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    assert elapsed < 0.3
+    print(f"✅ Hung call timed out; hedged call answered in {elapsed * 1000:.0f} ms")
+
+
+def test_cancelled_probe_releases_its_slot():
+    """Test that cancelling a half-open probe frees the slot instead of wedging the breaker"""
+    now = [0.0]
+    breaker = CircuitBreaker("fake_cancel", failure_threshold=1, open_seconds=10, clock=lambda: now[0])
+    client = LLMClient(FakeLLM(reply="back", latency=0.3), breaker, timeout=1.0)
+    breaker.record_failure()
+    now[0] = 100.0
+    assert breaker.state == HALF_OPEN
+
+    async def main():
+        probe = asyncio.ensure_future(client.generate("hi", caller="test"))
+        await asyncio.sleep(0.05)
+        probe.cancel()
+        try:
+            await probe
+            assert False, "probe not cancelled"
+        except asyncio.CancelledError:
+            pass
+        assert breaker.state == HALF_OPEN
+        return await client.generate("hi", caller="test")
+
+    assert asyncio.run(main()) == "back"
+    assert breaker.state == CLOSED
+    print("✅ Cancelled probe released its slot and the next probe closed the breaker")
+
+
+if __name__ == "__main__":
+    test_breaker_opens_fails_fast_and_recovers()
+    test_llm_client_fails_fast_when_gemini_is_down()
+    test_llm_client_deadline_and_hedge()
+    test_cancelled_probe_releases_its_slot()
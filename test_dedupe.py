@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test near-duplicate event detection and duplicate handling on import
+"""
+
+import json
+import os
+import random
+import tempfile
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier.database import Base, Event, migrate_events_from_json
+from Campus_event_notifier.dedupe import EventDuplicateDetector
+from Campus_event_notifier.minhash import NearDuplicateIndex, event_fingerprint_text, shingles
+
+WORDS = ("robotics workshop football league chess tournament poetry slam jazz evening hackathon coding "
+         "music festival drama club debate finals seminar lecture career fair alumni meetup yoga session "
+         "art exhibition science quiz photography walk startup pitch").split()
+
+
+def description(seed: int, length: int = 25) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def jaccard(a: str, b: str) -> float:
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_minhash_recall_and_false_positives():
+    """Test that lightly edited events are found and unrelated ones are not"""
+    index = NearDuplicateIndex(threshold=0.6)
+    for i in range(200):
+        index.add(i, event_fingerprint_text(f"Event {i}", description(i), "Main Hall"))
+
+    found = 0
+    for i in range(200):
+        words = description(i).split()
+        words[3] = "rescheduled"
+        matches = index.query(event_fingerprint_text(f"EVENT {i}!", " ".join(words), "main hall"))
+        found += bool(matches) and matches[0][0] == i
+    assert found >= 195, f"recall {found}/200"
+
+    false_positives = sum(
+        len(index.query(event_fingerprint_text(f"Other {j}", description(1000 + j), "Lab"))) for j in range(200)
+    )
+    assert false_positives == 0
+    print(f"✅ MinHash recall {found}/200 with no false positives")
+
+
+def test_threshold_separates_related_from_duplicate():
+    """Test that the threshold decides between an edited copy and a merely related event"""
+    def variant(keep: int) -> str:
+        words = description(1, 40).split()[:keep] + description(2, 40 - keep).split()
+        return event_fingerprint_text("Robotics Workshop II", " ".join(words), "Lab 3")
+
+    base = event_fingerprint_text("Robotics Workshop", description(1, 40), "Lab 3")
+    edited, related = variant(36), variant(20)
+    assert jaccard(base, edited) > 0.7 and jaccard(base, related) < 0.5
+
+    index = NearDuplicateIndex(threshold=0.6)
+    index.add("base", base)
+    matches = index.query(edited)
+    assert [key for key, _ in matches] == ["base"]
+    assert abs(matches[0][1] - jaccard(base, edited)) < 0.1
+    assert index.query(edited, threshold=0.9) == []
+    assert index.query(related) == []
+    print(f"✅ Threshold keeps Jaccard {jaccard(base, edited):.2f}, drops {jaccard(base, related):.2f}")
+
+
+def make_session():
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'dedupe.db')}")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)
+
+
+def test_import_skips_or_merges_duplicates():
+    """Test both duplicate policies of migrate_events_from_json"""
+    longer = description(5, 30) + " bring your own laptop"
+    incoming = [
+        {"name": "Robotics Workshop 2026", "date": "2026-12-05", "location": "Lab 3", "description": longer},
+        {"name": "Poetry Night", "date": "2026-12-10", "location": "Cafe", "description": description(9)},
+    ]
+    path = os.path.join(tempfile.mkdtemp(), "db.json")
+    with open(path, "w") as f:
+        json.dump(incoming, f)
+
+    for policy in ("skip", "merge"):
+        engine, Session = make_session()
+        db = Session()
+        db.add(Event(name="Robotics Workshop", date="2026-12-01", location="Lab 3", description=description(5, 30)))
+        db.commit()
+        migrate_events_from_json(policy, path=path, session_factory=Session)
+        db.expire_all()
+        events = {event.name: event for event in db.query(Event)}
+        assert sorted(events) == ["Poetry Night", "Robotics Workshop"], policy
+        workshop = events["Robotics Workshop"]
+        if policy == "skip":
+            assert workshop.date == "2026-12-01" and workshop.description == description(5, 30)
+        else:
+            assert workshop.date == "2026-12-05" and workshop.description == longer
+        db.close()
+        engine.dispose()
+    print("✅ Import skips or merges near-duplicates per policy")
+
+
+def test_detector_applies_only_committed_writes():
+    """Test that the detector follows commits and ignores rolled-back writes"""
+    engine, Session = make_session()
+    detector = EventDuplicateDetector()
+    db = Session()
+    try:
+        assert detector.find_duplicates(db, "Chess Open", description(3), "Hall") == []
+        db.add(Event(name="Chess Open", date="2026-12-01", location="Hall", description=description(3)))
+        db.flush()
+        # Uncommitted writes are not applied, even when the writing session asks
+        assert detector.find_duplicates(db, "Chess Open", description(3), "Hall") == []
+        db.rollback()
+        assert detector.find_duplicates(db, "Chess Open", description(3), "Hall") == []
+
+        event = Event(name="Chess Open", date="2026-12-01", location="Hall", description=description(3))
+        db.add(event)
+        db.commit()
+        assert [key for key, _ in detector.find_duplicates(db, "Chess Open!", description(3), "hall")] == [event.id]
+        db.delete(event)
+        db.commit()
+        assert detector.find_duplicates(db, "Chess Open", description(3), "Hall") == []
+    finally:
+        db.close()
+        engine.dispose()
+    print("✅ Duplicate detector applies only committed writes")
+
+
+if __name__ == "__main__":
+    test_minhash_recall_and_false_positives()
+    test_threshold_separates_related_from_duplicate()
+    test_import_skips_or_merges_duplicates()
+    test_detector_applies_only_committed_writes()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test paced, retried email delivery against a fake SMTP server
+"""
+
+import os
+import smtplib
+import tempfile
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier.database import Base, DeadLetter
+from Campus_event_notifier.delivery import (
+    DeliveryScheduler, PermanentDeliveryError, TransientDeliveryError, backoff_delay, classify_smtp_error
+)
+from Campus_event_notifier.email_templates import compile_email
+from Campus_event_notifier.metrics import SMTP_PHASE_SECONDS
+
+
+class FakeSMTP:
+    """Plays back scripted outcomes per recipient (None accepts, an exception rejects)"""
+
+    def __init__(self, script, log):
+        self.script = script
+        self.log = log
+        self.closed = False
+
+    def sendmail(self, sender, email, raw):
+        assert not self.closed, "sent on a closed connection"
+        self.log.append(email)
+        outcomes = self.script.get(email, [])
+        outcome = outcomes.pop(0) if outcomes else None
+        if outcome is not None:
+            raise outcome
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+def refused(email, code):
+    return smtplib.SMTPRecipientsRefused({email: (code, b"scripted reply")})
+
+
+def phase_count(phase):
+    return SMTP_PHASE_SECONDS.labels(phase=phase).snapshot()[2]
+
+
+def make_scheduler(max_attempts=3):
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'delivery.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    scheduler = DeliveryScheduler(domain_rate=1000, domain_burst=1000, max_attempts=max_attempts,
+                                  retry_base=0.001, retry_max=0.005, session_factory=Session)
+    return scheduler, Session
+
+
+def test_classify_and_backoff():
+    """Test 4xx/5xx/disconnect classification and capped backoff"""
+    assert isinstance(classify_smtp_error(refused("a@x.edu", 451)), TransientDeliveryError)
+    permanent = classify_smtp_error(refused("a@x.edu", 550))
+    assert isinstance(permanent, PermanentDeliveryError) and permanent.code == 550
+    assert isinstance(classify_smtp_error(smtplib.SMTPDataError(552, b"too big")), PermanentDeliveryError)
+    assert isinstance(classify_smtp_error(smtplib.SMTPServerDisconnected("gone")), TransientDeliveryError)
+    assert classify_smtp_error(smtplib.SMTPResponseException(421, b"closing")).code == 421
+
+    class Highest:
+        def uniform(self, low, high):
+            return high
+
+    assert [backoff_delay(n, 1.0, 5.0, rng=Highest()) for n in (1, 2, 3, 4)] == [1.0, 2.0, 4.0, 5.0]
+    print("✅ SMTP errors classified and backoff capped")
+
+
+def test_deliver_retries_reconnects_and_dead_letters():
+    """Test retries of 4xx, reconnect after 421, and dead letters for 5xx and exhausted retries"""
+    scheduler, Session = make_scheduler(max_attempts=3)
+    script = {
+        "flaky@b.edu": [refused("flaky@b.edu", 451)],
+        "gone@c.edu": [refused("gone@c.edu", 550)],
+        "busy@d.edu": [smtplib.SMTPResponseException(421, b"closing")],
+        "down@e.edu": [smtplib.SMTPServerDisconnected("dropped")],
+        "full@f.edu": [refused("full@f.edu", 452)] * 3,
+    }
+    log = []
+    connections = []
+
+    def connect():
+        connections.append(FakeSMTP(script, log))
+        return connections[-1]
+
+    sends, quits = phase_count("send"), phase_count("quit")
+    results = {}
+    message = compile_email("Hello", "Hi \x00text:recipient_email\x00")
+    recipients = ["ok@a.edu", "flaky@b.edu", "gone@c.edu", "busy@d.edu", "down@e.edu", "full@f.edu"]
+    report = scheduler.deliver(message, recipients, connect, on_result=results.__setitem__)
+
+    assert report.sent == 4 and report.retried == 5
+    assert results == {"ok@a.edu": True, "flaky@b.edu": True, "gone@c.edu": False,
+                       "busy@d.edu": True, "down@e.edu": True, "full@f.edu": False}
+    # A permanent failure is tried once, transient ones until max_attempts
+    assert log.count("gone@c.edu") == 1 and log.count("flaky@b.edu") == 2 and log.count("full@f.edu") == 3
+    # 421 and the disconnect each force a new connection; other replies keep it
+    assert len(connections) == 3 and all(server.closed for server in connections)
+    assert phase_count("send") - sends == len(log)
+    assert phase_count("quit") - quits == len(connections)
+
+    db = Session()
+    letters = {letter.email: letter for letter in db.query(DeadLetter)}
+    assert sorted(letters) == ["full@f.edu", "gone@c.edu"]
+    assert letters["gone@c.edu"].smtp_code == 550 and letters["gone@c.edu"].attempts == 1
+    assert letters["full@f.edu"].smtp_code == 452 and letters["full@f.edu"].attempts == 3
+    assert b"gone@c.edu" in letters["gone@c.edu"].message
+    db.close()
+    print("✅ Delivery retried, reconnected and dead-lettered as expected")
+
+
+def test_auth_failure_dead_letters_everyone():
+    """Test that bad credentials dead-letter the whole batch without sending"""
+    scheduler, Session = make_scheduler()
+
+    def connect():
+        raise smtplib.SMTPAuthenticationError(535, b"bad credentials")
+
+    report = scheduler.deliver(compile_email("Hello", "Hi"), ["a@x.edu", "b@y.edu"], connect)
+    assert report.sent == 0 and sorted(email for email, _ in report.dead_lettered) == ["a@x.edu", "b@y.edu"]
+    db = Session()
+    assert db.query(DeadLetter).filter(DeadLetter.smtp_code == 535).count() == 2
+    db.close()
+    print("✅ Authentication failure dead-letters the batch")
+
+
+if __name__ == "__main__":
+    test_classify_and_backoff()
+    test_deliver_retries_reconnects_and_dead_letters()
+    test_auth_failure_dead_letters_everyone()
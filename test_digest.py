@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test digest collection, batching and delivery bookkeeping
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier import digest
+from Campus_event_notifier.categories import interest_mask
+from Campus_event_notifier.database import Base, Event, Subscriber
+from Campus_event_notifier.digest import collect_digests, run_digest
+
+NOW = datetime(2026, 10, 19, 8, 0)  # naive UTC, like the timestamp columns
+
+
+def use_timezone(name):
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = name
+    time.tzset()
+    return previous
+
+
+def restore_timezone(previous):
+    if previous is None:
+        os.environ.pop("TZ", None)
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def make_db():
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'digest.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    old = NOW - timedelta(days=3)
+    events = {
+        "tech_today": Event(name="Hack Night", date="2026-10-19", location="N-Block", description="-", created_at=old),
+        "tech_later": Event(name="Code Sprint", date="2026-10-24", location="N-Block", description="-", created_at=old),
+        "sports_new": Event(name="Cup Final", date="2026-11-15", location="Cricket Ground", description="-",
+                            created_at=NOW - timedelta(hours=1)),
+        "past_new": Event(name="Old Talk", date="2026-10-10", location="Library", description="-",
+                          created_at=NOW - timedelta(hours=1)),
+    }
+    db.add_all(events.values())
+    tech = interest_mask(["Tech Events"])
+    sports = interest_mask(["Sports Events"])
+    for email, frequency, mask, active in (
+        ("all@x.edu", "daily", 0, True),
+        ("tech@x.edu", "daily", tech, True),
+        ("tech2@x.edu", "daily", tech, True),
+        ("sports@x.edu", "daily", sports, True),
+        ("off@x.edu", "daily", 0, False),
+        ("weekly@x.edu", "weekly", 0, True),
+    ):
+        db.add(Subscriber(email=email, digest_frequency=frequency, interest_mask=mask, active=active,
+                          created_at=NOW - timedelta(days=5), last_digest_at=NOW - timedelta(days=1)))
+    db.commit()
+    ids = {name: event.id for name, event in events.items()}
+    return engine, Session, db, ids
+
+
+def grouped(batches):
+    return {events: sorted(email for _, email in batch.recipients) for events, batch in batches.items()}
+
+
+def test_collect_filters_by_interest_and_lookahead():
+    """Test interest masks, per-frequency lookahead, new-event inclusion and identical-digest batching"""
+    previous = use_timezone("UTC")
+    engine, Session, db, ids = make_db()
+    try:
+        daily = grouped(collect_digests(db, "daily", NOW))
+        assert daily == {
+            ((ids["tech_today"], False), (ids["sports_new"], True)): ["all@x.edu"],
+            ((ids["tech_today"], False),): ["tech2@x.edu", "tech@x.edu"],
+            ((ids["sports_new"], True),): ["sports@x.edu"],
+        }
+        weekly = grouped(collect_digests(db, "weekly", NOW))
+        assert weekly == {
+            ((ids["tech_today"], False), (ids["tech_later"], False), (ids["sports_new"], True)): ["weekly@x.edu"],
+        }
+    finally:
+        db.close()
+        engine.dispose()
+        restore_timezone(previous)
+    print("✅ Digests filtered by interest and lookahead, batched by identical content")
+
+
+def test_run_advances_only_delivered_subscribers():
+    """Test that last_digest_at moves forward only for recipients the server accepted"""
+    previous = use_timezone("UTC")
+    engine, Session, db, ids = make_db()
+    sent = []
+
+    def fake_send_bulk(message, recipients, on_result=None):
+        accepted = [email for email in recipients if email != "tech2@x.edu"]
+        for email in recipients:
+            sent.append((message.subject, email))
+            on_result(email, email in accepted)
+        return len(accepted)
+
+    original = digest.send_bulk
+    digest.send_bulk = fake_send_bulk
+    try:
+        run = run_digest("daily", NOW, session_factory=Session)
+        assert (run.subscribers, run.distinct_digests, run.messages_sent) == (4, 3, 3)
+        assert run.per_event_messages == 5
+        assert len({subject for subject, _ in sent}) == 2  # single-event batches share a subject line
+
+        db.expire_all()
+        stamped = {s.email: s.last_digest_at for s in db.query(Subscriber)}
+        assert stamped["all@x.edu"] == stamped["tech@x.edu"] == stamped["sports@x.edu"] == NOW
+        for email in ("tech2@x.edu", "off@x.edu", "weekly@x.edu"):
+            assert stamped[email] == NOW - timedelta(days=1), email
+
+        # The new event has now been sent; the bounced subscriber still has it pending
+        later = grouped(collect_digests(db, "daily", NOW + timedelta(hours=1)))
+        assert later[((ids["tech_today"], False),)] == ["all@x.edu", "tech2@x.edu", "tech@x.edu"]
+        assert not any(email == "sports@x.edu" for emails in later.values() for email in emails)
+    finally:
+        digest.send_bulk = original
+        db.close()
+        engine.dispose()
+        restore_timezone(previous)
+    print("✅ Only delivered subscribers move their digest window forward")
+
+
+def test_lookahead_uses_local_date_of_the_run():
+    """Test that 'today' is the local date at the run's UTC instant, not the UTC date"""
+    previous = use_timezone("Asia/Kolkata")  # UTC+5:30, no DST
+    engine, Session, db, ids = make_db()
+    try:
+        evening = datetime(2026, 10, 19, 20, 0)  # 01:30 on the 20th locally
+        tomorrow = Event(name="Sunrise Run", date="2026-10-20", location="N-Block", description="-",
+                         created_at=NOW - timedelta(days=3))
+        db.add(tomorrow)
+        db.commit()
+        tech = grouped(collect_digests(db, "daily", evening))
+        assert tech[((tomorrow.id, False),)] == ["tech2@x.edu", "tech@x.edu"]
+        assert not any(event_id == ids["tech_today"] for events in tech for event_id, _ in events)
+    finally:
+        db.close()
+        engine.dispose()
+        restore_timezone(previous)
+    print("✅ Digest lookahead follows the local calendar date")
+
+
+if __name__ == "__main__":
+    test_collect_filters_by_interest_and_lookahead()
+    test_run_advances_only_delivered_subscribers()
+    test_lookahead_uses_local_date_of_the_run()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test render-once email templates
+"""
+
+import base64
+import email
+import hashlib
+import hmac
+from email import policy
+
+from Campus_event_notifier import auth
+from Campus_event_notifier.email_templates import (
+    event_announcement, unsubscribe_token, verify_unsubscribe_token
+)
+
+
+def test_compiled_email_personalizes_each_recipient():
+    """Test that one rendered message yields valid, per-recipient MIME"""
+    compiled = event_announcement("AI & ML <Workshop>", "2026-11-01", "N-Block")
+    for address in ("alice@example.edu", "bob@example.edu"):
+        msg = email.message_from_bytes(compiled.for_recipient(address), policy=policy.default)
+        assert msg["To"] == address
+        text = msg.get_body(("plain",)).get_content()
+        html = msg.get_body(("html",)).get_content()
+        assert address in text and unsubscribe_token(address) in text
+        assert "AI &amp; ML &lt;Workshop&gt;" in html and unsubscribe_token(address) in html
+    print("✅ Compiled email personalized for each recipient")
+
+
+def test_long_lines_stay_within_smtp_limit():
+    """Test that long, non-ASCII event text never produces a line over 998 bytes"""
+    description = "Bring your laptop — café talks on ML " * 200
+    compiled = event_announcement("Hackathon " + "x" * 2000, "2026-11-01", "N-Block", description)
+    address = "a-very-long-mailbox-name-for-testing@students.example.edu"
+    raw = compiled.for_recipient(address)
+    assert max(len(line) for line in raw.split(b"\r\n")) <= 998
+    msg = email.message_from_bytes(raw, policy=policy.default)
+    text = msg.get_body(("plain",)).get_content()
+    assert description.strip() in text and "x" * 2000 in text
+    assert address in text and unsubscribe_token(address) in text
+    print("✅ Encoded lines stay within the SMTP line limit")
+
+
+def test_unsubscribe_token_round_trip():
+    """Test that unsubscribe tokens verify and reject tampering"""
+    token = unsubscribe_token("Student@Example.edu")
+    assert verify_unsubscribe_token(token) == "student@example.edu"
+    payload, signature = token.split(".")
+    forged = unsubscribe_token("other@example.edu").split(".")[0] + "." + signature
+    assert verify_unsubscribe_token(forged) is None
+    assert verify_unsubscribe_token("garbage") is None
+
+    # Signed with the same key as the login JWTs
+    expected = hmac.new(auth.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).digest()[:16]
+    assert base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4)) == expected
+    print("✅ Unsubscribe tokens verified")
+
+
+if __name__ == "__main__":
+    test_compiled_email_personalizes_each_recipient()
+    test_long_lines_stay_within_smtp_limit()
+    test_unsubscribe_token_round_trip()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test the materialized per-day event counts behind /api/calendar
+"""
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier.database import Base, Event
+from Campus_event_notifier.event_calendar import EventCalendar
+
+
+def test_day_counts_follow_event_writes():
+    """Test that inserts, moves, deletes and bulk writes are reflected in the month view"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    calendar = EventCalendar()
+
+    hackathon = Event(name="Hackathon", date="2026-11-03", location="N-Block Lab", description="-")
+    db.add_all([
+        hackathon,
+        Event(name="Match", date="2026-11-03 15:00:00.000000", location="Cricket Ground", description="-"),
+        Event(name="Talk", date="2026-11-20", location="Library", description="-"),
+        Event(name="Gala", date="2026-12-01", location="OAT", description="-"),
+    ])
+    db.commit()
+
+    november = calendar.month(db, "2026-11")
+    assert november["total"] == 3
+    first_day = november["days"][0]
+    assert first_day["date"] == "2026-11-03" and first_day["count"] == 2
+    assert first_day["categories"] == {"Tech Events": 1, "Sports Events": 1}
+    assert first_day["event_ids"] == [hackathon.id, hackathon.id + 1]
+
+    hackathon.date = "2026-12-01"
+    db.commit()
+    assert [d["count"] for d in calendar.month(db, "2026-11")["days"]] == [1, 1]
+    assert calendar.month(db, "2026-12")["total"] == 2
+    db.delete(hackathon)
+    db.commit()
+    assert calendar.month(db, "2026-12")["total"] == 1
+
+    # Rows written behind the ORM's back are picked up by the one-time consistency check
+    db.execute(text("INSERT INTO events (name, date, location, description) VALUES ('Fair', '2026-12-05', 'X', '-')"))
+    db.commit()
+    assert EventCalendar().month(db, "2026-12")["total"] == 2
+
+    try:
+        calendar.month(db, "2026-13")
+        assert False, "invalid month accepted"
+    except ValueError:
+        pass
+    db.close()
+    engine.dispose()
+    print("✅ Day counts track inserts, moves, deletes and bulk writes")
+
+
+if __name__ == "__main__":
+    test_day_counts_follow_event_writes()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the rendered-fragment cache and its event_version invalidation
+"""
+
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from Campus_event_notifier.fragments import CATEGORY_SECTION_TEMPLATE, EVENT_CARD_TEMPLATE, FragmentCache, event_version
+from Campus_event_notifier.metrics import CACHE_REQUESTS
+
+TEMPLATES_DIR = Path(__file__).parent / "Campus_event_notifier" / "templates"
+
+
+class CountingEnvironment(Environment):
+    """Jinja environment that counts template renders"""
+
+    def __init__(self):
+        super().__init__(loader=FileSystemLoader(str(TEMPLATES_DIR)), autoescape=select_autoescape(["html"]))
+        self.renders = []
+
+    def get_template(self, name, *args, **kwargs):
+        self.renders.append(name)
+        return super().get_template(name, *args, **kwargs)
+
+
+def make_event(event_id, name="Robotics Workshop", **fields):
+    return {"id": event_id, "name": name, "date": "2026-11-01", "location": "Lab 3", "description": "Build a rover",
+            **fields}
+
+
+def lookups(result):
+    return CACHE_REQUESTS.labels(cache="fragments", result=result).get()
+
+
+def test_event_version_tracks_displayed_fields():
+    """Test that event_version changes with every displayed field and ignores the rest"""
+    event = make_event(1)
+    assert event_version(event) == event_version(dict(event))
+    for field, value in (("id", 2), ("name", "Drone Workshop"), ("date", "2026-11-02"),
+                         ("location", "Lab 4"), ("description", "Build a drone")):
+        assert event_version({**event, field: value}) != event_version(event), field
+    assert event_version({**event, "attendees": 40}) == event_version(event)
+    print("✅ event_version fingerprints the displayed fields")
+
+
+def test_unchanged_event_served_from_cache_edited_event_rerendered():
+    """Test that an unchanged event reuses its card and an edited one renders fresh HTML"""
+    env = CountingEnvironment()
+    cache = FragmentCache(env)
+    event = make_event(1)
+    hits, misses = lookups("hit"), lookups("miss")
+
+    first = cache.event_card(event)
+    again = cache.event_card(dict(event))
+    assert again is first and "Robotics Workshop" in first
+    assert env.renders == [EVENT_CARD_TEMPLATE]
+    assert (lookups("hit") - hits, lookups("miss") - misses) == (1, 1)
+
+    edited = cache.event_card({**event, "name": "Drone Workshop"})
+    assert "Drone Workshop" in edited and "Robotics Workshop" not in edited
+    assert env.renders == [EVENT_CARD_TEMPLATE] * 2
+
+    # Variants are cached separately; a precomputed version is used as the key
+    assert "Remind Me" in cache.event_card(event, variant="dashboard")
+    assert cache.event_card({**event, "version": event_version(event)}) is first
+    assert len(env.renders) == 3
+
+    # Sections are keyed by their events' versions: an edit re-renders the section and only that card
+    other = make_event(2, "Chess Night")
+    section = cache.category_section("Tech Events", [event, other])
+    assert cache.category_section("Tech Events", [event, other]) is section
+    assert env.renders[3:] == [EVENT_CARD_TEMPLATE, CATEGORY_SECTION_TEMPLATE]
+    updated = cache.category_section("Tech Events", [event, {**other, "date": "2026-12-24"}])
+    assert updated is not section and "2026-12-24" in updated
+    assert env.renders[5:] == [EVENT_CARD_TEMPLATE, CATEGORY_SECTION_TEMPLATE]
+    print("✅ Unchanged fragments are reused and edited ones re-render")
+
+
+def test_lru_bound_evicts_least_recently_used():
+    """Test that the cache holds at most maxsize fragments and evicts the least recently used"""
+    env = CountingEnvironment()
+    cache = FragmentCache(env, maxsize=3)
+    events = [make_event(i, f"Event {i}") for i in range(4)]
+    for event in events[:3]:
+        cache.event_card(event)
+    cache.event_card(events[0])  # Touch 0, leaving 1 as the least recently used
+    cache.event_card(events[3])
+    assert len(cache._cache) == 3 and len(env.renders) == 4
+
+    cache.event_card(events[0])
+    cache.event_card(events[3])
+    assert len(env.renders) == 4
+    cache.event_card(events[1])  # Evicted, so it renders again
+    assert len(env.renders) == 5 and len(cache._cache) == 3
+
+    cache.clear()
+    cache.event_card(events[3])
+    assert len(env.renders) == 6
+    print("✅ Fragment cache stays within its LRU bound")
+
+
+if __name__ == "__main__":
+    test_event_version_tracks_displayed_fields()
+    test_unchanged_event_served_from_cache_edited_event_rerendered()
+    test_lru_bound_evicts_least_recently_used()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the local intent engine for structured chat questions
+"""
+
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier.database import Base, Event
+from Campus_event_notifier.intents import answer, parse_intent
+
+TODAY = date(2026, 10, 19)  # a Monday
+
+
+def test_parse_intent_slots():
+    """Test date, place, category and name parsing, and open-ended questions"""
+    friday = parse_intent("Any events this Friday?", TODAY)
+    assert (friday.start, friday.end) == (date(2026, 10, 23), date(2026, 10, 23))
+    assert parse_intent("next Friday events", TODAY).start == date(2026, 10, 30)
+    assert parse_intent("what's in H-Block", TODAY).location == "h-block"
+    assert parse_intent("sports events next week", TODAY).category == "Sports Events"
+    assert parse_intent("what's on dec 15th", TODAY).start == date(2026, 12, 15)
+    assert parse_intent("When is the cricket tournament?", TODAY).name == "cricket tournament"
+
+    assert parse_intent("hello there", TODAY) is None
+    assert parse_intent("why should I go to the hackathon this Friday?", TODAY) is None
+    assert parse_intent("what about the one after that?", TODAY) is None
+    print("✅ Intent slots parsed; open-ended questions left to the LLM")
+
+
+def test_answer_from_database():
+    """Test that parsed questions are answered from the events table"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        Event(name="Robotics Expo", date="2026-10-23", location="H-Block Atrium", description="Robots."),
+        Event(name="Inter-College Cricket Tournament", date="2026-10-27 10:00:00.000000",
+              location="University Cricket Ground", description="Annual tournament."),
+        Event(name="Old Hackathon", date="2026-10-01", location="N-Block", description="Past."),
+    ])
+    db.commit()
+
+    reply = answer(db, parse_intent("events this friday", TODAY), TODAY)
+    assert "Robotics Expo" in reply and "Cricket" not in reply
+    reply = answer(db, parse_intent("when is the cricket tournament", TODAY), TODAY)
+    assert reply.startswith("Inter-College Cricket Tournament is on Tue, Oct 27")
+    assert "couldn't find" in answer(db, parse_intent("tech events", TODAY), TODAY)
+    assert answer(db, parse_intent("where is the bake sale", TODAY), TODAY) is None
+    db.close()
+    engine.dispose()
+    print("✅ Structured questions answered locally")
+
+
+if __name__ == "__main__":
+    test_parse_intent_slots()
+    test_answer_from_database()
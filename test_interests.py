@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Test the subscriber interest bitmap index
+"""
+
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier import interests
+from Campus_event_notifier.categories import interest_mask
+from Campus_event_notifier.database import Base, Subscriber
+from Campus_event_notifier.interests import Bitmap, InterestIndex
+
+
+def test_bitmap_set_operations_across_chunks():
+    """Test AND/OR/iteration on ids that span several 65,536-bit chunks"""
+    evens = Bitmap()
+    threes = Bitmap()
+    for i in range(0, 200_000, 2):
+        evens.add(i)
+    for i in range(0, 200_000, 3):
+        threes.add(i)
+
+    assert len(evens & threes) == len(range(0, 200_000, 6))
+    assert len(evens | threes) == len(set(range(0, 200_000, 2)) | set(range(0, 200_000, 3)))
+    assert list(evens & threes)[:4] == [0, 6, 12, 18]
+    assert 131_072 in evens and 131_073 not in evens
+    evens.discard(131_072)
+    assert 131_072 not in evens
+    assert evens.max() == 199_998
+    print("✅ Bitmap AND/OR/iteration correct across chunks")
+
+
+def test_interest_index_tracks_subscribers_and_reloads():
+    """Test incremental updates via mapper events, persistence, and rebuild on mismatch"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    original = interests.interest_index
+    interests.interest_index = index = InterestIndex()
+    try:
+        db = Session()
+        tech = interest_mask(["Tech Events"])
+        sports = interest_mask(["Sports Events"])
+        db.add_all([Subscriber(email=f"s{i}@example.com", digest_frequency="daily",
+                               interest_mask=(tech, sports, 0)[i % 3])
+                    for i in range(3000)])
+        db.commit()
+
+        start = time.perf_counter()
+        audience = index.audience(db, ["Tech Events"])
+        elapsed = time.perf_counter() - start
+        # Tech fans plus everyone without a preference
+        assert len(audience) == 2000
+
+        quitter = db.query(Subscriber).filter(Subscriber.interest_mask == tech).first()
+        quitter.active = False
+        db.commit()
+        assert len(index.audience(db, ["Tech Events"])) == 1999
+        assert len(index.audience(db, ["Tech Events"], frequency="weekly")) == 0
+
+        # A rolled-back change must not leave the in-memory index ahead of the table
+        fan = db.query(Subscriber).filter(Subscriber.interest_mask == sports).first()
+        fan.interest_mask = tech
+        db.flush()
+        db.rollback()
+        assert len(index.audience(db, ["Tech Events"])) == 1999
+
+        # A fresh index loads the persisted chunks without rebuilding
+        reloaded = InterestIndex()
+        reloaded.ensure_loaded(db.connection())
+        assert len(reloaded.audience(db, ["Tech Events", "Sports Events"])) == 2999
+
+        emails = set(InterestIndex.emails(db, audience))
+        assert len(emails) == 2000
+        db.close()
+    finally:
+        interests.interest_index = original
+        engine.dispose()
+    print(f"✅ Audience of {len(audience)} from 3000 subscribers in {elapsed * 1e6:.0f} µs")
+
+
+def test_writes_flip_single_bits():
+    """Test that subscriber writes patch bits in place and match a full rebuild"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    recomputed = []
+    original = InterestIndex.refresh_chunk
+    InterestIndex.refresh_chunk = classmethod(lambda cls, connection, chunk: (
+        recomputed.append(chunk), original.__func__(cls, connection, chunk)))
+    try:
+        db = Session()
+        tech = interest_mask(["Tech Events"])
+        sports = interest_mask(["Sports Events"])
+        db.add_all([Subscriber(email=f"s{i}@example.com", digest_frequency="daily", interest_mask=tech)
+                    for i in range(50)])
+        db.commit()
+        subscribers = db.query(Subscriber).order_by(Subscriber.id).all()
+        subscribers[0].interest_mask = sports
+        subscribers[1].digest_frequency = "weekly"
+        subscribers[2].active = False
+        db.delete(subscribers[3])
+        db.commit()
+        assert recomputed == []
+
+        # Without the old value loaded, the chunk is recomputed instead
+        db.expire(subscribers[4], ["interest_mask"])
+        subscribers[4].interest_mask = 0
+        db.commit()
+        assert recomputed == [0]
+
+        persisted = InterestIndex._read(db.connection())
+        InterestIndex.rebuild(db.connection())
+        assert {k: v.chunks for k, v in persisted.items()} == \
+            {k: v.chunks for k, v in InterestIndex._read(db.connection()).items()}
+        index = InterestIndex()
+        assert len(index.audience(db, ["Tech Events"])) == 47  # 0 means everything
+        assert list(index.audience(db, ["Sports Events"])) == [subscribers[0].id, subscribers[4].id]
+        assert list(index.audience(db, ["Tech Events"], frequency="weekly")) == [subscribers[1].id]
+        db.close()
+    finally:
+        InterestIndex.refresh_chunk = original
+        engine.dispose()
+    print("✅ Subscriber writes flip single bits, matching a full rebuild")
+
+
+def test_two_workers_keep_each_others_bits():
+    """Test that writes from two processes' indexes don't overwrite each other's chunk"""
+    path = os.path.join(tempfile.mkdtemp(), "interests.db")
+    # One engine per simulated worker, each with its own index
+    engine_a = create_engine(f"sqlite:///{path}")
+    engine_b = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine_a)
+    SessionA = sessionmaker(bind=engine_a)
+    SessionB = sessionmaker(bind=engine_b)
+    index_a = InterestIndex()
+    index_b = InterestIndex()
+    try:
+        db_a = SessionA()
+        db_b = SessionB()
+        tech = interest_mask(["Tech Events"])
+        # Both workers load the (empty) chunk before either writes
+        assert list(index_a.audience(db_a, ["Tech Events"])) == []
+        assert list(index_b.audience(db_b, ["Tech Events"])) == []
+        db_a.close()
+        db_b.close()
+
+        db_a = SessionA()
+        first = Subscriber(email="a@example.com", digest_frequency="daily", interest_mask=tech)
+        db_a.add(first)
+        db_a.commit()
+        db_b = SessionB()
+        second = Subscriber(email="b@example.com", digest_frequency="daily", interest_mask=tech)
+        db_b.add(second)
+        db_b.commit()
+        expected = sorted([first.id, second.id])
+
+        assert sorted(index_a.audience(db_a, ["Tech Events"])) == expected
+        assert sorted(index_b.audience(db_b, ["Tech Events"])) == expected
+        fresh = InterestIndex()
+        assert not fresh.ensure_loaded(db_a.connection())
+        assert sorted(fresh.audience(db_a, ["Tech Events"])) == expected
+        db_a.close()
+        db_b.close()
+    finally:
+        engine_a.dispose()
+        engine_b.dispose()
+    print("✅ Concurrent workers' subscriber writes both reach the persisted bitmaps")
+
+
+def test_announce_reaches_only_immediate_subscribers():
+    """Test that /announce hands delivery to the immediate sweep instead of mailing digest subscribers"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy.pool import StaticPool
+    from Campus_event_notifier import main
+    from Campus_event_notifier.auth import get_current_admin_user
+    from Campus_event_notifier.database import Event, get_db
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    event = Event(name="Hack Night", date="2099-01-01", location="N-Block", description="-")
+    db.add(event)
+    db.add_all([Subscriber(email=f"{frequency}@example.com", digest_frequency=frequency)
+                for frequency in ("immediate", "daily", "weekly")])
+    db.commit()
+
+    sweeps = []
+    original = main.run_digest
+    main.run_digest = sweeps.append
+    main.app.dependency_overrides[get_db] = lambda: db
+    main.app.dependency_overrides[get_current_admin_user] = lambda: None
+    try:
+        response = TestClient(main.app).post(f"/api/admin/events/{event.id}/announce")
+        assert response.status_code == 202
+        assert response.json()["recipients"] == 1
+        assert sweeps == ["immediate"]
+    finally:
+        main.run_digest = original
+        main.app.dependency_overrides.pop(get_db, None)
+        main.app.dependency_overrides.pop(get_current_admin_user, None)
+        db.close()
+        engine.dispose()
+    print("✅ Announcements go to immediate subscribers through the digest sweep")
+
+
+if __name__ == "__main__":
+    test_bitmap_set_operations_across_chunks()
+    test_interest_index_tracks_subscribers_and_reloads()
+    test_writes_flip_single_bits()
+    test_two_workers_keep_each_others_bits()
+    test_announce_reaches_only_immediate_subscribers()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test the persisted background job queue
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier import jobs
+from Campus_event_notifier.database import Base
+from Campus_event_notifier.jobs import JobQueue, JobRunner, job_handler
+
+calls = []
+
+
+@job_handler("test_flaky")
+def flaky(name: str, fail_times: int = 0):
+    calls.append(name)
+    if calls.count(name) <= fail_times:
+        raise RuntimeError("transient")
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2026, 10, 19, 12, 0)
+
+    def __call__(self):
+        return self.now
+
+
+def make_queue(clock=datetime.utcnow):
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'jobs.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    return JobQueue(Session, lease_seconds=60, max_attempts=2, retry_base=10, clock=clock), Session
+
+
+def test_retries_and_stale_lock_reclaim():
+    """Test backoff retries, final failure, and reclaiming a job whose worker died"""
+    clock = Clock()
+    queue, Session = make_queue(clock)
+    db = Session()
+    retried = queue.enqueue(db, "test_flaky", {"name": "retried", "fail_times": 1})
+    failing = queue.enqueue(db, "test_flaky", {"name": "failing", "fail_times": 5})
+
+    assert queue.run_one("w1") and queue.run_one("w1")
+    assert queue.status(db, retried)["status"] == "queued"
+    assert not queue.run_one("w1")  # both are backing off
+    clock.now += timedelta(seconds=11)
+    assert queue.run_one("w1") and queue.run_one("w1")
+    db.expire_all()
+    assert queue.status(db, retried)["status"] == "succeeded"
+    assert queue.status(db, failing)["status"] == "failed"
+    assert queue.status(db, failing)["attempts"] == 2
+
+    # A worker that claims a job and dies leaves it locked until the lease lapses
+    abandoned = queue.enqueue(db, "test_flaky", {"name": "abandoned"})
+    assert queue.claim("dead-worker").id == abandoned
+    assert not queue.run_one("w2")
+    clock.now += timedelta(seconds=61)
+    assert queue.run_one("w2")
+    db.expire_all()
+    assert queue.status(db, abandoned)["status"] == "succeeded"
+    assert queue.status(db, abandoned)["attempts"] == 2
+    try:
+        queue.enqueue(db, "no_such_kind")
+        assert False, "unknown job kind accepted"
+    except ValueError:
+        pass
+    db.close()
+    print("✅ Jobs retry with backoff and lapsed locks are reclaimed")
+
+
+def test_runner_drains_queue():
+    """Test that worker threads run every queued job exactly once when nothing fails"""
+    queue, Session = make_queue()
+    db = Session()
+    runner = JobRunner(queue, workers=3, poll_seconds=0.05)
+    runner.start()
+    try:
+        ids = [queue.enqueue(db, "test_flaky", {"name": f"bulk-{i}"}) for i in range(20)]
+        runner.wake()
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            db.expire_all()
+            if all(queue.status(db, job_id)["status"] == "succeeded" for job_id in ids):
+                break
+            time.sleep(0.05)
+    finally:
+        runner.stop()
+    assert sorted(name for name in calls if name.startswith("bulk-")) == sorted(f"bulk-{i}" for i in range(20))
+    db.close()
+    print("✅ Worker pool drains the queue")
+
+
+def test_welcome_jobs_retry_only_transient_failures():
+    """Test that a dead-lettered welcome email finishes the job and an unsent one is retried"""
+    clock = Clock()
+    queue, Session = make_queue(clock)
+    db = Session()
+    verdicts = {}
+
+    def fake_send_bulk(message, recipients, on_result=None):
+        for email in recipients:
+            if email in verdicts:
+                on_result(email, verdicts[email])
+        return sum(1 for email in recipients if verdicts.get(email))
+
+    original = jobs.send_bulk
+    jobs.send_bulk = fake_send_bulk
+    try:
+        verdicts.update({"sent@example.com": True, "bounced@example.com": False})
+        ids = {email: queue.enqueue(db, "subscriber_welcome", {"email": email})
+               for email in ("sent@example.com", "bounced@example.com", "unsent@example.com")}
+        while queue.run_one("w1"):
+            pass
+        db.expire_all()
+        assert queue.status(db, ids["sent@example.com"])["status"] == "succeeded"
+        # The delivery layer already retried and dead-lettered it
+        bounced = queue.status(db, ids["bounced@example.com"])
+        assert bounced["status"] == "succeeded" and bounced["attempts"] == 1
+        # No verdict at all (e.g. SMTP not configured) is worth another attempt
+        assert queue.status(db, ids["unsent@example.com"])["status"] == "queued"
+    finally:
+        jobs.send_bulk = original
+        db.close()
+    print("✅ Welcome jobs retry only when delivery never settled")
+
+
+if __name__ == "__main__":
+    test_retries_and_stale_lock_reclaim()
+    test_runner_drains_queue()
+    test_welcome_jobs_retry_only_transient_failures()
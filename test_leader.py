@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test lease-based leader election on a shared SQLite file
+"""
+
+import os
+import tempfile
+import threading
+
+from Campus_event_notifier.leader import LeaderLease
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_acquire_renew_and_takeover():
+    """Test that one holder wins, renewals extend the lease, and an expired lease is taken over"""
+    path = os.path.join(tempfile.mkdtemp(), "shared_state.db")
+    clock = Clock()
+    a = LeaderLease("scheduler", ttl=30, path=path, holder_id="worker-a", clock=clock)
+    b = LeaderLease("scheduler", ttl=30, path=path, holder_id="worker-b", clock=clock)
+
+    assert a.try_acquire() and a.is_leader
+    assert not b.try_acquire() and not b.is_leader
+    assert b.current_holder() == "worker-a"
+
+    # Renewing before expiry pushes it out; the other worker still can't take it
+    clock.now += 20
+    assert a.try_acquire()
+    clock.now += 25  # 45s after the first acquire, 25s after the renewal
+    assert not b.try_acquire() and a.is_leader
+
+    # The holder stops acting as leader just before the lease lapses
+    clock.now += 4.5
+    assert not a.is_leader and a.current_holder() == "worker-a"
+
+    # Once it has lapsed, the other worker takes over and the old holder can't renew
+    clock.now += 1
+    assert a.current_holder() is None
+    assert b.try_acquire() and b.is_leader
+    assert not a.try_acquire() and not a.is_leader
+    assert a.current_holder() == "worker-b"
+
+    # Releasing hands over immediately
+    b.release()
+    assert not b.is_leader
+    assert a.try_acquire() and a.current_holder() == "worker-a"
+
+    # Leases are independent per name
+    assert LeaderLease("reminders", ttl=30, path=path, holder_id="worker-b", clock=clock).try_acquire()
+    print("✅ Lease acquired, renewed, expired and taken over")
+
+
+def test_heartbeat_holds_and_releases():
+    """Test that the heartbeat thread keeps the lease and releases it on stop"""
+    path = os.path.join(tempfile.mkdtemp(), "shared_state.db")
+    a = LeaderLease("scheduler", ttl=0.6, path=path, holder_id="worker-a")
+    b = LeaderLease("scheduler", ttl=0.6, path=path, holder_id="worker-b")
+    changes = []
+    became_leader = threading.Event()
+
+    def on_change(leader):
+        changes.append(leader)
+        became_leader.set()
+
+    a.start_heartbeat(on_change)
+    try:
+        assert became_leader.wait(5)
+        # Outlive several TTLs: the heartbeat keeps renewing
+        threading.Event().wait(1.5)
+        assert not b.try_acquire() and a.current_holder() == "worker-a"
+    finally:
+        a.stop_heartbeat()
+    assert changes == [True]
+    assert b.try_acquire()
+    print("✅ Heartbeat keeps the lease until stopped")
+
+
+if __name__ == "__main__":
+    test_acquire_renew_and_takeover()
+    test_heartbeat_holds_and_releases()
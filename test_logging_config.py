@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the queue-based structured logging pipeline
+"""
+
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import time
+
+from Campus_event_notifier.logging_config import (
+    LOG_RECORDS_DROPPED, JsonFormatter, NonBlockingQueueHandler, RateLimitFilter, RequestIdFilter, request_id_var,
+)
+
+
+def make_record(msg, *args, level=logging.INFO, name="Campus_event_notifier.test", exc_info=None, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_queue_handler_prepares_and_drops_when_full():
+    """Test that queued records are pre-rendered and that a full queue drops instead of blocking"""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record("Sent %d of %d", 3, 4, level=logging.ERROR, exc_info=sys.exc_info())
+    before = LOG_RECORDS_DROPPED.labels(reason="queue_full").get()
+    handler.handle(record)
+    handler.handle(make_record("overflow"))
+
+    queued = handler.queue.get_nowait()
+    assert handler.queue.empty()
+    assert queued is not record and record.args == (3, 4)
+    assert queued.msg == queued.getMessage() == "Sent 3 of 4" and queued.args is None
+    assert queued.exc_info is None and "ValueError: boom" in queued.exc_text
+    assert LOG_RECORDS_DROPPED.labels(reason="queue_full").get() == before + 1
+    print("✅ Queue handler pre-renders records and drops on overflow")
+
+
+def test_json_formatter_fields():
+    """Test the JSON line: core fields, request ID, extra= fields, suppressed count and traceback"""
+    formatter = JsonFormatter()
+    token = request_id_var.set("req-42")
+    try:
+        record = make_record("Delivered to %s", "a@x.edu", recipients=3, suppressed=5)
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+    record.exc_text = "Traceback: boom"
+    entry = json.loads(formatter.format(record))
+    assert entry["level"] == "INFO" and entry["logger"] == "Campus_event_notifier.test"
+    assert entry["msg"] == "Delivered to a@x.edu" and entry["ts"].endswith("+00:00")
+    assert entry["request_id"] == "req-42" and entry["recipients"] == 3 and entry["suppressed"] == 5
+    assert entry["exc"] == "Traceback: boom"
+    assert not {"args", "levelno", "pathname", "_private"} & set(entry)
+
+    # No request in flight: the key is left out rather than null
+    plain = make_record("Idle")
+    RequestIdFilter().filter(plain)
+    assert "request_id" not in json.loads(formatter.format(plain))
+    print("✅ JSON formatter emits one object with extra fields")
+
+
+def test_rate_limit_filter():
+    """Test the per-template burst, that errors always pass, and the suppressed count after the window"""
+    limiter = RateLimitFilter(burst=2, interval=0.2)
+    passed = [limiter.filter(make_record("Retrying %s", email)) for email in ("a", "b", "c", "d")]
+    assert passed == [True, True, False, False]
+    assert limiter.filter(make_record("Other template"))
+    assert limiter.filter(make_record("Retrying %s", "e", level=logging.ERROR))
+
+    time.sleep(0.25)
+    record = make_record("Retrying %s", "f")
+    assert limiter.filter(record) and record.suppressed == 2
+    assert limiter.filter(make_record("Retrying %s", "g"))
+    print("✅ Rate limit filter caps each template and reports what it dropped")
+
+
+def test_import_time_migrations_are_logged():
+    """Test that INFO records from database.py's import-time migrations reach the output"""
+    repo = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "PYTHONPATH": repo, "LOG_FORMAT": "json", "LOG_LEVEL": "INFO"}
+    result = subprocess.run(
+        [sys.executable, "-c", "import Campus_event_notifier.main"],
+        cwd=tempfile.mkdtemp(), env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    entries = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    migrations = [e for e in entries if e["logger"] == "Campus_event_notifier.database" and e["level"] == "INFO"]
+    assert any("from db.json" in e["msg"] for e in migrations), result.stdout
+    print("✅ Import-time migration logs are not lost")
+
+
+if __name__ == "__main__":
+    test_queue_handler_prepares_and_drops_when_full()
+    test_json_formatter_fields()
+    test_rate_limit_filter()
+    test_import_time_migrations_are_logged()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Test the Prometheus metrics registry
+"""
+
+from Campus_event_notifier.metrics import Registry
+
+
+def test_metrics_render():
+    """Test counters, gauges and histograms render in Prometheus text format"""
+    registry = Registry()
+    requests = registry.counter("test_requests_total", "Requests", ("route",))
+    in_flight = registry.gauge("test_in_flight", "In flight")
+    latency = registry.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+    requests.labels(route="/").inc()
+    requests.labels(route="/").inc()
+    in_flight.inc()
+    in_flight.dec()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{route="/"} 2' in text
+    assert "test_in_flight 0" in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_latency_seconds_count 3" in text
+    print("✅ Metrics rendered correctly")
+
+
+if __name__ == "__main__":
+    test_metrics_render()
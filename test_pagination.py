@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test keyset pagination over events
+"""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from Campus_event_notifier.database import Base, Event, get_db
+from Campus_event_notifier.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, clamp_page_size, decode_cursor, encode_cursor,
+    fetch_events_page,
+)
+
+
+def make_db(count_by_date):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for date, count in count_by_date:
+        db.add_all([Event(name=f"{date} #{i}", date=date, location="Hall", description="-") for i in range(count)])
+    db.commit()
+    return engine, db
+
+
+def test_cursor_round_trip_and_clamp():
+    """Test cursor encoding, rejection of garbage cursors and the page size clamp"""
+    cursor = encode_cursor("2026-11-01 18:00", 42)
+    assert "=" not in cursor and decode_cursor(cursor) == ("2026-11-01 18:00", 42)
+    for garbage in ("not-a-cursor", encode_cursor("2026-11-01", 1)[:-3], "W10"):
+        try:
+            decode_cursor(garbage)
+            assert False, f"{garbage!r} decoded"
+        except InvalidCursor:
+            pass
+    assert clamp_page_size(None) == clamp_page_size(0) == clamp_page_size(-3) == DEFAULT_PAGE_SIZE
+    assert clamp_page_size(5) == 5 and clamp_page_size(10_000) == MAX_PAGE_SIZE
+    print("✅ Cursors round-trip and page sizes are clamped")
+
+
+def test_pages_through_equal_dates_without_gaps():
+    """Test that paging across many events sharing one date yields each event exactly once"""
+    engine, db = make_db([("2026-11-02", 3), ("2026-11-01", 23), ("2026-11-03", 4)])
+    try:
+        expected = [e.id for e in db.query(Event).order_by(Event.date, Event.id)]
+        seen, cursor, pages = [], None, 0
+        while True:
+            events, cursor = fetch_events_page(db, cursor, limit=5)
+            seen.extend(event["id"] for event in events)
+            pages += 1
+            if cursor is None:
+                break
+        assert seen == expected and pages == 6
+        assert [e["date"] for e in fetch_events_page(db, limit=24)[0]][-2:] == ["2026-11-01", "2026-11-02"]
+
+        # Exactly one full page leaves no cursor behind
+        events, cursor = fetch_events_page(db, limit=30)
+        assert len(events) == 30 and cursor is None
+    finally:
+        db.close()
+        engine.dispose()
+    print("✅ Keyset pages have no gaps or duplicates across equal dates")
+
+
+def test_api_clamps_and_rejects_bad_cursor():
+    """Test /api/events: login required, the MAX_PAGE_SIZE clamp, next_cursor, and 400 on a bad cursor"""
+    from Campus_event_notifier.auth import get_current_active_user
+    from Campus_event_notifier.main import app
+
+    engine, db = make_db([("2026-12-01", MAX_PAGE_SIZE + 20)])
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(app)
+        assert client.get("/api/events").status_code == 401
+
+        app.dependency_overrides[get_current_active_user] = lambda: None
+        first = client.get("/api/events", params={"limit": 1000})
+        assert first.status_code == 200
+        body = first.json()
+        assert len(body["events"]) == MAX_PAGE_SIZE and body["next_cursor"]
+        rest = client.get("/api/events", params={"cursor": body["next_cursor"], "limit": 1000}).json()
+        assert len(rest["events"]) == 20 and rest["next_cursor"] is None
+        assert {e["id"] for e in body["events"]}.isdisjoint(e["id"] for e in rest["events"])
+
+        bad = client.get("/api/events", params={"cursor": "garbage"})
+        assert bad.status_code == 400 and bad.json()["detail"] == "Invalid pagination cursor"
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_current_active_user, None)
+        db.close()
+        engine.dispose()
+    print("✅ /api/events clamps page size and rejects bad cursors")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip_and_clamp()
+    test_pages_through_equal_dates_without_gaps()
+    test_api_clamps_and_rejects_bad_cursor()
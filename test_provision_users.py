@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test bulk user provisioning from a CSV roster
+"""
+
+import io
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier.auth import verify_password
+from Campus_event_notifier.database import Base, User
+from Campus_event_notifier.provision_users import provision_users, read_roster
+
+ROSTER = """Email,Username,Full_Name,Password
+ asha@campus.edu ,asha,Asha Rao,secret-1
+taken@campus.edu,newname,Taken Email,secret-2
+ravi@campus.edu,ravi,Ravi K,
+asha@campus.edu,asha2,Duplicate Email,secret-3
+not-an-email,bad,Invalid,secret-4
+"""
+
+
+def test_provision_users():
+    """Test streaming, existence checks, in-file duplicates, pooled hashing and generated passwords"""
+    directory = tempfile.mkdtemp()
+    roster_path = os.path.join(directory, "roster.csv")
+    with open(roster_path, "w", encoding="utf-8") as f:
+        f.write(ROSTER)
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'users.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(User(email="taken@campus.edu", username="taken", hashed_password="-"))
+    db.commit()
+
+    passwords_out = io.StringIO()
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        report = provision_users(read_roster(roster_path), pool=pool, batch_size=2,
+                                 passwords_out=passwords_out, session_factory=Session)
+    assert (report.rows, report.created, report.existing, report.duplicates, report.invalid) == (5, 2, 1, 1, 1)
+
+    asha = db.query(User).filter(User.email == "asha@campus.edu").one()
+    assert asha.full_name == "Asha Rao" and asha.is_active == 1
+    assert verify_password("secret-1", asha.hashed_password)
+    generated = passwords_out.getvalue().splitlines()
+    assert generated[0] == "email,username,password" and len(generated) == 2
+    email, username, password = generated[1].split(",")
+    ravi = db.query(User).filter(User.email == email).one()
+    assert username == "ravi" and verify_password(password, ravi.hashed_password)
+
+    # Running the same roster again creates nothing
+    again = provision_users(read_roster(roster_path), batch_size=2, passwords_out=io.StringIO(),
+                            session_factory=Session)
+    assert again.created == 0 and again.existing == 3
+    db.close()
+    engine.dispose()
+    print("✅ Roster provisioning creates new accounts once and skips the rest")
+
+
+if __name__ == "__main__":
+    test_provision_users()
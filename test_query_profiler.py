@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the SQL query profiler
+"""
+
+import logging
+
+from sqlalchemy import create_engine, text
+
+from Campus_event_notifier import query_profiler
+
+
+def test_query_profiler_counts_and_repeats():
+    """Test per-request query counting and repeated-statement detection"""
+    engine = create_engine("sqlite://")
+    query_profiler.install_query_profiler(engine)
+
+    stats = query_profiler.RequestQueryStats("/test")
+    token = query_profiler._current_stats.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            for i in range(3):
+                conn.execute(text("SELECT :i"), {"i": i})
+    finally:
+        query_profiler._current_stats.reset(token)
+
+    assert stats.count == 4
+    repeated = stats.repeated(threshold=3)
+    assert len(repeated) == 1
+    assert repeated[0][1] == 3
+    print(f"✅ Profiler counted {stats.count} queries, flagged {len(repeated)} repeated statement")
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_slow_query_log_omits_params():
+    """Test that slow-query warnings never carry bound parameters, which only go to DEBUG when enabled"""
+    engine = create_engine("sqlite://")
+    query_profiler.install_query_profiler(engine)
+    capture = Capture()
+    logger = query_profiler.logger
+    saved = (query_profiler.SLOW_QUERY_MS, query_profiler.SLOW_QUERY_LOG_PARAMS, logger.level)
+    logger.addHandler(capture)
+    logger.setLevel(logging.DEBUG)
+    query_profiler.SLOW_QUERY_MS = 0
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :email"), {"email": "secret@example.edu"})
+            assert any(r.levelno == logging.WARNING for r in capture.records)
+            assert not any("secret@example.edu" in r.getMessage() for r in capture.records)
+
+            query_profiler.SLOW_QUERY_LOG_PARAMS = True
+            capture.records.clear()
+            conn.execute(text("SELECT :email"), {"email": "secret@example.edu"})
+            leaked = [r for r in capture.records if "secret@example.edu" in r.getMessage()]
+            assert leaked and all(r.levelno == logging.DEBUG for r in leaked)
+    finally:
+        query_profiler.SLOW_QUERY_MS, query_profiler.SLOW_QUERY_LOG_PARAMS, level = saved
+        logger.setLevel(level)
+        logger.removeHandler(capture)
+    print("✅ Slow-query warnings omit parameters")
+
+
+if __name__ == "__main__":
+    test_query_profiler_counts_and_repeats()
+    test_slow_query_log_omits_params()
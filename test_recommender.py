@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test the TF-IDF event recommender and its sync with the events table
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier.database import Base, Event, EventChange
+from Campus_event_notifier.recommender import EventRecommender, TfidfIndex, tokenize
+
+
+def test_tfidf_index_ranks_replaces_and_removes():
+    """Test ranking, in-place replacement, removal, the date filter and compaction"""
+    index = TfidfIndex()
+    index.upsert(1, "Robotics workshop robotics lab", "2026-11-01")
+    index.upsert(2, "Football league finals", "2026-11-02")
+    index.upsert(3, "Robotics club meetup and football screening", "2026-09-01")
+    assert tokenize("Workshops on robotics") == tokenize("workshop robotics")
+
+    ranked = index.search("robotics workshops", k=3)
+    assert [event_id for event_id, _ in ranked] == [1, 3]
+    assert ranked[0][1] > ranked[1][1] > 0
+    assert [event_id for event_id, _ in index.search("robotics", min_date="2026-10-01")] == [1]
+
+    index.upsert(1, "Chess tournament", "2026-11-01")
+    assert [event_id for event_id, _ in index.search("robotics")] == [3]
+    assert [event_id for event_id, _ in index.search("chess")] == [1]
+    index.remove(3)
+    assert index.search("robotics") == [] and len(index) == 2
+
+    # Rewriting one event many times compacts the tombstones without changing results
+    for i in range(200):
+        index.upsert(2, f"Football league finals round {i}", "2026-11-02")
+    assert index._rows.size < 100  # 200 rewrites x 5 terms without compaction
+    assert [event_id for event_id, _ in index.search("football")] == [2]
+    assert [event_id for event_id, _ in index.search("chess")] == [1]
+    print("✅ TF-IDF index ranks, replaces, removes and compacts")
+
+
+def test_recommenders_follow_commits_from_every_worker():
+    """Test that two workers' recommenders see each other's commits and never see rolled-back writes"""
+    path = os.path.join(tempfile.mkdtemp(), "recommender.db")
+    engine_a = create_engine(f"sqlite:///{path}")
+    engine_b = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine_a)
+    SessionA = sessionmaker(bind=engine_a)
+    SessionB = sessionmaker(bind=engine_b)
+    worker_a = EventRecommender()
+    worker_b = EventRecommender()
+
+    def names(worker, Session, query):
+        db = Session()
+        try:
+            return [e["name"] for e in worker.recommend(db, query, upcoming_only=False)]
+        finally:
+            db.close()
+
+    try:
+        db = SessionA()
+        db.add(Event(name="Robotics Workshop", date="2099-01-01", location="Lab", description="Build a rover"))
+        db.commit()
+        db.close()
+        assert names(worker_a, SessionA, "robotics") == ["Robotics Workshop"]
+        assert names(worker_b, SessionB, "robotics") == ["Robotics Workshop"]
+
+        # A rolled-back insert never reaches either index
+        db = SessionA()
+        db.add(Event(name="Robotics Ghost", date="2099-01-02", location="Lab", description="-"))
+        db.flush()
+        db.rollback()
+        db.close()
+        assert names(worker_a, SessionA, "ghost") == []
+
+        # Worker B renames and adds; worker A picks both up
+        db = SessionB()
+        db.query(Event).one().name = "Drone Workshop"
+        db.add(Event(name="Chess Night", date="2099-01-03", location="Hall", description="Blitz games"))
+        db.commit()
+        db.close()
+        assert names(worker_a, SessionA, "robotics") == []
+        assert names(worker_a, SessionA, "drone") == ["Drone Workshop"]
+        assert names(worker_a, SessionA, "chess") == ["Chess Night"]
+
+        # Worker A deletes; worker B drops it
+        db = SessionA()
+        db.delete(db.query(Event).filter(Event.name == "Chess Night").one())
+        db.commit()
+        db.close()
+        assert names(worker_b, SessionB, "chess") == []
+
+        # If rows worker A hasn't applied were pruned, it reloads from scratch
+        db = SessionB()
+        db.add(Event(name="Poetry Slam", date="2099-01-04", location="Cafe", description="Open mic"))
+        db.add(Event(name="Jazz Evening", date="2099-01-05", location="Cafe", description="Live band"))
+        db.commit()
+        first_unseen = db.query(EventChange.seq).order_by(EventChange.seq.desc()).offset(1).limit(1).scalar()
+        db.execute(delete(EventChange).where(EventChange.seq <= first_unseen))
+        db.commit()
+        db.close()
+        assert sorted(names(worker_a, SessionA, "poetry jazz")) == ["Jazz Evening", "Poetry Slam"]
+        assert names(worker_a, SessionA, "chess") == []
+    finally:
+        engine_a.dispose()
+        engine_b.dispose()
+    print("✅ Recommenders follow commits from every worker")
+
+
+if __name__ == "__main__":
+    test_tfidf_index_ranks_replaces_and_removes()
+    test_recommenders_follow_commits_from_every_worker()
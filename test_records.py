@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test the Core-selected event records used by the read paths
+"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier.database import Base, Event
+from Campus_event_notifier.fragments import event_version
+from Campus_event_notifier.records import EventCard, load_event_records, select_events
+
+
+def test_records_stand_in_for_event_dicts():
+    """Test loading, ordering, dict-style access and card formatting"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        Event(name="Talk", date="2026-11-20", location="Library", description="-"),
+        Event(name="Hackathon", date="2026-11-03 18:00:00.000000", location="N-Block Lab", description="Build"),
+    ])
+    db.commit()
+
+    records = load_event_records(db)
+    assert [r.name for r in records] == ["Hackathon", "Talk"]
+    hackathon = records[0]
+    assert hackathon["location"] == "N-Block Lab" and hackathon.get("missing") is None
+    assert dict(hackathon) == {"id": hackathon.id, "name": "Hackathon", "date": "2026-11-03 18:00:00.000000",
+                               "location": "N-Block Lab", "description": "Build"}
+    assert hackathon.version == event_version(dict(hackathon))
+    assert [r.name for r in load_event_records(db, select_events(Event.date >= "2026-11-10"))] == ["Talk"]
+
+    card = EventCard.from_record(hackathon)
+    assert card.date == "November 03, 2026" and card.category == "Tech Events"
+    assert EventCard.from_record(records[1]).date == "2026-11-20"
+    db.close()
+    engine.dispose()
+    print("✅ Event records load through Core and read like event dicts")
+
+
+if __name__ == "__main__":
+    test_records_stand_in_for_event_dicts()
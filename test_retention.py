@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test archival of past events and old chat messages
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier.database import Base, Event, ChatMessage, ArchivedEvent
+from Campus_event_notifier.retention import (
+    archive_events, archive_chat_messages, ensure_incremental_vacuum, incremental_vacuum,
+    search_archived_events, archived_chat_history,
+)
+
+
+def test_archive_moves_rows_in_batches_and_vacuums():
+    """Test that old rows move to the archive tables, stay queryable, and pages are freed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'retention.db')}")
+        Base.metadata.create_all(bind=engine)
+        assert ensure_incremental_vacuum(engine) is False  # converted on first run
+        assert ensure_incremental_vacuum(engine) is True
+        db = sessionmaker(bind=engine)()
+
+        old = datetime(2026, 1, 1)
+        db.add_all([Event(name=f"Past {i}", date=f"2026-03-{i % 28 + 1:02d}", location="Library",
+                          description="x" * 500) for i in range(120)])
+        db.add(Event(name="Upcoming", date="2026-12-01", location="OAT", description="-"))
+        db.add_all([ChatMessage(user_id=7, message=f"q{i}", response="a" * 500, timestamp=old + timedelta(minutes=i))
+                    for i in range(50)])
+        db.add(ChatMessage(user_id=7, message="recent", response="-", timestamp=datetime(2026, 10, 1)))
+        db.commit()
+
+        assert archive_events(db, "2026-09-19", batch_size=50) == 120
+        assert archive_chat_messages(db, datetime(2026, 7, 1), batch_size=20) == 50
+        assert [e.name for e in db.query(Event)] == ["Upcoming"]
+        assert [m.message for m in db.query(ChatMessage)] == ["recent"]
+        assert db.query(ArchivedEvent).count() == 120
+
+        found = search_archived_events(db, q="past 11", since="2026-03-12", until="2026-03-13")
+        assert [e.name for e in found] == ["Past 11"]
+        assert len(archived_chat_history(db, 7, limit=10)) == 10
+        db.close()
+
+        assert incremental_vacuum(engine) > 0
+        engine.dispose()
+    print("✅ Past events and old chat messages archived in batches and still queryable")
+
+
+if __name__ == "__main__":
+    test_archive_moves_rows_in_batches_and_vacuums()
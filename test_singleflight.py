@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test single-flight request coalescing
+"""
+
+import asyncio
+
+from Campus_event_notifier.singleflight import SingleFlight
+
+
+def test_singleflight_coalesces_concurrent_calls():
+    """Test that concurrent callers with one key share a single computation"""
+    flight = SingleFlight("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(10)))
+        return results
+
+    results = asyncio.run(main())
+    assert results == ["result"] * 10
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+    print("✅ 10 concurrent calls coalesced into 1")
+
+
+def test_singleflight_shares_exceptions():
+    """Test that every waiter sees the leader's exception and the key is released"""
+    flight = SingleFlight("test_errors")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.in_flight() == 0
+    print("✅ Exceptions shared with all waiters")
+
+
+if __name__ == "__main__":
+    test_singleflight_coalesces_concurrent_calls()
+    test_singleflight_shares_exceptions()
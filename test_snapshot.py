@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory event snapshot behind the home page, dashboard and chatbot
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import textwrap
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Campus_event_notifier.database import Base, Event
+from Campus_event_notifier.snapshot import SnapshotStore
+
+
+def test_snapshot_views_and_refresh():
+    """Test upcoming/grouped/paged views, and rebuilds after ORM writes and writes from other connections"""
+    path = os.path.join(tempfile.mkdtemp(), "snapshot.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        Event(name="Old Fair", date="2026-10-01", location="OAT", description="-"),
+        Event(name="Morning Match", date="2026-10-19 09:00:00.000000", location="Cricket Ground", description="-"),
+        Event(name="Hackathon", date="2026-10-19 18:00:00.000000", location="N-Block Lab", description="-"),
+        Event(name="Talk", date="2026-10-25", location="Library", description="-"),
+    ])
+    db.commit()
+    store = SnapshotStore(check_seconds=3600)
+    now = datetime(2026, 10, 19, 12, 0)
+
+    snapshot = store.current(engine)
+    assert store.current(engine) is snapshot
+    assert [e["name"] for e in snapshot.upcoming(now)] == ["Hackathon", "Talk"]
+    grouped = snapshot.upcoming_by_category(now)
+    assert grouped["Tech Events"][0]["date"] == "October 19, 2026"
+    assert snapshot.upcoming_by_category(now) is grouped
+    events, cursor = snapshot.first_page(limit=3)
+    assert len(snapshot) == 4 and [e["name"] for e in events][0] == "Old Fair" and cursor
+
+    # A committed ORM write swaps in a new snapshot; the old one is left untouched
+    db.add(Event(name="Gala", date="2026-10-20", location="OAT", description="-"))
+    db.commit()
+    fresh = store.current(engine)
+    assert fresh is not snapshot and len(snapshot) == 4
+    assert [e["name"] for e in fresh.upcoming(now)] == ["Hackathon", "Gala", "Talk"]
+
+    # Another connection's commit shows up through PRAGMA data_version once a check is due
+    other = sqlite3.connect(path)
+    other.execute("DELETE FROM events WHERE name = 'Talk'")
+    other.commit()
+    other.close()
+    assert store.current(engine) is fresh
+    store.check_seconds = 0
+    assert [e["name"] for e in store.current(engine).upcoming(now)] == ["Hackathon", "Gala"]
+    db.close()
+    engine.dispose()
+    print("✅ Snapshot serves pre-built views and rebuilds after writes")
+
+
+def test_rebuilds_when_data_version_is_unavailable():
+    """Test that without a data_version, outside writes are picked up once a check is due"""
+    path = os.path.join(tempfile.mkdtemp(), "snapshot.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Event(name="Talk", date="2026-10-25", location="Library", description="-"))
+    db.commit()
+    store = SnapshotStore(check_seconds=3600)
+    store._data_version.read = lambda bind: None  # As for a non-SQLite engine or a failed read
+
+    snapshot = store.current(engine)
+    assert snapshot.data_version is None
+    other = sqlite3.connect(path)
+    other.execute("INSERT INTO events (name, date, location, description) VALUES ('Gala', '2026-10-20', 'OAT', '-')")
+    other.commit()
+    other.close()
+    assert store.current(engine) is snapshot
+    store.check_seconds = 0
+    assert sorted(e.name for e in store.current(engine).rows) == ["Gala", "Talk"]
+    db.close()
+    engine.dispose()
+    print("✅ Snapshot rebuilds on each due check when data_version is unavailable")
+
+
+def test_commit_from_another_worker_process_invalidates():
+    """Test that an ORM commit made by another process is picked up at the next due check"""
+    path = os.path.join(tempfile.mkdtemp(), "snapshot.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    store = SnapshotStore(check_seconds=3600)
+    assert len(store.current(engine)) == 0
+
+    worker = textwrap.dedent(f"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from Campus_event_notifier.database import Event
+        db = sessionmaker(bind=create_engine({f"sqlite:///{path}"!r}))()
+        db.add(Event(name="Gala", date="2026-10-20", location="OAT", description="-"))
+        db.commit()
+    """)
+    # Run from an empty directory so the worker's import-time migrations touch its own database
+    result = subprocess.run(
+        [sys.executable, "-c", worker], cwd=tempfile.mkdtemp(), capture_output=True, text=True, timeout=120,
+        env={**os.environ, "PYTHONPATH": os.path.dirname(os.path.abspath(__file__))},
+    )
+    assert result.returncode == 0, result.stderr
+    assert len(store.current(engine)) == 0  # Served from memory until a check is due
+    store.check_seconds = 0
+    assert [e.name for e in store.current(engine).rows] == ["Gala"]
+    engine.dispose()
+    print("✅ Another worker process's commit invalidates this worker's snapshot")
+
+
+if __name__ == "__main__":
+    test_snapshot_views_and_refresh()
+    test_rebuilds_when_data_version_is_unavailable()
+    test_commit_from_another_worker_process_invalidates()